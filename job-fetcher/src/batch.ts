@@ -0,0 +1,180 @@
+/**
+ * Batch fetching for POST /fetch/batch
+ *
+ * URLs are deduplicated by jobId, then fetched by at most MAX_CONCURRENCY
+ * workers so queued items never wait on a concurrency slot long enough to
+ * time out. Each unique posting goes through the job cache, and a line is
+ * emitted as soon as it finishes.
+ */
+
+import { fetchLinkedInJob, FetchOptions, FetchResult } from './fetchLinkedIn';
+import { normalizeLinkedInUrl } from './normalizeUrl';
+import { getOrFetch, CacheStatus } from './jobCache';
+import { getMaxConcurrency, SlotRequest } from './concurrency';
+
+export interface BatchItem {
+  index: number;
+  url: string;
+  jobId: string | null;
+  /** Indexes of later URLs in the request with the same jobId */
+  duplicates: number[];
+}
+
+export interface BatchLine {
+  type: 'item';
+  index: number;
+  url: string;
+  jobId: string | null;
+  duplicates: number[];
+  status: 'ok' | 'blocked' | 'error';
+  reason?: string;
+  error?: string;
+  cache?: CacheStatus;
+  timingsMs: {
+    wait: number;
+    fetch: number;
+    total: number;
+    acquire?: number;
+    launch?: number;
+    goto?: number;
+    extract?: number;
+  };
+  result: FetchResult | null;
+}
+
+export interface BatchSummary {
+  type: 'summary';
+  total: number;
+  unique: number;
+  duplicates: number;
+  ok: number;
+  blocked: number;
+  errors: number;
+  blockReasons: Record<string, number>;
+  cache: Record<string, number>;
+  aborted: boolean;
+  durationMs: number;
+}
+
+/**
+ * Group URLs by jobId; invalid URLs stay as their own items
+ */
+export function planBatch(urls: string[]): BatchItem[] {
+  const items: BatchItem[] = [];
+  const byJobId = new Map<string, BatchItem>();
+
+  urls.forEach((url, index) => {
+    const normalized = normalizeLinkedInUrl(url);
+    const jobId = normalized.ok && normalized.jobId ? normalized.jobId : null;
+    const existing = jobId ? byJobId.get(jobId) : undefined;
+    if (existing) {
+      existing.duplicates.push(index);
+      return;
+    }
+    const item: BatchItem = { index, url, jobId, duplicates: [] };
+    if (jobId) byJobId.set(jobId, item);
+    items.push(item);
+  });
+  return items;
+}
+
+function toLine(item: BatchItem, result: FetchResult | null, cache: CacheStatus | undefined,
+                waitMs: number, fetchMs: number, error?: string): BatchLine {
+  const line: BatchLine = {
+    type: 'item',
+    index: item.index,
+    url: item.url,
+    jobId: item.jobId,
+    duplicates: item.duplicates,
+    status: 'error',
+    cache,
+    timingsMs: { wait: waitMs, fetch: fetchMs, total: waitMs + fetchMs },
+    result
+  };
+
+  if (result && result.ok) {
+    line.status = 'ok';
+    Object.assign(line.timingsMs, result.debug.timingsMs);
+  } else if (result && result.blocked) {
+    line.status = 'blocked';
+    line.reason = result.reason;
+  } else {
+    line.error = error || (result && 'error' in result ? result.error : 'UNKNOWN_ERROR');
+  }
+  return line;
+}
+
+/**
+ * Fetch every unique item, calling onLine as each one finishes. Fetches are
+ * queued under `schedule` (the batch priority class); once its signal fires,
+ * no new fetches start.
+ */
+export async function runBatch(
+  urls: string[],
+  options: FetchOptions,
+  bypassCache: boolean,
+  onLine: (line: BatchLine) => void,
+  schedule: SlotRequest = {}
+): Promise<BatchSummary> {
+  const start = Date.now();
+  const items = planBatch(urls);
+  const summary: BatchSummary = {
+    type: 'summary',
+    total: urls.length,
+    unique: items.length,
+    duplicates: urls.length - items.length,
+    ok: 0,
+    blocked: 0,
+    errors: 0,
+    blockReasons: {},
+    cache: {},
+    aborted: false,
+    durationMs: 0
+  };
+
+  const emit = (line: BatchLine) => {
+    if (line.status === 'ok') summary.ok++;
+    else if (line.status === 'blocked') {
+      summary.blocked++;
+      summary.blockReasons[line.reason as string] = (summary.blockReasons[line.reason as string] || 0) + 1;
+    } else summary.errors++;
+    if (line.cache) summary.cache[line.cache] = (summary.cache[line.cache] || 0) + 1;
+    onLine(line);
+  };
+
+  const queue = items.filter(item => {
+    if (item.jobId) return true;
+    emit(toLine(item, null, undefined, 0, 0, 'INVALID_URL'));
+    return false;
+  });
+
+  const worker = async () => {
+    while (queue.length) {
+      const item = queue.shift() as BatchItem;
+      if (schedule.signal?.aborted) {
+        summary.aborted = true;
+        return;
+      }
+      const waitMs = Date.now() - start;
+      const fetchStart = Date.now();
+      try {
+        const { result, cache } = await getOrFetch(
+          item.jobId as string,
+          signal => fetchLinkedInJob(item.url, options, { ...schedule, signal }),
+          bypassCache,
+          schedule.signal
+        );
+        emit(toLine(item, result, cache.status, waitMs, Date.now() - fetchStart));
+      } catch (err) {
+        const error = err instanceof Error ? err.message : String(err);
+        emit(toLine(item, null, undefined, waitMs, Date.now() - fetchStart, error));
+      }
+    }
+  };
+
+  const workers = Math.min(getMaxConcurrency(), queue.length);
+  await Promise.all(Array.from({ length: workers }, worker));
+
+  summary.durationMs = Date.now() - start;
+  return summary;
+}
@@ -0,0 +1,327 @@
+/**
+ * Warm Playwright browser pool
+ *
+ * Keeps up to MAX_CONCURRENCY Chromium instances alive between requests so a
+ * fetch only pays for a new BrowserContext, not a browser launch. A browser is
+ * leased to one request at a time (the concurrency slot is taken first, so a
+ * free or launchable browser always exists) and recycled after
+ * BROWSER_RECYCLE_AFTER_PAGES pages or once its process tree grows by more
+ * than BROWSER_RECYCLE_RSS_GROWTH_MB since launch.
+ */
+
+import { readFileSync, readdirSync } from 'fs';
+import { chromium } from 'playwright-extra';
+import { Browser } from 'playwright';
+import StealthPlugin from 'puppeteer-extra-plugin-stealth';
+import { getMaxConcurrency } from './concurrency';
+
+// Apply stealth plugin to avoid detection
+chromium.use(StealthPlugin());
+
+const RECYCLE_AFTER_PAGES = parseInt(process.env.BROWSER_RECYCLE_AFTER_PAGES || '50', 10);
+const RECYCLE_RSS_GROWTH_MB = parseInt(process.env.BROWSER_RECYCLE_RSS_GROWTH_MB || '300', 10);
+const IDLE_TIMEOUT_MS = parseInt(process.env.BROWSER_IDLE_TIMEOUT_MS || '600000', 10);
+const WARM_BROWSERS = parseInt(process.env.BROWSER_POOL_WARM || '1', 10);
+
+const LAUNCH_ARGS = [
+  '--no-sandbox',
+  '--disable-setuid-sandbox',
+  '--disable-dev-shm-usage',
+  '--disable-accelerated-2d-canvas',
+  '--disable-gpu',
+  '--no-first-run',
+  // Background traffic a fetch never needs
+  '--disable-background-networking',
+  '--disable-component-update',
+  '--disable-domain-reliability',
+  '--mute-audio'
+];
+
+interface PooledBrowser {
+  id: number;
+  browser: Browser;
+  headless: boolean;
+  pid: number | null;
+  baselineRss: number | null;
+  pages: number;
+  leased: boolean;
+  lastUsed: number;
+}
+
+export interface BrowserLease {
+  browser: Browser;
+  /** Time spent waiting for a browser, including any launch */
+  acquireMs: number;
+  /** Launch time when no warm browser was available, else 0 */
+  launchMs: number;
+  warm: boolean;
+  /** Return the browser; broken=true closes it instead of reusing it */
+  release: (opts?: { broken?: boolean }) => Promise<void>;
+}
+
+const pool: PooledBrowser[] = [];
+// Launches not yet in the pool; they count towards the pool size
+const pendingLaunches = new Set<Promise<PooledBrowser>>();
+let nextId = 1;
+let launchChain: Promise<unknown> = Promise.resolve();
+
+const stats = {
+  launches: 0,
+  reuses: 0,
+  recycledPages: 0,
+  recycledMemory: 0,
+  recycledIdle: 0,
+  crashed: 0
+};
+
+/**
+ * Pool size follows the concurrency limit: one browser per slot
+ */
+export function getPoolSize(): number {
+  return getMaxConcurrency();
+}
+
+/**
+ * Map of parent pid -> child pids from /proc (Linux only; null elsewhere,
+ * which disables memory-based recycling)
+ */
+function readProcessTree(): Map<number, number[]> | null {
+  const children = new Map<number, number[]>();
+  try {
+    for (const entry of readdirSync('/proc')) {
+      if (!/^\d+$/.test(entry)) continue;
+      try {
+        const stat = readFileSync(`/proc/${entry}/stat`, 'utf8');
+        // Field 4 (ppid) follows the parenthesised command name
+        const ppid = parseInt(stat.slice(stat.lastIndexOf(')') + 2).split(' ')[1], 10);
+        const siblings = children.get(ppid) || [];
+        siblings.push(parseInt(entry, 10));
+        children.set(ppid, siblings);
+      } catch {
+        // Process exited while scanning
+      }
+    }
+  } catch {
+    return null;
+  }
+  return children;
+}
+
+function childPids(): Set<number> {
+  return new Set(readProcessTree()?.get(process.pid) || []);
+}
+
+/**
+ * Resident memory of a process and its descendants, in bytes
+ */
+function processTreeRss(pid: number): number | null {
+  const tree = readProcessTree();
+  if (!tree) return null;
+
+  let total = 0;
+  let found = false;
+  const stack = [pid];
+  while (stack.length) {
+    const current = stack.pop() as number;
+    try {
+      const status = readFileSync(`/proc/${current}/status`, 'utf8');
+      const match = status.match(/VmRSS:\s+(\d+)\s+kB/);
+      if (match) {
+        total += parseInt(match[1], 10) * 1024;
+        found = true;
+      }
+    } catch {
+      // Process exited
+    }
+    stack.push(...(tree.get(current) || []));
+  }
+  return found ? total : null;
+}
+
+async function launch(headless: boolean): Promise<PooledBrowser> {
+  // Launches are serialised so the new Chromium pid can be told apart
+  const run = launchChain.then(async () => {
+    const before = childPids();
+    const browser = await chromium.launch({ headless, args: LAUNCH_ARGS });
+    const started = [...childPids()].filter(pid => !before.has(pid));
+    const pid = started.length === 1 ? started[0] : null;
+
+    const entry: PooledBrowser = {
+      id: nextId++,
+      browser,
+      headless,
+      pid,
+      baselineRss: pid ? processTreeRss(pid) : null,
+      pages: 0,
+      leased: false,
+      lastUsed: Date.now()
+    };
+    browser.on('disconnected', () => {
+      const idx = pool.indexOf(entry);
+      if (idx !== -1) {
+        pool.splice(idx, 1);
+        stats.crashed++;
+        console.warn(`[browserPool] Browser #${entry.id} disconnected after ${entry.pages} pages`);
+      }
+    });
+    stats.launches++;
+    return entry;
+  });
+  launchChain = run.catch(() => {});
+  return run;
+}
+
+/**
+ * Launch a browser and add it to the pool, already leased when `leased` is set
+ * so no other request can take it first
+ */
+function launchIntoPool(headless: boolean, leased: boolean): Promise<PooledBrowser> {
+  const pending = launch(headless).then(entry => {
+    entry.leased = leased;
+    pool.push(entry);
+    return entry;
+  });
+  pendingLaunches.add(pending);
+  const done = () => { pendingLaunches.delete(pending); };
+  pending.then(done, done);
+  return pending;
+}
+
+async function retire(entry: PooledBrowser, reason: string): Promise<void> {
+  const idx = pool.indexOf(entry);
+  if (idx !== -1) pool.splice(idx, 1);
+  console.log(`[browserPool] Recycling browser #${entry.id} (${reason}, ${entry.pages} pages)`);
+  await entry.browser.close().catch(() => {});
+}
+
+function recycleReason(entry: PooledBrowser): string | null {
+  if (entry.pages >= RECYCLE_AFTER_PAGES) {
+    stats.recycledPages++;
+    return 'page limit';
+  }
+  if (entry.pid && entry.baselineRss !== null) {
+    const rss = processTreeRss(entry.pid);
+    if (rss !== null && rss - entry.baselineRss > RECYCLE_RSS_GROWTH_MB * 1024 * 1024) {
+      stats.recycledMemory++;
+      return `memory +${Math.round((rss - entry.baselineRss) / 1024 / 1024)}MB`;
+    }
+  }
+  return null;
+}
+
+/**
+ * Lease a browser. Call only while holding a concurrency slot.
+ */
+export async function acquireBrowser(headless: boolean): Promise<BrowserLease> {
+  const start = Date.now();
+  let launchMs = 0;
+
+  const findFree = () => pool.find(b => !b.leased && b.headless === headless && b.browser.isConnected());
+  let entry = findFree();
+  const warm = !!entry;
+
+  if (entry) {
+    stats.reuses++;
+  }
+  while (!entry) {
+    // Launches still in progress count, so concurrent acquirers and warmPool
+    // cannot push the pool past its size
+    if (pool.length + pendingLaunches.size >= getPoolSize()) {
+      // Make room by dropping an idle browser in the other headless mode
+      const idle = pool.find(b => !b.leased);
+      if (idle) {
+        await retire(idle, 'headless mode change');
+        entry = findFree();
+        continue;
+      }
+      // A warm-up launch holds the last place; wait for it to land in the pool
+      if (pendingLaunches.size > 0) {
+        await Promise.race(pendingLaunches).catch(() => {});
+        entry = findFree();
+        continue;
+      }
+    }
+    const launchStart = Date.now();
+    entry = await launchIntoPool(headless, true);
+    launchMs = Date.now() - launchStart;
+  }
+
+  entry.leased = true;
+  const leased = entry;
+  const acquireMs = Date.now() - start;
+
+  return {
+    browser: leased.browser,
+    acquireMs,
+    launchMs,
+    warm,
+    release: async (opts = {}) => {
+      leased.pages++;
+      leased.leased = false;
+      leased.lastUsed = Date.now();
+      if (opts.broken || !leased.browser.isConnected()) {
+        await retire(leased, 'broken');
+        return;
+      }
+      const reason = recycleReason(leased);
+      if (reason) await retire(leased, reason);
+    }
+  };
+}
+
+/**
+ * Launch BROWSER_POOL_WARM browsers ahead of the first request
+ */
+export async function warmPool(headless: boolean): Promise<void> {
+  const target = Math.min(WARM_BROWSERS, getPoolSize());
+  while (pool.length + pendingLaunches.size < target) {
+    await launchIntoPool(headless, false);
+  }
+}
+
+/**
+ * Close all browsers (on shutdown)
+ */
+export async function closePool(): Promise<void> {
+  const entries = pool.splice(0, pool.length);
+  await Promise.all(entries.map(e => e.browser.close().catch(() => {})));
+}
+
+export function getPoolStats() {
+  return {
+    size: getPoolSize(),
+    browsers: pool.length,
+    launching: pendingLaunches.size,
+    leased: pool.filter(b => b.leased).length,
+    idle: pool.filter(b => !b.leased).length,
+    pages: pool.map(b => b.pages),
+    ...stats
+  };
+}
+
+/**
+ * Resident memory of every pooled browser's process tree, in bytes (null when
+ * /proc is unavailable)
+ */
+export function getBrowserRss(): number | null {
+  let total = 0;
+  let found = false;
+  for (const entry of pool) {
+    const rss = entry.pid ? processTreeRss(entry.pid) : null;
+    if (rss !== null) {
+      total += rss;
+      found = true;
+    }
+  }
+  return found || pool.length === 0 ? total : null;
+}
+
+// Close browsers idle for longer than BROWSER_IDLE_TIMEOUT_MS, keeping the warm ones
+setInterval(() => {
+  const now = Date.now();
+  const idle = pool.filter(b => !b.leased && now - b.lastUsed > IDLE_TIMEOUT_MS);
+  for (const entry of idle.slice(0, Math.max(0, pool.length - WARM_BROWSERS))) {
+    stats.recycledIdle++;
+    retire(entry, 'idle').catch(() => {});
+  }
+}, 60000);
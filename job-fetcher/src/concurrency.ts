@@ -1,64 +1,252 @@
 /**
  * Concurrency limiter for Playwright browser instances
+ *
+ * Waiters are scheduled by class, then fairly across clients:
+ * - 'interactive' (single /fetch calls) is served before 'batch' (bulk
+ *   ingest), except that batch gets one slot after SCHED_INTERACTIVE_WEIGHT
+ *   interactive grants in a row so it is never starved outright.
+ * - Within a class, clients take turns (round robin), so one client
+ *   flooding the queue only delays its own requests.
+ * - A waiter is dropped when its deadline passes (CONCURRENCY_TIMEOUT) or
+ *   its AbortSignal fires (REQUEST_ABORTED, e.g. the HTTP client went away).
+ *
+ * Cancelled waiters are skipped lazily at dispatch, so every operation is O(1).
  */
 
 const MAX_CONCURRENCY = parseInt(process.env.MAX_CONCURRENCY || '2', 10);
+const INTERACTIVE_WEIGHT = parseInt(process.env.SCHED_INTERACTIVE_WEIGHT || '4', 10);
 
-let currentConcurrency = 0;
-const queue: Array<{
-  resolve: () => void;
-  reject: (err: Error) => void;
-}> = [];
+export type PriorityClass = 'interactive' | 'batch';
+
+const CLASSES: PriorityClass[] = ['interactive', 'batch'];
+
+// Upper bounds of the queue-wait histogram buckets, in ms
+export const WAIT_BUCKETS_MS = [0, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000];
 
 export interface ConcurrencySlot {
   release: () => void;
+  /** Time spent queued before the slot was granted */
+  waitMs: number;
 }
 
-export async function acquireSlot(timeoutMs: number = 60000): Promise<ConcurrencySlot> {
-  return new Promise((resolve, reject) => {
-    const tryAcquire = () => {
-      if (currentConcurrency < MAX_CONCURRENCY) {
-        currentConcurrency++;
-        resolve({
-          release: () => {
-            currentConcurrency--;
-            // Process next in queue
-            const next = queue.shift();
-            if (next) {
-              next.resolve();
-            }
-          }
-        });
-        return true;
-      }
-      return false;
-    };
+export interface SlotRequest {
+  /** Fairness key, usually the client IP */
+  clientId?: string;
+  priority?: PriorityClass;
+  /** Drop the waiter when this fires */
+  signal?: AbortSignal;
+}
+
+interface Waiter {
+  clientId: string;
+  enqueuedAt: number;
+  cancelled: boolean;
+  grant: () => void;
+}
+
+/**
+ * FIFO with O(1) push and shift
+ */
+class Deque<T> {
+  private items: (T | undefined)[] = [];
+  private head = 0;
+
+  get length(): number {
+    return this.items.length - this.head;
+  }
+
+  push(item: T): void {
+    this.items.push(item);
+  }
+
+  shift(): T | undefined {
+    if (this.head >= this.items.length) return undefined;
+    const item = this.items[this.head];
+    this.items[this.head++] = undefined;
+    // Compact once the consumed prefix dominates
+    if (this.head > 1024 && this.head * 2 > this.items.length) {
+      this.items = this.items.slice(this.head);
+      this.head = 0;
+    }
+    return item;
+  }
+}
+
+/**
+ * One priority class: a FIFO per client plus a round-robin ring of clients
+ */
+class ClassQueue {
+  private byClient = new Map<string, Deque<Waiter>>();
+  private ring = new Deque<string>();
+  live = 0;
 
-    // Try to acquire immediately
-    if (tryAcquire()) {
-      return;
+  push(waiter: Waiter): void {
+    let queue = this.byClient.get(waiter.clientId);
+    if (!queue) {
+      queue = new Deque<Waiter>();
+      this.byClient.set(waiter.clientId, queue);
+      this.ring.push(waiter.clientId);
     }
+    queue.push(waiter);
+    this.live++;
+  }
+
+  /**
+   * Next live waiter, taking one from each client in turn
+   */
+  next(): Waiter | undefined {
+    while (this.ring.length) {
+      const clientId = this.ring.shift() as string;
+      const queue = this.byClient.get(clientId) as Deque<Waiter>;
+      let waiter = queue.shift();
+      while (waiter && waiter.cancelled) waiter = queue.shift();
 
-    // Set up timeout
-    const timeoutId = setTimeout(() => {
-      const idx = queue.findIndex(q => q.resolve === queueResolve);
-      if (idx !== -1) {
-        queue.splice(idx, 1);
+      if (queue.length) this.ring.push(clientId);
+      else this.byClient.delete(clientId);
+
+      if (waiter) {
+        this.live--;
+        return waiter;
       }
-      reject(new Error('CONCURRENCY_TIMEOUT'));
-    }, timeoutMs);
+    }
+    return undefined;
+  }
+
+  clients(): number {
+    return this.byClient.size;
+  }
+}
+
+interface ClassStats {
+  granted: number;
+  timeouts: number;
+  aborted: number;
+  waitBuckets: number[];
+  waitSumMs: number;
+  waitMaxMs: number;
+}
+
+let currentConcurrency = 0;
+let interactiveStreak = 0;
+
+const queues: Record<PriorityClass, ClassQueue> = {
+  interactive: new ClassQueue(),
+  batch: new ClassQueue()
+};
 
-    // Queue resolve function
-    const queueResolve = () => {
+const newStats = (): ClassStats => ({
+  granted: 0,
+  timeouts: 0,
+  aborted: 0,
+  waitBuckets: new Array(WAIT_BUCKETS_MS.length + 1).fill(0),
+  waitSumMs: 0,
+  waitMaxMs: 0
+});
+
+const stats: Record<PriorityClass, ClassStats> = {
+  interactive: newStats(),
+  batch: newStats()
+};
+
+function recordWait(priority: PriorityClass, waitMs: number): void {
+  const s = stats[priority];
+  let bucket = WAIT_BUCKETS_MS.findIndex(le => waitMs <= le);
+  if (bucket === -1) bucket = WAIT_BUCKETS_MS.length;
+  s.waitBuckets[bucket]++;
+  s.granted++;
+  s.waitSumMs += waitMs;
+  s.waitMaxMs = Math.max(s.waitMaxMs, waitMs);
+}
+
+/**
+ * Pick the class to serve next: interactive first, with a batch turn after
+ * INTERACTIVE_WEIGHT consecutive interactive grants
+ */
+function nextWaiter(): { waiter: Waiter; priority: PriorityClass } | undefined {
+  const order: PriorityClass[] = interactiveStreak >= INTERACTIVE_WEIGHT ? ['batch', 'interactive'] : CLASSES;
+  for (const priority of order) {
+    const waiter = queues[priority].next();
+    if (waiter) {
+      interactiveStreak = priority === 'interactive' ? interactiveStreak + 1 : 0;
+      return { waiter, priority };
+    }
+  }
+  return undefined;
+}
+
+function release(): void {
+  currentConcurrency--;
+  // Hand the slot straight to the next waiter
+  const next = nextWaiter();
+  if (next) {
+    currentConcurrency++;
+    next.waiter.grant();
+  }
+}
+
+function makeSlot(waitMs: number): ConcurrencySlot {
+  let released = false;
+  return {
+    waitMs,
+    release: () => {
+      if (released) return;
+      released = true;
+      release();
+    }
+  };
+}
+
+export async function acquireSlot(timeoutMs: number = 60000, request: SlotRequest = {}): Promise<ConcurrencySlot> {
+  const priority = request.priority || 'interactive';
+  const clientId = request.clientId || 'anonymous';
+  const { signal } = request;
+
+  if (signal?.aborted) {
+    stats[priority].aborted++;
+    throw new Error('REQUEST_ABORTED');
+  }
+
+  // Fast path: a free slot and nobody queued ahead
+  if (currentConcurrency < MAX_CONCURRENCY && getQueueLength() === 0) {
+    currentConcurrency++;
+    if (priority === 'interactive') interactiveStreak++;
+    else interactiveStreak = 0;
+    recordWait(priority, 0);
+    return makeSlot(0);
+  }
+
+  return new Promise((resolve, reject) => {
+    const enqueuedAt = Date.now();
+
+    const cancel = (error: string, counter: 'timeouts' | 'aborted') => {
+      if (waiter.cancelled) return;
+      waiter.cancelled = true;
+      queues[priority].live--;
+      stats[priority][counter]++;
       clearTimeout(timeoutId);
-      if (tryAcquire()) {
-        return;
+      signal?.removeEventListener('abort', onAbort);
+      reject(new Error(error));
+    };
+
+    const onAbort = () => cancel('REQUEST_ABORTED', 'aborted');
+
+    const waiter: Waiter = {
+      clientId,
+      enqueuedAt,
+      cancelled: false,
+      grant: () => {
+        waiter.cancelled = true;
+        clearTimeout(timeoutId);
+        signal?.removeEventListener('abort', onAbort);
+        const waitMs = Date.now() - enqueuedAt;
+        recordWait(priority, waitMs);
+        resolve(makeSlot(waitMs));
       }
-      // Shouldn't happen, but re-queue if needed
-      queue.push({ resolve: queueResolve, reject });
     };
 
-    queue.push({ resolve: queueResolve, reject });
+    const timeoutId = setTimeout(() => cancel('CONCURRENCY_TIMEOUT', 'timeouts'), timeoutMs);
+    signal?.addEventListener('abort', onAbort, { once: true });
+    queues[priority].push(waiter);
   });
 }
 
@@ -67,9 +255,43 @@ export function getCurrentConcurrency(): number {
 }
 
 export function getQueueLength(): number {
-  return queue.length;
+  return queues.interactive.live + queues.batch.live;
 }
 
 export function getMaxConcurrency(): number {
   return MAX_CONCURRENCY;
 }
+
+/**
+ * Per-class queue depth, outcomes and queue-wait histogram (cumulative
+ * counts per upper bound, as in a Prometheus histogram)
+ */
+export function getSchedulerStats() {
+  const result: Record<string, unknown> = {};
+  for (const priority of CLASSES) {
+    const s = stats[priority];
+    let cumulative = 0;
+    const buckets: Record<string, number> = {};
+    WAIT_BUCKETS_MS.forEach((le, i) => {
+      cumulative += s.waitBuckets[i];
+      buckets[String(le)] = cumulative;
+    });
+    buckets['+Inf'] = cumulative + s.waitBuckets[WAIT_BUCKETS_MS.length];
+
+    result[priority] = {
+      queued: queues[priority].live,
+      clients: queues[priority].clients(),
+      granted: s.granted,
+      timeouts: s.timeouts,
+      aborted: s.aborted,
+      waitMs: {
+        buckets,
+        count: s.granted,
+        sum: s.waitSumMs,
+        max: s.waitMaxMs,
+        mean: s.granted > 0 ? Math.round(s.waitSumMs / s.granted) : 0
+      }
+    };
+  }
+  return result;
+}
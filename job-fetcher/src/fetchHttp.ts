@@ -0,0 +1,209 @@
+/**
+ * Browserless fast path for public job postings
+ *
+ * LinkedIn serves the logged-out job page as server-rendered HTML, so most
+ * postings can be read with a plain HTTP GET and the same SELECTORS the
+ * browser tier uses, without a concurrency slot, a browser or the
+ * human-like delays. Anything the HTTP tier cannot read (login wall,
+ * CAPTCHA, no description) is handed to the browser tier; a rate-limit
+ * answer is returned as is, since a browser would be refused too.
+ */
+
+import * as cheerio from 'cheerio';
+import type { CheerioAPI } from 'cheerio';
+import { BLOCK_PATTERNS, cleanDescriptionText, getRandomUserAgent } from './selectors';
+import { observeFetchPhases } from './metrics';
+import { orderedSelectors, recordSelectorHits, SelectorField } from './selectorStats';
+import type { FetchResult } from './fetchLinkedIn';
+
+const FAST_PATH_TIMEOUT_MS = parseInt(process.env.FAST_PATH_TIMEOUT_MS || '10000', 10);
+
+/** Why the HTTP tier handed a posting to the browser */
+export type FastPathMissReason = 'LOGIN_REQUIRED' | 'CAPTCHA' | 'NO_DESCRIPTION' | 'HTTP_ERROR';
+
+export interface FastPathMiss {
+  reason: FastPathMissReason;
+  /** HTTP status of the attempt, null when the request itself failed */
+  httpStatus: number | null;
+  ms: number;
+}
+
+export type FastPathOutcome = { result: FetchResult } | { miss: FastPathMiss };
+
+interface SelectorMatch {
+  value: string | null;
+  checked: string[];
+  matched: string[];
+}
+
+/**
+ * Value from the best-ranked selector that yields one, checking every
+ * selector so the hit-rate stats stay accurate
+ */
+function match(field: SelectorField, read: (selector: string) => string | null): SelectorMatch {
+  const checked = orderedSelectors(field);
+  const matched: string[] = [];
+  let value: string | null = null;
+  for (const selector of checked) {
+    let result: string | null = null;
+    try {
+      result = read(selector);
+    } catch {
+      // Selector cheerio cannot parse
+    }
+    if (result) {
+      matched.push(selector);
+      if (value === null) value = result;
+    }
+  }
+  return { value, checked, matched };
+}
+
+function pick(field: SelectorField, read: (selector: string) => string | null): string | null {
+  const { value, checked, matched } = match(field, read);
+  recordSelectorHits(field, checked, matched);
+  return value;
+}
+
+const textOf = ($: CheerioAPI) => (selector: string) => $(selector).first().text().trim() || null;
+
+/**
+ * Description text with line breaks kept, as the browser tier extracts it
+ */
+const descriptionOf = ($: CheerioAPI) => (selector: string) => {
+  const el = $(selector).first().clone();
+  if (!el.length) return null;
+  el.find('br').replaceWith('\n');
+  el.find('p, div, li').prepend('\n');
+  const text = el.text();
+  return text.trim().length > 50 ? text : null;
+};
+
+const applyUrlOf = ($: CheerioAPI, baseUrl: string) => (selector: string) => {
+  const href = $(selector).first().attr('href');
+  if (!href) return null;
+  const url = new URL(href, baseUrl).toString();
+  return url.startsWith('http') ? url : null;
+};
+
+function includesAny(text: string, patterns: string[]): boolean {
+  return patterns.some(pattern => text.includes(pattern.toLowerCase()));
+}
+
+/**
+ * Try to read the posting from its public HTML. Returns a result when this
+ * tier can answer, otherwise why the browser tier should take over.
+ */
+export async function fetchWithoutBrowser(
+  jobId: string,
+  canonicalUrl: string,
+  timeoutMs: number,
+  signal?: AbortSignal
+): Promise<FastPathOutcome> {
+  const start = Date.now();
+  const miss = (reason: FastPathMissReason, httpStatus: number | null): FastPathOutcome => ({
+    miss: { reason, httpStatus, ms: Date.now() - start }
+  });
+
+  const controller = new AbortController();
+  const timer = setTimeout(() => controller.abort(), Math.min(timeoutMs, FAST_PATH_TIMEOUT_MS));
+  const onAbort = () => controller.abort();
+  signal?.addEventListener('abort', onAbort, { once: true });
+
+  let response: Response;
+  let html: string;
+  try {
+    response = await fetch(canonicalUrl, {
+      headers: {
+        'User-Agent': getRandomUserAgent(),
+        'Accept': 'text/html,application/xhtml+xml',
+        'Accept-Language': 'en-US,en;q=0.9'
+      },
+      redirect: 'follow',
+      signal: controller.signal
+    });
+    html = await response.text();
+  } catch {
+    if (signal?.aborted) {
+      return { result: { ok: false, blocked: false, error: 'REQUEST_ABORTED', jobId, canonicalUrl } };
+    }
+    return miss('HTTP_ERROR', null);
+  } finally {
+    clearTimeout(timer);
+    signal?.removeEventListener('abort', onAbort);
+  }
+  const gotoMs = Date.now() - start;
+  const finalUrl = response.url || canonicalUrl;
+
+  if (BLOCK_PATTERNS.loginUrls.some(pattern => new URL(finalUrl).pathname.startsWith(pattern))) {
+    observeFetchPhases({ goto: gotoMs }, 'http');
+    return miss('LOGIN_REQUIRED', response.status);
+  }
+
+  if (response.status === 429) {
+    observeFetchPhases({ goto: gotoMs }, 'http');
+    return {
+      result: {
+        ok: false,
+        blocked: true,
+        reason: 'RATE_LIMIT',
+        jobId,
+        canonicalUrl,
+        applyUrl: null,
+        debug: { finalUrl, httpStatus: 429, tier: 'http' }
+      }
+    };
+  }
+
+  const extractStart = Date.now();
+  const $ = cheerio.load(html);
+  const descriptionMatch = match('description', descriptionOf($));
+  const description = cleanDescriptionText(descriptionMatch.value || '');
+  const extractMs = Date.now() - extractStart;
+  observeFetchPhases({ goto: gotoMs, extract: extractMs }, 'http');
+
+  if (!description) {
+    // Only classify the page once there is no posting on it: descriptions
+    // can mention "rate limit" or "captcha" themselves
+    $('script, style, noscript').remove();
+    const text = $('body').text().toLowerCase();
+    if (includesAny(text, BLOCK_PATTERNS.rateLimitText)) {
+      return {
+        result: {
+          ok: false,
+          blocked: true,
+          reason: 'RATE_LIMIT',
+          jobId,
+          canonicalUrl,
+          applyUrl: null,
+          debug: { finalUrl, httpStatus: response.status, tier: 'http' }
+        }
+      };
+    }
+    if (includesAny(text, BLOCK_PATTERNS.captchaText)) return miss('CAPTCHA', response.status);
+    return miss(response.ok ? 'NO_DESCRIPTION' : 'HTTP_ERROR', response.status);
+  }
+
+  // Pages without a posting go to the browser tier, which records them
+  recordSelectorHits('description', descriptionMatch.checked, descriptionMatch.matched);
+
+  return {
+    result: {
+      ok: true,
+      blocked: false,
+      jobId,
+      canonicalUrl,
+      title: pick('title', textOf($)) || 'Unknown Title',
+      company: pick('company', textOf($)) || 'Unknown Company',
+      location: pick('location', textOf($)) || '',
+      descriptionText: description,
+      applyUrl: pick('applyButton', applyUrlOf($, finalUrl)),
+      debug: {
+        finalUrl,
+        httpStatus: response.status,
+        tier: 'http',
+        timingsMs: { queue: 0, acquire: 0, launch: 0, goto: gotoMs, extract: extractMs }
+      }
+    }
+  };
+}
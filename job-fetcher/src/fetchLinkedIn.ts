@@ -2,21 +2,28 @@
  * LinkedIn Job Fetcher using Playwright with Stealth
  */
 
-import { chromium } from 'playwright-extra';
-import { Browser, Page, BrowserContext } from 'playwright';
-import StealthPlugin from 'puppeteer-extra-plugin-stealth';
+import { Page, BrowserContext } from 'playwright';
 import { normalizeLinkedInUrl } from './normalizeUrl';
-import { acquireSlot, ConcurrencySlot } from './concurrency';
-
-// Apply stealth plugin to avoid detection
-chromium.use(StealthPlugin());
+import { acquireSlot, ConcurrencySlot, SlotRequest } from './concurrency';
+import { acquireBrowser, BrowserLease } from './browserPool';
+import { observeFetchPhases, observeFetchResult, observeNetwork, FetchPhase } from './metrics';
+import { SELECTORS, BLOCK_PATTERNS, cleanDescriptionText, getRandomUserAgent } from './selectors';
+import { fetchWithoutBrowser, FastPathMiss } from './fetchHttp';
+import { orderedSelectors, recordSelectorHits, SELECTOR_FIELDS, SelectorField } from './selectorStats';
+import { applyNetworkProfile, NetworkSummary, NetworkTracker } from './networkProfile';
+import type { CacheInfo } from './jobCache';
 
 const DEFAULT_TIMEOUT_MS = parseInt(process.env.DEFAULT_TIMEOUT_MS || '45000', 10);
 const HEADLESS = process.env.HEADLESS !== 'false';
-const MAX_DESCRIPTION_LENGTH = 60000;
+const FAST_PATH_ENABLED = process.env.FAST_PATH_ENABLED !== 'false';
+// Longest wait for the description to appear before extracting anyway
+const EXTRACT_WAIT_MS = 3000;
 
 // Blocked reasons
-type BlockReason = 'LOGIN_REQUIRED' | 'CAPTCHA' | 'RATE_LIMIT' | 'SELECTOR_TIMEOUT' | 'UNKNOWN';
+export type BlockReason = 'LOGIN_REQUIRED' | 'CAPTCHA' | 'RATE_LIMIT' | 'SELECTOR_TIMEOUT' | 'UNKNOWN';
+
+// Which tier answered: a plain HTTP fetch or a Playwright browser
+export type FetchTier = 'http' | 'browser';
 
 export interface FetchOptions {
   timeoutMs?: number;
@@ -36,11 +43,19 @@ export interface FetchSuccessResult {
   debug: {
     finalUrl: string;
     httpStatus: number;
+    tier: FetchTier;
+    /** Set when the HTTP tier was tried first and handed over to the browser */
+    fastPath?: FastPathMiss;
+    /** Sub-requests the network profile let through or blocked */
+    network?: NetworkSummary;
     timingsMs: {
+      queue: number;
+      acquire: number;
       launch: number;
       goto: number;
       extract: number;
     };
+    cache?: CacheInfo;
   };
 }
 
@@ -54,6 +69,10 @@ export interface FetchBlockedResult {
   debug: {
     finalUrl: string;
     httpStatus: number | null;
+    tier: FetchTier;
+    fastPath?: FastPathMiss;
+    network?: NetworkSummary;
+    cache?: CacheInfo;
   };
 }
 
@@ -63,86 +82,29 @@ export interface FetchErrorResult {
   error: string;
   jobId?: string;
   canonicalUrl?: string;
+  debug?: {
+    tier?: FetchTier;
+    fastPath?: FastPathMiss;
+    cache?: CacheInfo;
+  };
 }
 
 export type FetchResult = FetchSuccessResult | FetchBlockedResult | FetchErrorResult;
 
-// Realistic User-Agents (rotated randomly)
-const USER_AGENTS = [
-  'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-  'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-  'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:123.0) Gecko/20100101 Firefox/123.0',
-  'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2.1 Safari/605.1.15'
-];
-
-// Get random user agent
-const getRandomUserAgent = () => USER_AGENTS[Math.floor(Math.random() * USER_AGENTS.length)];
-
 // Random delay helper (makes behavior more human-like)
 const randomDelay = (min: number, max: number) => Math.floor(Math.random() * (max - min + 1)) + min;
 
-// Selectors for job data
-const SELECTORS = {
-  // Job title selectors (try multiple)
-  title: [
-    'h1.top-card-layout__title',
-    'h1.topcard__title',
-    'h1[class*="job-title"]',
-    '.job-details-jobs-unified-top-card__job-title h1',
-    'h1'
-  ],
-  // Company name
-  company: [
-    '.top-card-layout__card a.topcard__org-name-link',
-    '.topcard__org-name-link',
-    'a[data-tracking-control-name="public_jobs_topcard-org-name"]',
-    '.job-details-jobs-unified-top-card__company-name a',
-    '.job-details-jobs-unified-top-card__company-name'
-  ],
-  // Location
-  location: [
-    '.top-card-layout__card .topcard__flavor--bullet',
-    '.topcard__flavor--bullet',
-    '.job-details-jobs-unified-top-card__bullet',
-    '.job-details-jobs-unified-top-card__primary-description-container span'
-  ],
-  // Job description
-  description: [
-    '.description__text',
-    '.show-more-less-html__markup',
-    '.job-details-jobs-unified-top-card__job-description',
-    '[class*="description"] [class*="markup"]',
-    '.jobs-description__content',
-    'article'
-  ],
-  // "See more" / "Show more" buttons
-  showMore: [
-    'button.show-more-less-html__button',
-    'button[aria-label*="more"]',
-    'button[class*="show-more"]',
-    '.show-more-less-html__button--more'
-  ],
-  // Apply button / URL
-  applyButton: [
-    'a.apply-button',
-    'a[data-tracking-control-name*="apply"]',
-    '.jobs-apply-button',
-    'a[href*="apply"]'
-  ]
-};
-
-// Login/block detection patterns
-const BLOCK_PATTERNS = {
-  loginUrls: ['/login', '/checkpoint', '/authwall', '/uas/login'],
-  loginText: ['Sign in', 'Join now', 'Log in', 'Sign up'],
-  captchaText: ['captcha', 'verify you', 'security verification', 'prove you'],
-  rateLimitText: ['too many requests', 'rate limit', 'slow down']
-};
-
 /**
- * Main fetch function
+ * Main fetch function. Tries the browserless HTTP tier first and falls back
+ * to Playwright on a login wall, CAPTCHA or missing description. `schedule`
+ * sets the caller's fairness key, priority class and abort signal for the
+ * browser tier's concurrency queue.
  */
-export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {}): Promise<FetchResult> {
+export async function fetchLinkedInJob(
+  rawUrl: string,
+  options: FetchOptions = {},
+  schedule: SlotRequest = {}
+): Promise<FetchResult> {
   const timeoutMs = options.timeoutMs || DEFAULT_TIMEOUT_MS;
   const headless = options.headless !== undefined ? options.headless : HEADLESS;
 
@@ -157,39 +119,73 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
   }
 
   const { jobId, canonicalUrl } = normalized;
+
+  let fastPath: FastPathMiss | undefined;
+  if (FAST_PATH_ENABLED) {
+    const outcome = await fetchWithoutBrowser(jobId, canonicalUrl, timeoutMs, schedule.signal);
+    if ('result' in outcome) {
+      countResult(outcome.result, 'http');
+      return outcome.result;
+    }
+    fastPath = outcome.miss;
+    console.log(`[fetch] HTTP tier missed for jobId=${jobId} (${fastPath.reason}), using browser`);
+  }
+
+  const result = await runFetch(jobId, canonicalUrl, timeoutMs, headless, schedule);
+  if (fastPath) result.debug = { ...result.debug, fastPath } as typeof result.debug;
+  countResult(result, 'browser');
+  return result;
+}
+
+function countResult(result: FetchResult, tier: FetchTier): void {
+  // Dropped from the queue before reaching LinkedIn: not a fetch
+  if ('error' in result && /^(CONCURRENCY_TIMEOUT|REQUEST_ABORTED)$/.test(result.error)) return;
+  observeFetchResult(result, tier);
+}
+
+/**
+ * Fetch a normalized posting while holding a concurrency slot and a pooled browser
+ */
+async function runFetch(
+  jobId: string,
+  canonicalUrl: string,
+  timeoutMs: number,
+  headless: boolean,
+  schedule: SlotRequest
+): Promise<FetchResult> {
   let slot: ConcurrencySlot | null = null;
-  let browser: Browser | null = null;
+  let lease: BrowserLease | null = null;
   let context: BrowserContext | null = null;
+  let tracker: NetworkTracker | null = null;
+  let network: NetworkSummary | undefined;
+  let browserBroken = false;
 
   const timings = {
+    queue: 0,
+    acquire: 0,
     launch: 0,
     goto: 0,
     extract: 0
   };
+  // Phases actually reached, for the latency histograms
+  const phases: Partial<Record<FetchPhase, number>> = {};
+  // Network counts as of the page's outcome; taken once, before the context closes
+  const networkSummary = async () => (network ??= await tracker?.summary());
 
   try {
     // Acquire concurrency slot
-    slot = await acquireSlot(timeoutMs);
-
-    // Launch browser
-    const launchStart = Date.now();
-    browser = await chromium.launch({
-      headless,
-      args: [
-        '--no-sandbox',
-        '--disable-setuid-sandbox',
-        '--disable-dev-shm-usage',
-        '--disable-accelerated-2d-canvas',
-        '--disable-gpu',
-        '--no-first-run',
-        '--no-zygote',
-        '--single-process'
-      ]
-    });
-    timings.launch = Date.now() - launchStart;
-
-    // Create context with realistic settings
-    context = await browser.newContext({
+    slot = await acquireSlot(timeoutMs, schedule);
+    timings.queue = slot.waitMs;
+
+    // Lease a warm browser from the pool (launches one only when none is idle)
+    lease = await acquireBrowser(headless);
+    timings.acquire = lease.acquireMs;
+    timings.launch = lease.launchMs;
+    phases.acquire = lease.acquireMs;
+    if (!lease.warm) phases.launch = lease.launchMs;
+
+    // Fresh context per request: no cookies or storage carried between fetches
+    context = await lease.browser.newContext({
       userAgent: getRandomUserAgent(),
       viewport: { width: 1366 + randomDelay(-100, 100), height: 768 + randomDelay(-50, 50) },
       locale: 'en-US',
@@ -197,24 +193,17 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
       deviceScaleFactor: 1,
       hasTouch: false,
       isMobile: false,
-      javaScriptEnabled: true
+      javaScriptEnabled: true,
+      // Service workers would fetch outside context.route
+      serviceWorkers: 'block'
     });
+    tracker = await applyNetworkProfile(context);
 
     // Add random initial delay to seem more human
     await new Promise(resolve => setTimeout(resolve, randomDelay(500, 1500)));
 
     const page = await context.newPage();
 
-    // Block images, fonts, media for speed
-    await page.route('**/*', (route) => {
-      const resourceType = route.request().resourceType();
-      if (['image', 'font', 'media', 'stylesheet'].includes(resourceType)) {
-        route.abort();
-      } else {
-        route.continue();
-      }
-    });
-
     // Navigate to job page
     const gotoStart = Date.now();
     let response;
@@ -225,6 +214,7 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
       });
     } catch (err) {
       timings.goto = Date.now() - gotoStart;
+      phases.goto = timings.goto;
       return {
         ok: false,
         blocked: true,
@@ -234,11 +224,14 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
         applyUrl: null,
         debug: {
           finalUrl: page.url(),
-          httpStatus: null
+          httpStatus: null,
+          tier: 'browser',
+          network: await networkSummary()
         }
       };
     }
     timings.goto = Date.now() - gotoStart;
+    phases.goto = timings.goto;
 
     const httpStatus = response?.status() || null;
     const finalUrl = page.url();
@@ -256,7 +249,9 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
         applyUrl,
         debug: {
           finalUrl,
-          httpStatus
+          httpStatus,
+          tier: 'browser',
+          network: await networkSummary()
         }
       };
     }
@@ -265,6 +260,7 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
     const extractStart = Date.now();
     const jobData = await extractJobData(page, timeoutMs);
     timings.extract = Date.now() - extractStart;
+    phases.extract = timings.extract;
 
     if (!jobData.descriptionText) {
       // Description not found - likely blocked
@@ -278,7 +274,9 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
         applyUrl,
         debug: {
           finalUrl,
-          httpStatus
+          httpStatus,
+          tier: 'browser',
+          network: await networkSummary()
         }
       };
     }
@@ -296,6 +294,8 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
       debug: {
         finalUrl,
         httpStatus: httpStatus || 200,
+        tier: 'browser',
+        network: await networkSummary(),
         timingsMs: timings
       }
     };
@@ -303,6 +303,8 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
   } catch (err) {
     const error = err instanceof Error ? err.message : String(err);
     console.error(`[fetchLinkedIn] Error for jobId=${jobId}: ${error}`);
+    // A browser that failed outside page navigation is not trusted for reuse
+    browserBroken = (lease !== null && !lease.browser.isConnected()) || /Target .*closed|Browser .*closed/i.test(error);
     return {
       ok: false,
       blocked: false,
@@ -311,8 +313,11 @@ export async function fetchLinkedInJob(rawUrl: string, options: FetchOptions = {
       canonicalUrl
     };
   } finally {
+    observeFetchPhases(phases, 'browser');
+    const counted = network ?? await tracker?.summary().catch(() => undefined);
+    if (counted) observeNetwork(counted);
     if (context) await context.close().catch(() => {});
-    if (browser) await browser.close().catch(() => {});
+    if (lease) await lease.release({ broken: browserBroken });
     if (slot) slot.release();
   }
 }
@@ -362,8 +367,16 @@ async function detectBlock(page: Page, currentUrl: string): Promise<{ blocked: b
   return { blocked: false, reason: 'UNKNOWN' };
 }
 
+interface PageExtraction {
+  /** First non-empty text per field in the given order, and every selector that matched */
+  fields: Record<'title' | 'company' | 'location' | 'description', { value: string; matched: string[] }>;
+  apply: { value: string | null; matched: string[] };
+}
+
 /**
- * Extract job data from page
+ * Extract job data from page in a single evaluate call. Every candidate
+ * selector is checked so the hit-rate stats stay accurate; values come
+ * from the best-ranked selector that matched.
  */
 async function extractJobData(page: Page, timeoutMs: number): Promise<{
   title: string;
@@ -372,112 +385,104 @@ async function extractJobData(page: Page, timeoutMs: number): Promise<{
   descriptionText: string;
   applyUrl: string | null;
 }> {
-  // Wait a bit for dynamic content (randomized to seem more human)
-  await page.waitForTimeout(randomDelay(1500, 3000));
-
-  // Try to click "Show more" button if present
-  await tryClickShowMore(page);
-
-  // Extract title
-  const title = await trySelectors(page, SELECTORS.title) || 'Unknown Title';
-
-  // Extract company
-  const company = await trySelectors(page, SELECTORS.company) || 'Unknown Company';
-
-  // Extract location
-  const location = await trySelectors(page, SELECTORS.location) || '';
-
-  // Extract description - try selectors, then fallback to main content
-  let descriptionText = await trySelectorsForDescription(page, SELECTORS.description);
-
-  if (!descriptionText) {
-    // Fallback: try to get main article content
-    descriptionText = await page.$eval('article, main, [role="main"]', el => el?.textContent || '').catch(() => '');
-  }
-
-  // Clean description text
-  descriptionText = cleanDescriptionText(descriptionText);
-
-  // Extract apply URL
-  const applyUrl = await tryExtractApplyUrl(page);
-
-  return {
-    title: title.trim(),
-    company: company.trim(),
-    location: location.trim(),
-    descriptionText,
-    applyUrl
-  };
-}
+  const order = {} as Record<SelectorField, string[]>;
+  for (const field of SELECTOR_FIELDS) order[field] = orderedSelectors(field);
+
+  // Wait until a description is in the DOM rather than for a fixed pause
+  await page.waitForSelector(order.description.join(', '), {
+    state: 'attached',
+    timeout: Math.min(timeoutMs, EXTRACT_WAIT_MS)
+  }).catch(() => {});
+
+  const extracted: PageExtraction = await page.evaluate(({ order, showMore }) => {
+    const query = (selector: string): Element | null => {
+      try {
+        return document.querySelector(selector);
+      } catch {
+        return null;
+      }
+    };
 
-/**
- * Try to click "Show more" button to expand description
- */
-async function tryClickShowMore(page: Page): Promise<void> {
-  for (const selector of SELECTORS.showMore) {
-    try {
-      const button = await page.$(selector);
+    // Expand the description; textContent includes collapsed text anyway
+    for (const selector of showMore) {
+      const button = query(selector) as HTMLElement | null;
       if (button) {
-        await button.click();
-        await page.waitForTimeout(500);
-        return;
+        button.click();
+        break;
       }
-    } catch {
-      // Continue to next selector
     }
-  }
-}
 
-/**
- * Try multiple selectors and return first matching text
- */
-async function trySelectors(page: Page, selectors: string[]): Promise<string | null> {
-  for (const selector of selectors) {
-    try {
-      const text = await page.$eval(selector, el => el?.textContent || '');
-      if (text && text.trim()) {
-        return text.trim();
+    const pick = (selectors: string[], read: (el: Element) => string, minLength: number = 1) => {
+      const matched: string[] = [];
+      let value = '';
+      for (const selector of selectors) {
+        const el = query(selector);
+        const text = el ? read(el) : '';
+        if (text.trim().length >= minLength) {
+          matched.push(selector);
+          if (!value) value = text;
+        }
       }
-    } catch {
-      // Continue to next selector
+      return { value, matched };
+    };
+
+    // Text with line breaks preserved
+    const structuredText = (el: Element): string => {
+      const clone = el.cloneNode(true) as HTMLElement;
+      clone.querySelectorAll('br').forEach(br => br.replaceWith('\n'));
+      clone.querySelectorAll('p, div, li').forEach(block => block.prepend(document.createTextNode('\n')));
+      return clone.textContent || '';
+    };
+
+    const plainText = (el: Element): string => (el.textContent || '').trim();
+
+    const description = pick(order.description, structuredText, 51);
+    if (!description.value) {
+      // Fallback: main article content (not a tracked selector)
+      const main = query('article, main, [role="main"]');
+      description.value = main ? main.textContent || '' : '';
     }
-  }
-  return null;
-}
 
-/**
- * Try selectors specifically for description (preserves some structure)
- */
-async function trySelectorsForDescription(page: Page, selectors: string[]): Promise<string> {
-  for (const selector of selectors) {
-    try {
-      const text = await page.$eval(selector, el => {
-        if (!el) return '';
-        // Get text with line breaks preserved
-        const clone = el.cloneNode(true) as HTMLElement;
-        // Replace br tags with newlines
-        clone.querySelectorAll('br').forEach(br => br.replaceWith('\n'));
-        // Replace block elements with newlines
-        clone.querySelectorAll('p, div, li').forEach(block => {
-          block.prepend(document.createTextNode('\n'));
-        });
-        return clone.textContent || '';
-      });
-      if (text && text.trim().length > 50) {
-        return text;
+    const applyMatched: string[] = [];
+    let applyUrl: string | null = null;
+    for (const selector of order.applyButton) {
+      const href = (query(selector) as HTMLAnchorElement | null)?.href || '';
+      if (href.startsWith('http')) {
+        applyMatched.push(selector);
+        if (!applyUrl) applyUrl = href;
       }
-    } catch {
-      // Continue to next selector
     }
+
+    return {
+      fields: {
+        title: pick(order.title, plainText),
+        company: pick(order.company, plainText),
+        location: pick(order.location, plainText),
+        description
+      },
+      apply: { value: applyUrl, matched: applyMatched }
+    };
+  }, { order, showMore: SELECTORS.showMore });
+
+  for (const field of ['title', 'company', 'location', 'description'] as const) {
+    recordSelectorHits(field, order[field], extracted.fields[field].matched);
   }
-  return '';
+  recordSelectorHits('applyButton', order.applyButton, extracted.apply.matched);
+
+  return {
+    title: extracted.fields.title.value.trim() || 'Unknown Title',
+    company: extracted.fields.company.value.trim() || 'Unknown Company',
+    location: extracted.fields.location.value.trim(),
+    descriptionText: cleanDescriptionText(extracted.fields.description.value),
+    applyUrl: extracted.apply.value
+  };
 }
 
 /**
  * Try to extract apply URL
  */
 async function tryExtractApplyUrl(page: Page): Promise<string | null> {
-  for (const selector of SELECTORS.applyButton) {
+  for (const selector of orderedSelectors('applyButton')) {
     try {
       const href = await page.$eval(selector, el => (el as HTMLAnchorElement).href || '');
       if (href && href.startsWith('http')) {
@@ -489,27 +494,3 @@ async function tryExtractApplyUrl(page: Page): Promise<string | null> {
   }
   return null;
 }
-
-/**
- * Clean description text
- */
-function cleanDescriptionText(text: string): string {
-  if (!text) return '';
-
-  // Preserve line breaks but collapse excessive whitespace
-  let cleaned = text
-    .replace(/\r\n/g, '\n')
-    .replace(/\r/g, '\n')
-    .replace(/[ \t]+/g, ' ')           // Collapse horizontal whitespace
-    .replace(/\n[ \t]+/g, '\n')        // Remove leading whitespace on lines
-    .replace(/[ \t]+\n/g, '\n')        // Remove trailing whitespace on lines
-    .replace(/\n{3,}/g, '\n\n')        // Max 2 consecutive newlines
-    .trim();
-
-  // Truncate if too long
-  if (cleaned.length > MAX_DESCRIPTION_LENGTH) {
-    cleaned = cleaned.substring(0, MAX_DESCRIPTION_LENGTH) + '\n...[TRUNCATED]...';
-  }
-
-  return cleaned;
-}
@@ -0,0 +1,256 @@
+/**
+ * Job posting cache keyed by LinkedIn jobId
+ *
+ * - Successful fetches are kept for JOB_CACHE_TTL_MS.
+ * - Blocked results are negatively cached with a TTL per BlockReason
+ *   (JOB_CACHE_NEGATIVE_TTL_MS), so a posting that hit a login wall or
+ *   CAPTCHA is not retried against LinkedIn straight away. A TTL of 0 means
+ *   that reason is never cached.
+ * - Errors are never cached.
+ * - Concurrent requests for the same jobId share one in-flight fetch, which
+ *   is only aborted once every request waiting on it has gone away.
+ */
+
+import type { FetchResult, BlockReason } from './fetchLinkedIn';
+
+const CACHE_ENABLED = process.env.JOB_CACHE_ENABLED !== 'false';
+const CACHE_TTL_MS = parseInt(process.env.JOB_CACHE_TTL_MS || '21600000', 10);
+const CACHE_MAX_ENTRIES = parseInt(process.env.JOB_CACHE_MAX_ENTRIES || '1000', 10);
+const CACHE_MAX_BYTES = parseInt(process.env.JOB_CACHE_MAX_BYTES || String(64 * 1024 * 1024), 10);
+
+// Transient reasons are not cached; walls and challenges are held back longer
+const DEFAULT_NEGATIVE_TTL_MS: Record<BlockReason, number> = {
+  LOGIN_REQUIRED: 10 * 60 * 1000,
+  CAPTCHA: 30 * 60 * 1000,
+  RATE_LIMIT: 15 * 60 * 1000,
+  SELECTOR_TIMEOUT: 0,
+  UNKNOWN: 0
+};
+
+export type CacheStatus = 'HIT' | 'MISS' | 'COALESCED' | 'BYPASS';
+
+export interface CacheInfo {
+  status: CacheStatus;
+  negative: boolean;
+  ageMs: number;
+  ttlMs: number;
+}
+
+interface Flight {
+  promise: Promise<FetchResult>;
+  controller: AbortController;
+  waiters: number;
+}
+
+interface CacheEntry {
+  result: FetchResult;
+  bytes: number;
+  storedAt: number;
+  expiresAt: number;
+}
+
+/**
+ * Parse "LOGIN_REQUIRED=600000,CAPTCHA=0" over the defaults
+ */
+function parseNegativeTtls(spec: string | undefined): Record<BlockReason, number> {
+  const ttls = { ...DEFAULT_NEGATIVE_TTL_MS };
+  for (const part of (spec || '').split(',')) {
+    const [reason, value] = part.split('=').map(s => s.trim());
+    if (reason in ttls && value !== undefined && !isNaN(parseInt(value, 10))) {
+      ttls[reason as BlockReason] = parseInt(value, 10);
+    }
+  }
+  return ttls;
+}
+
+const NEGATIVE_TTL_MS = parseNegativeTtls(process.env.JOB_CACHE_NEGATIVE_TTL_MS);
+
+// Map iteration order is insertion order: re-inserting on read keeps the
+// least recently used entry at the front, so eviction is O(1).
+const store = new Map<string, CacheEntry>();
+const inFlight = new Map<string, Flight>();
+let totalBytes = 0;
+
+const counters = {
+  hits: 0,
+  negativeHits: 0,
+  misses: 0,
+  coalesced: 0,
+  bypasses: 0,
+  evictions: 0,
+  expirations: 0
+};
+
+/**
+ * TTL for a result, 0 when it must not be cached
+ */
+function ttlFor(result: FetchResult): number {
+  if (result.ok) return CACHE_TTL_MS;
+  if (result.blocked) return NEGATIVE_TTL_MS[result.reason] || 0;
+  return 0;
+}
+
+function isNegative(result: FetchResult): boolean {
+  return !result.ok && result.blocked;
+}
+
+function remove(key: string, entry: CacheEntry): void {
+  store.delete(key);
+  totalBytes -= entry.bytes;
+}
+
+function lookup(key: string): CacheEntry | null {
+  const entry = store.get(key);
+  if (!entry) return null;
+
+  if (entry.expiresAt < Date.now()) {
+    remove(key, entry);
+    counters.expirations++;
+    return null;
+  }
+
+  // Mark as most recently used
+  store.delete(key);
+  store.set(key, entry);
+  return entry;
+}
+
+function save(key: string, result: FetchResult): void {
+  const ttlMs = ttlFor(result);
+  if (ttlMs <= 0) return;
+
+  const bytes = Buffer.byteLength(JSON.stringify(result), 'utf-8');
+  if (bytes > CACHE_MAX_BYTES) return;
+
+  const existing = store.get(key);
+  if (existing) remove(key, existing);
+
+  const now = Date.now();
+  store.set(key, { result, bytes, storedAt: now, expiresAt: now + ttlMs });
+  totalBytes += bytes;
+
+  // Evict least recently used entries until within bounds
+  while (store.size > CACHE_MAX_ENTRIES || totalBytes > CACHE_MAX_BYTES) {
+    const oldestKey = store.keys().next().value as string;
+    remove(oldestKey, store.get(oldestKey) as CacheEntry);
+    counters.evictions++;
+  }
+}
+
+/**
+ * Copy of the result with debug.cache set (cached objects are never mutated)
+ */
+function withCacheInfo(result: FetchResult, cache: CacheInfo): FetchResult {
+  return { ...result, debug: { ...(('debug' in result && result.debug) || {}), cache } } as FetchResult;
+}
+
+/**
+ * Count a request as waiting on the flight; abort the fetch when the last
+ * request with a signal is aborted (requests without one always stay)
+ */
+function join(flight: Flight, signal?: AbortSignal): void {
+  if (signal?.aborted) {
+    // Gone before it joined: its abort event already fired and never will again
+    if (flight.waiters === 0) flight.controller.abort();
+    return;
+  }
+  flight.waiters++;
+  signal?.addEventListener('abort', () => {
+    if (--flight.waiters === 0) flight.controller.abort();
+  }, { once: true });
+}
+
+/**
+ * Return the cached result for jobId, join an in-flight fetch for it, or run
+ * fetcher once and cache its result. bypass skips the lookup but still
+ * refreshes the cache. fetcher receives a signal that fires once every
+ * request waiting on it has been aborted.
+ */
+export async function getOrFetch(
+  jobId: string,
+  fetcher: (signal: AbortSignal) => Promise<FetchResult>,
+  bypass: boolean = false,
+  signal?: AbortSignal
+): Promise<{ result: FetchResult; cache: CacheInfo }> {
+  if (!CACHE_ENABLED) {
+    const result = await fetcher(signal || new AbortController().signal);
+    const cache: CacheInfo = { status: 'BYPASS', negative: false, ageMs: 0, ttlMs: 0 };
+    return { result: withCacheInfo(result, cache), cache };
+  }
+
+  if (!bypass) {
+    const entry = lookup(jobId);
+    if (entry) {
+      const negative = isNegative(entry.result);
+      counters.hits++;
+      if (negative) counters.negativeHits++;
+      const cache: CacheInfo = {
+        status: 'HIT',
+        negative,
+        ageMs: Date.now() - entry.storedAt,
+        ttlMs: entry.expiresAt - entry.storedAt
+      };
+      return { result: withCacheInfo(entry.result, cache), cache };
+    }
+
+    // A flight whose requests were all aborted is being cancelled: start a fresh one
+    const pending = inFlight.get(jobId);
+    if (pending && !pending.controller.signal.aborted) {
+      counters.coalesced++;
+      join(pending, signal);
+      const result = await pending.promise;
+      const cache: CacheInfo = { status: 'COALESCED', negative: isNegative(result), ageMs: 0, ttlMs: ttlFor(result) };
+      return { result: withCacheInfo(result, cache), cache };
+    }
+  }
+
+  if (bypass) counters.bypasses++;
+  else counters.misses++;
+
+  const controller = new AbortController();
+  const flight: Flight = {
+    controller,
+    waiters: 0,
+    promise: fetcher(controller.signal).then(result => {
+      save(jobId, result);
+      return result;
+    })
+  };
+  join(flight, signal);
+  inFlight.set(jobId, flight);
+  try {
+    const result = await flight.promise;
+    const cache: CacheInfo = {
+      status: bypass ? 'BYPASS' : 'MISS',
+      negative: isNegative(result),
+      ageMs: 0,
+      ttlMs: ttlFor(result)
+    };
+    return { result: withCacheInfo(result, cache), cache };
+  } finally {
+    if (inFlight.get(jobId) === flight) inFlight.delete(jobId);
+  }
+}
+
+export function clearJobCache(): number {
+  const cleared = store.size;
+  store.clear();
+  totalBytes = 0;
+  return cleared;
+}
+
+export function getJobCacheStats() {
+  const lookups = counters.hits + counters.misses + counters.coalesced;
+  return {
+    enabled: CACHE_ENABLED,
+    entries: store.size,
+    bytes: totalBytes,
+    inFlight: inFlight.size,
+    maxEntries: CACHE_MAX_ENTRIES,
+    maxBytes: CACHE_MAX_BYTES,
+    ttlMs: CACHE_TTL_MS,
+    negativeTtlMs: NEGATIVE_TTL_MS,
+    ...counters,
+    hitRate: lookups > 0 ? Math.round(((counters.hits + counters.coalesced) / lookups) * 1000) / 1000 : 0
+  };
+}
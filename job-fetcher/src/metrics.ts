@@ -0,0 +1,240 @@
+/**
+ * Prometheus metrics for GET /metrics
+ *
+ * Fetch phase timings and outcomes are recorded as fetches finish; queue
+ * wait, browser, cache and memory figures are read from their modules at
+ * scrape time. Rendered in the Prometheus text format (0.0.4), no client
+ * library needed.
+ */
+
+import { getCurrentConcurrency, getMaxConcurrency, getSchedulerStats, WAIT_BUCKETS_MS } from './concurrency';
+import { getPoolStats, getBrowserRss } from './browserPool';
+import { getJobCacheStats } from './jobCache';
+import { getSelectorStats } from './selectorStats';
+import type { FetchResult, FetchTier } from './fetchLinkedIn';
+import type { NetworkSummary } from './networkProfile';
+
+// Upper bounds for fetch phase histograms, in seconds
+const PHASE_BUCKETS_S = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60];
+
+type Labels = Record<string, string>;
+
+function formatLabels(labels: Labels): string {
+  const parts = Object.entries(labels).map(([k, v]) => `${k}="${v.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n')}"`);
+  return parts.length ? `{${parts.join(',')}}` : '';
+}
+
+function header(name: string, help: string, type: string): string[] {
+  return [`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`];
+}
+
+class Counter {
+  private values = new Map<string, { labels: Labels; value: number }>();
+  readonly name: string;
+  readonly help: string;
+
+  constructor(name: string, help: string) {
+    this.name = name;
+    this.help = help;
+  }
+
+  inc(labels: Labels = {}, by: number = 1): void {
+    const key = formatLabels(labels);
+    const entry = this.values.get(key);
+    if (entry) entry.value += by;
+    else this.values.set(key, { labels, value: by });
+  }
+
+  render(): string[] {
+    const lines = header(this.name, this.help, 'counter');
+    for (const [key, { value }] of this.values) lines.push(`${this.name}${key} ${value}`);
+    return lines;
+  }
+}
+
+interface HistogramSeries {
+  labels: Labels;
+  /** Per-bucket (not cumulative) counts, plus one for +Inf */
+  counts: number[];
+  sum: number;
+  count: number;
+}
+
+class Histogram {
+  private series = new Map<string, HistogramSeries>();
+  readonly name: string;
+  readonly help: string;
+  readonly buckets: number[];
+
+  constructor(name: string, help: string, buckets: number[]) {
+    this.name = name;
+    this.help = help;
+    this.buckets = buckets;
+  }
+
+  observe(labels: Labels, value: number): void {
+    const key = formatLabels(labels);
+    let series = this.series.get(key);
+    if (!series) {
+      series = { labels, counts: new Array(this.buckets.length + 1).fill(0), sum: 0, count: 0 };
+      this.series.set(key, series);
+    }
+    let bucket = this.buckets.findIndex(le => value <= le);
+    if (bucket === -1) bucket = this.buckets.length;
+    series.counts[bucket]++;
+    series.sum += value;
+    series.count++;
+  }
+
+  render(): string[] {
+    const lines = header(this.name, this.help, 'histogram');
+    for (const series of this.series.values()) {
+      lines.push(...renderHistogram(this.name, series.labels, this.buckets, series.counts, series.sum, series.count));
+    }
+    return lines;
+  }
+}
+
+function renderHistogram(name: string, labels: Labels, buckets: number[], counts: number[],
+                         sum: number, count: number): string[] {
+  const lines: string[] = [];
+  let cumulative = 0;
+  buckets.forEach((le, i) => {
+    cumulative += counts[i];
+    lines.push(`${name}_bucket${formatLabels({ ...labels, le: String(le) })} ${cumulative}`);
+  });
+  lines.push(`${name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${count}`);
+  lines.push(`${name}_sum${formatLabels(labels)} ${sum}`);
+  lines.push(`${name}_count${formatLabels(labels)} ${count}`);
+  return lines;
+}
+
+function gauge(name: string, help: string, values: [Labels, number][]): string[] {
+  return [...header(name, help, 'gauge'), ...values.map(([labels, v]) => `${name}${formatLabels(labels)} ${v}`)];
+}
+
+const fetchPhaseSeconds = new Histogram(
+  'job_fetcher_fetch_phase_seconds',
+  'Time spent in each phase of a LinkedIn fetch (acquire, launch, goto, extract), by tier.',
+  PHASE_BUCKETS_S
+);
+const fetchesTotal = new Counter('job_fetcher_fetches_total', 'LinkedIn fetches by tier and outcome (ok, blocked, error).');
+const blockedTotal = new Counter('job_fetcher_blocked_total', 'Blocked LinkedIn fetches by tier and BlockReason.');
+const httpRequestsTotal = new Counter('job_fetcher_http_requests_total', 'HTTP responses by method, route and status.');
+const networkRequestsTotal = new Counter(
+  'job_fetcher_network_requests_total',
+  'Browser sub-requests by action (allowed, blocked) and the rule that blocked them.'
+);
+const networkBytesTotal = new Counter('job_fetcher_network_bytes_total', 'Response body bytes loaded by browser fetches.');
+
+export type FetchPhase = 'acquire' | 'launch' | 'goto' | 'extract';
+
+/**
+ * Record the phases a fetch went through, in ms (queue wait is tracked by the scheduler)
+ */
+export function observeFetchPhases(phases: Partial<Record<FetchPhase, number>>, tier: FetchTier): void {
+  for (const [phase, ms] of Object.entries(phases)) {
+    if (ms !== undefined) fetchPhaseSeconds.observe({ tier, phase }, ms / 1000);
+  }
+}
+
+/**
+ * Count a fetch that reached LinkedIn (cache hits are not fetches)
+ */
+export function observeFetchResult(result: FetchResult, tier: FetchTier): void {
+  if (result.ok) {
+    fetchesTotal.inc({ tier, outcome: 'ok' });
+  } else if (result.blocked) {
+    fetchesTotal.inc({ tier, outcome: 'blocked' });
+    blockedTotal.inc({ tier, reason: result.reason });
+  } else {
+    fetchesTotal.inc({ tier, outcome: 'error' });
+  }
+}
+
+/**
+ * Count the sub-requests a browser fetch let through or blocked
+ */
+export function observeNetwork(network: NetworkSummary): void {
+  networkRequestsTotal.inc({ action: 'allowed' }, network.allowed);
+  for (const [reason, count] of Object.entries(network.blockedBy)) {
+    if (count > 0) networkRequestsTotal.inc({ action: 'blocked', reason }, count);
+  }
+  networkBytesTotal.inc({}, network.bytesLoaded);
+}
+
+/**
+ * Count an HTTP response; route is the matched Express path, not the raw URL
+ */
+export function observeHttpResponse(method: string, route: string, status: number): void {
+  httpRequestsTotal.inc({ method, route, status: String(status) });
+}
+
+function queueWaitMetrics(): string[] {
+  const name = 'job_fetcher_queue_wait_seconds';
+  const lines = header(name, 'Time spent waiting for a concurrency slot, by priority class.', 'histogram');
+  const stats = getSchedulerStats() as Record<string, {
+    waitMs: { buckets: Record<string, number>; sum: number; count: number };
+  }>;
+  for (const [priority, s] of Object.entries(stats)) {
+    // Scheduler buckets are cumulative and keyed by ms; turn them back into per-bucket counts
+    let previous = 0;
+    const counts = WAIT_BUCKETS_MS.map(le => {
+      const cumulative = s.waitMs.buckets[String(le)];
+      const count = cumulative - previous;
+      previous = cumulative;
+      return count;
+    });
+    lines.push(...renderHistogram(name, { priority }, WAIT_BUCKETS_MS.map(ms => ms / 1000), counts,
+                                  s.waitMs.sum / 1000, s.waitMs.count));
+  }
+  return lines;
+}
+
+/**
+ * Everything, in the Prometheus text exposition format
+ */
+export function renderMetrics(): string {
+  const pool = getPoolStats();
+  const cache = getJobCacheStats();
+  const scheduler = getSchedulerStats() as Record<string, { queued: number; timeouts: number; aborted: number }>;
+  const browserRss = getBrowserRss();
+  const selectors = getSelectorStats().fields;
+
+  const lines = [
+    ...fetchPhaseSeconds.render(),
+    ...queueWaitMetrics(),
+    ...fetchesTotal.render(),
+    ...blockedTotal.render(),
+    ...httpRequestsTotal.render(),
+    ...networkRequestsTotal.render(),
+    ...networkBytesTotal.render(),
+    ...gauge('job_fetcher_concurrency_in_use', 'Concurrency slots in use.', [[{}, getCurrentConcurrency()]]),
+    ...gauge('job_fetcher_concurrency_max', 'Concurrency slots available (MAX_CONCURRENCY).', [[{}, getMaxConcurrency()]]),
+    ...gauge('job_fetcher_queue_length', 'Requests waiting for a concurrency slot, by priority class.',
+             Object.entries(scheduler).map(([priority, s]) => [{ priority }, s.queued] as [Labels, number])),
+    ...header('job_fetcher_queue_dropped_total', 'Requests dropped from the concurrency queue, by priority class and reason.', 'counter'),
+    ...Object.entries(scheduler).flatMap(([priority, s]) => [
+      `job_fetcher_queue_dropped_total${formatLabels({ priority, reason: 'timeout' })} ${s.timeouts}`,
+      `job_fetcher_queue_dropped_total${formatLabels({ priority, reason: 'aborted' })} ${s.aborted}`
+    ]),
+    ...gauge('job_fetcher_browsers', 'Live pooled browsers by state.',
+             [[{ state: 'leased' }, pool.leased], [{ state: 'idle' }, pool.idle]]),
+    ...header('job_fetcher_browser_launches_total', 'Browser launches since start.', 'counter'),
+    `job_fetcher_browser_launches_total ${pool.launches}`,
+    ...gauge('job_fetcher_cache_entries', 'Job postings in the cache.', [[{}, cache.entries]]),
+    ...header('job_fetcher_cache_lookups_total', 'Job cache lookups by result.', 'counter'),
+    `job_fetcher_cache_lookups_total{result="hit"} ${cache.hits}`,
+    `job_fetcher_cache_lookups_total{result="miss"} ${cache.misses}`,
+    `job_fetcher_cache_lookups_total{result="coalesced"} ${cache.coalesced}`,
+    ...gauge('job_fetcher_selector_hit_ratio', 'Share of extractions in which each candidate selector matched.',
+             Object.entries(selectors).flatMap(([field, entries]) =>
+               entries.map(e => [{ field, selector: e.selector }, e.hitRate] as [Labels, number]))),
+    ...gauge('job_fetcher_process_resident_memory_bytes', 'Resident memory of the Node.js process.',
+             [[{}, process.memoryUsage().rss]]),
+    ...(browserRss === null ? [] : gauge('job_fetcher_browser_resident_memory_bytes',
+                                         'Resident memory of all pooled browser process trees (Linux only).',
+                                         [[{}, browserRss]]))
+  ];
+  return lines.join('\n') + '\n';
+}
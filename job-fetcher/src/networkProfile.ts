@@ -0,0 +1,127 @@
+/**
+ * Request interception profile for browser fetches
+ *
+ * Installed on each fetch's BrowserContext. With NETWORK_PROFILE=lean
+ * (default) it aborts:
+ * - resource types we never read (NETWORK_BLOCK_TYPES: images, fonts, media...)
+ * - requests to hosts outside NETWORK_FIRST_PARTY (ads, analytics, embeds)
+ * - first-party tracking endpoints matching NETWORK_BLOCK_PATTERNS
+ * Anything matching NETWORK_ALLOWLIST (host suffix or URL substring) is
+ * always let through. NETWORK_PROFILE=off only counts.
+ *
+ * Blocked requests are never downloaded, so only their count is known; bytes
+ * are counted for what was actually loaded.
+ */
+
+import type { BrowserContext, Request, Route } from 'playwright';
+
+const parseList = (value: string | undefined, fallback: string): string[] =>
+  (value ?? fallback).split(',').map(s => s.trim()).filter(Boolean);
+
+const PROFILE = process.env.NETWORK_PROFILE === 'off' ? 'off' : 'lean';
+const BLOCK_TYPES = new Set(parseList(process.env.NETWORK_BLOCK_TYPES, 'image,media,font,stylesheet,texttrack,manifest'));
+const BLOCK_THIRD_PARTY = process.env.NETWORK_BLOCK_THIRD_PARTY !== 'false';
+const FIRST_PARTY = parseList(process.env.NETWORK_FIRST_PARTY, 'linkedin.com,licdn.com');
+const BLOCK_PATTERNS = parseList(
+  process.env.NETWORK_BLOCK_PATTERNS,
+  '/li/track,/tscp-serving/,/realtime/,/sensorCollect,px.ads.linkedin.com,/platform-telemetry'
+);
+const ALLOWLIST = parseList(process.env.NETWORK_ALLOWLIST, '');
+
+export type BlockRule = 'type' | 'thirdParty' | 'pattern';
+
+export interface NetworkSummary {
+  profile: 'lean' | 'off';
+  allowed: number;
+  blocked: number;
+  blockedBy: Record<BlockRule, number>;
+  /** Blocked requests per resource type */
+  blockedTypes: Record<string, number>;
+  /** Response body bytes of the requests that were loaded */
+  bytesLoaded: number;
+}
+
+export interface NetworkTracker {
+  /** Counts so far for this fetch; waits for pending size lookups */
+  summary: () => Promise<NetworkSummary>;
+}
+
+function hostMatches(host: string, domain: string): boolean {
+  return host === domain || host.endsWith(`.${domain}`);
+}
+
+/**
+ * Rule that blocks a request, or null to let it through
+ */
+export function blockRule(url: string, resourceType: string): BlockRule | null {
+  let host = '';
+  try {
+    host = new URL(url).hostname;
+  } catch {
+    return null;
+  }
+  // data: and blob: URLs never hit the network
+  if (!host) return null;
+  if (ALLOWLIST.some(entry => hostMatches(host, entry) || url.includes(entry))) return null;
+  if (BLOCK_TYPES.has(resourceType)) return 'type';
+  if (BLOCK_THIRD_PARTY && !FIRST_PARTY.some(domain => hostMatches(host, domain))) return 'thirdParty';
+  if (BLOCK_PATTERNS.some(pattern => url.includes(pattern))) return 'pattern';
+  return null;
+}
+
+/**
+ * Route every request of the context through the profile and count the outcome
+ */
+export async function applyNetworkProfile(context: BrowserContext): Promise<NetworkTracker> {
+  const summary: NetworkSummary = {
+    profile: PROFILE,
+    allowed: 0,
+    blocked: 0,
+    blockedBy: { type: 0, thirdParty: 0, pattern: 0 },
+    blockedTypes: {},
+    bytesLoaded: 0
+  };
+  const sizeLookups: Promise<void>[] = [];
+
+  await context.route('**/*', (route: Route) => {
+    const request = route.request();
+    const rule = PROFILE === 'lean' ? blockRule(request.url(), request.resourceType()) : null;
+    if (rule) {
+      summary.blocked++;
+      summary.blockedBy[rule]++;
+      summary.blockedTypes[request.resourceType()] = (summary.blockedTypes[request.resourceType()] || 0) + 1;
+      route.abort('blockedbyclient').catch(() => {});
+    } else {
+      summary.allowed++;
+      route.continue().catch(() => {});
+    }
+  });
+
+  context.on('requestfinished', (request: Request) => {
+    sizeLookups.push(
+      request.sizes()
+        .then(sizes => {
+          summary.bytesLoaded += sizes.responseBodySize;
+        })
+        .catch(() => {})
+    );
+  });
+
+  return {
+    summary: async () => {
+      await Promise.all(sizeLookups);
+      return { ...summary, blockedBy: { ...summary.blockedBy }, blockedTypes: { ...summary.blockedTypes } };
+    }
+  };
+}
+
+export function getNetworkProfile() {
+  return {
+    profile: PROFILE,
+    blockTypes: [...BLOCK_TYPES],
+    blockThirdParty: BLOCK_THIRD_PARTY,
+    firstParty: FIRST_PARTY,
+    blockPatterns: BLOCK_PATTERNS,
+    allowlist: ALLOWLIST
+  };
+}
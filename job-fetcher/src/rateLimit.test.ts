@@ -0,0 +1,30 @@
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import { capacityExceededBody, checkRateLimit, getRateLimitStats, retryAfterBody } from './rateLimit';
+
+const capacity = getRateLimitStats().max;
+
+test('a batch the bucket can hold is not rejected up front', () => {
+  assert.equal(capacityExceededBody(1), null);
+  assert.equal(capacityExceededBody(capacity), null);
+});
+
+test('a batch above the bucket size is rejected with BATCH_EXCEEDS_RATE_LIMIT', () => {
+  const body = capacityExceededBody(capacity + 1);
+  assert.ok(body);
+  assert.equal(body.ok, false);
+  assert.equal(body.error, 'BATCH_EXCEEDS_RATE_LIMIT');
+  assert.match(body.message, new RegExp(`At most ${capacity} `));
+});
+
+test('the bucket refuses an oversized request without spending and never asks for a retry', async () => {
+  const result = await checkRateLimit('203.0.113.7', capacity + 1);
+  assert.equal(result.allowed, false);
+  assert.equal(result.remaining, capacity);
+  assert.equal(result.retryAt, null);
+  assert.deepEqual(retryAfterBody(result), { retryable: false });
+
+  const next = await checkRateLimit('203.0.113.7', capacity);
+  assert.equal(next.allowed, true);
+  assert.equal(next.remaining, 0);
+});
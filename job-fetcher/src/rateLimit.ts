@@ -1,64 +1,204 @@
 /**
- * In-memory rate limiter per IP
+ * Token-bucket rate limiter per IP
+ *
+ * Each IP has a bucket of RATE_LIMIT_MAX tokens that refills at
+ * RATE_LIMIT_MAX per RATE_LIMIT_WINDOW_MS; a request spends one token per
+ * posting. Buckets live in a pluggable store:
+ * - memory (default): per process. A bucket untouched for a full refill
+ *   period is the same as a fresh one, so entries expire a fixed time after
+ *   their last use and are dropped from the front of an insertion-ordered Map
+ *   (O(1) amortised, no sweep over every key).
+ * - redis (RATE_LIMIT_REDIS_URL): shared by every replica behind a load
+ *   balancer. The bucket update runs as one Lua script on the server, using
+ *   the server clock, and keys expire via PEXPIRE.
+ *
+ * If Redis is unreachable the in-memory store is used for that request, so
+ * limits degrade to per-replica instead of failing requests.
  */
 
-interface RateLimitEntry {
-  count: number;
-  resetAt: number;
-}
-
-const store = new Map<string, RateLimitEntry>();
+import { createHash } from 'crypto';
+import { RedisClient } from './redis';
 
 const RATE_LIMIT_MAX = parseInt(process.env.RATE_LIMIT_MAX || '30', 10);
 const RATE_LIMIT_WINDOW_MS = parseInt(process.env.RATE_LIMIT_WINDOW_MS || '600000', 10);
+const RATE_LIMIT_REDIS_URL = process.env.RATE_LIMIT_REDIS_URL || '';
+const RATE_LIMIT_REDIS_PREFIX = process.env.RATE_LIMIT_REDIS_PREFIX || 'job-fetcher:ratelimit:';
 
-// Cleanup old entries periodically
-setInterval(() => {
-  const now = Date.now();
-  for (const [key, entry] of store.entries()) {
-    if (entry.resetAt < now) {
-      store.delete(key);
-    }
-  }
-}, 60000); // Cleanup every minute
+const REFILL_PER_MS = RATE_LIMIT_MAX / RATE_LIMIT_WINDOW_MS;
+// Time for an empty bucket to fill up; an idle bucket can be forgotten after this
+const FULL_REFILL_MS = RATE_LIMIT_WINDOW_MS;
 
 export interface RateLimitResult {
   allowed: boolean;
   remaining: number;
+  /** When the bucket is full again (epoch ms) */
   resetAt: number;
+  /**
+   * When enough tokens for this request will be available (epoch ms); null
+   * when the request costs more than the bucket holds and can never pass
+   */
+  retryAt: number | null;
 }
 
-export function checkRateLimit(ip: string): RateLimitResult {
-  const now = Date.now();
-  const key = ip || 'unknown';
+interface BucketState {
+  allowed: boolean;
+  /** Tokens left after this request */
+  tokens: number;
+}
+
+export interface RateLimitStore {
+  readonly name: string;
+  take(key: string, cost: number): Promise<BucketState>;
+}
+
+/**
+ * Refill a bucket for the time since its last update, then try to spend cost
+ */
+function spend(tokens: number, updatedAt: number, now: number, cost: number): BucketState {
+  const refilled = Math.min(RATE_LIMIT_MAX, tokens + Math.max(0, now - updatedAt) * REFILL_PER_MS);
+  if (refilled >= cost) return { allowed: true, tokens: refilled - cost };
+  return { allowed: false, tokens: refilled };
+}
+
+interface MemoryBucket {
+  tokens: number;
+  updatedAt: number;
+}
+
+export class MemoryStore implements RateLimitStore {
+  readonly name = 'memory';
+  // Re-inserted on every update, so the front is always the stalest bucket
+  private buckets = new Map<string, MemoryBucket>();
 
-  let entry = store.get(key);
+  async take(key: string, cost: number): Promise<BucketState> {
+    const now = Date.now();
+    this.expire(now);
+
+    const bucket = this.buckets.get(key);
+    const state = bucket
+      ? spend(bucket.tokens, bucket.updatedAt, now, cost)
+      : spend(RATE_LIMIT_MAX, now, now, cost);
+
+    this.buckets.delete(key);
+    this.buckets.set(key, { tokens: state.tokens, updatedAt: now });
+    return state;
+  }
 
-  // Create new entry or reset if window expired
-  if (!entry || entry.resetAt < now) {
-    entry = {
-      count: 0,
-      resetAt: now + RATE_LIMIT_WINDOW_MS
-    };
-    store.set(key, entry);
+  private expire(now: number): void {
+    for (const [key, bucket] of this.buckets) {
+      if (now - bucket.updatedAt < FULL_REFILL_MS) break;
+      this.buckets.delete(key);
+    }
   }
 
-  // Check if limit exceeded
-  if (entry.count >= RATE_LIMIT_MAX) {
-    return {
-      allowed: false,
-      remaining: 0,
-      resetAt: entry.resetAt
-    };
+  get size(): number {
+    return this.buckets.size;
   }
+}
+
+// KEYS[1] bucket; ARGV capacity, refill per ms, cost, ttl ms.
+// Returns {allowed, tokens} with tokens as a string (Lua numbers are truncated in replies).
+const TOKEN_BUCKET_SCRIPT = `-- job-fetcher:token-bucket
+local capacity = tonumber(ARGV[1])
+local refill_per_ms = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_per_ms)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+`;
+
+const TOKEN_BUCKET_SHA = createHash('sha1').update(TOKEN_BUCKET_SCRIPT).digest('hex');
 
-  // Increment counter
-  entry.count++;
+export class RedisStore implements RateLimitStore {
+  readonly name = 'redis';
+  private client: RedisClient;
+  private prefix: string;
 
+  constructor(client: RedisClient, prefix: string = RATE_LIMIT_REDIS_PREFIX) {
+    this.client = client;
+    this.prefix = prefix;
+  }
+
+  async take(key: string, cost: number): Promise<BucketState> {
+    const args = [1, this.prefix + key, RATE_LIMIT_MAX, REFILL_PER_MS, cost, FULL_REFILL_MS];
+    let reply;
+    try {
+      reply = await this.client.command(['EVALSHA', TOKEN_BUCKET_SHA, ...args]);
+    } catch (err) {
+      if (!(err instanceof Error) || !err.message.startsWith('NOSCRIPT')) throw err;
+      // First use on this server (or after SCRIPT FLUSH): EVAL also caches it
+      reply = await this.client.command(['EVAL', TOKEN_BUCKET_SCRIPT, ...args]);
+    }
+    const [allowed, tokens] = reply as [number, string];
+    return { allowed: allowed === 1, tokens: parseFloat(tokens) };
+  }
+}
+
+const memoryStore = new MemoryStore();
+const redisStore = RATE_LIMIT_REDIS_URL ? new RedisStore(new RedisClient(RATE_LIMIT_REDIS_URL)) : null;
+
+const counters = {
+  redisErrors: 0,
+  fallbacks: 0
+};
+let lastRedisError = 0;
+
+async function take(key: string, cost: number): Promise<BucketState> {
+  if (!redisStore) return memoryStore.take(key, cost);
+  try {
+    return await redisStore.take(key, cost);
+  } catch (err) {
+    counters.redisErrors++;
+    counters.fallbacks++;
+    // Log at most once a minute while Redis is down
+    if (Date.now() - lastRedisError > 60000) {
+      lastRedisError = Date.now();
+      console.warn(`[rateLimit] Redis unavailable, using in-memory limits: ${err instanceof Error ? err.message : err}`);
+    }
+    return memoryStore.take(key, cost);
+  }
+}
+
+/**
+ * Spend `cost` tokens from the IP's bucket (a batch costs one per posting)
+ */
+export async function checkRateLimit(ip: string, cost: number = 1): Promise<RateLimitResult> {
+  const state = await take(ip || 'unknown', cost);
+  const now = Date.now();
+  let retryAt: number | null = now;
+  if (!state.allowed) {
+    // A full bucket still would not cover it, so no wait makes it fit
+    retryAt = cost > RATE_LIMIT_MAX ? null : now + Math.ceil((cost - state.tokens) / REFILL_PER_MS);
+  }
   return {
-    allowed: true,
-    remaining: RATE_LIMIT_MAX - entry.count,
-    resetAt: entry.resetAt
+    allowed: state.allowed,
+    remaining: Math.floor(state.tokens),
+    resetAt: now + Math.ceil((RATE_LIMIT_MAX - state.tokens) / REFILL_PER_MS),
+    retryAt
+  };
+}
+
+/**
+ * 400 body for a request costing more than the bucket holds (no wait would
+ * ever let it through), or null when it can fit
+ */
+export function capacityExceededBody(cost: number): { ok: false; error: 'BATCH_EXCEEDS_RATE_LIMIT'; message: string } | null {
+  if (cost <= RATE_LIMIT_MAX) return null;
+  return {
+    ok: false,
+    error: 'BATCH_EXCEEDS_RATE_LIMIT',
+    message: `At most ${RATE_LIMIT_MAX} unique postings per batch (RATE_LIMIT_MAX); split the batch`
   };
 }
 
@@ -69,3 +209,22 @@ export function getRateLimitHeaders(result: RateLimitResult): Record<string, str
     'X-RateLimit-Reset': String(Math.ceil(result.resetAt / 1000))
   };
 }
+
+/**
+ * Retry fields for a 429 body: seconds until the request fits, or
+ * retryable: false when it never will
+ */
+export function retryAfterBody(result: RateLimitResult): { retryAfter: number } | { retryable: false } {
+  if (result.retryAt === null) return { retryable: false };
+  return { retryAfter: Math.ceil((result.retryAt - Date.now()) / 1000) };
+}
+
+export function getRateLimitStats() {
+  return {
+    backend: redisStore ? redisStore.name : memoryStore.name,
+    max: RATE_LIMIT_MAX,
+    windowMs: RATE_LIMIT_WINDOW_MS,
+    localBuckets: memoryStore.size,
+    ...counters
+  };
+}
@@ -0,0 +1,179 @@
+/**
+ * Minimal Redis client (RESP2 over one pipelined TCP connection)
+ *
+ * Enough for the shared rate-limit store without pulling in a driver:
+ * commands are written as soon as they are issued and replies are matched in
+ * order. The connection is opened lazily, AUTH/SELECT are taken from the URL
+ * (redis://[:password@]host[:port][/db]) and a dropped connection fails the
+ * pending commands and is reopened on the next one.
+ */
+
+import { Socket, connect } from 'net';
+
+const REDIS_TIMEOUT_MS = parseInt(process.env.RATE_LIMIT_REDIS_TIMEOUT_MS || '500', 10);
+
+export type RedisValue = string | number | null | RedisValue[];
+
+interface Pending {
+  resolve: (value: RedisValue) => void;
+  reject: (err: Error) => void;
+}
+
+/**
+ * Encode a command as a RESP array of bulk strings
+ */
+function encode(args: (string | number)[]): Buffer {
+  const parts = [`*${args.length}\r\n`];
+  for (const arg of args) {
+    const value = String(arg);
+    parts.push(`$${Buffer.byteLength(value)}\r\n${value}\r\n`);
+  }
+  return Buffer.from(parts.join(''));
+}
+
+/**
+ * Parse one reply at offset; null when the buffer does not hold all of it yet.
+ * Error replies are returned as Error values.
+ */
+function parse(buf: Buffer, offset: number): [RedisValue | Error, number] | null {
+  const lineEnd = buf.indexOf('\r\n', offset);
+  if (lineEnd === -1) return null;
+  const type = String.fromCharCode(buf[offset]);
+  const line = buf.toString('utf8', offset + 1, lineEnd);
+  const next = lineEnd + 2;
+
+  switch (type) {
+    case '+':
+      return [line, next];
+    case '-':
+      return [new Error(line), next];
+    case ':':
+      return [parseInt(line, 10), next];
+    case '$': {
+      const length = parseInt(line, 10);
+      if (length === -1) return [null, next];
+      if (buf.length < next + length + 2) return null;
+      return [buf.toString('utf8', next, next + length), next + length + 2];
+    }
+    case '*': {
+      const count = parseInt(line, 10);
+      if (count === -1) return [null, next];
+      const items: RedisValue[] = [];
+      let pos = next;
+      for (let i = 0; i < count; i++) {
+        const item = parse(buf, pos);
+        if (!item) return null;
+        items.push(item[0] instanceof Error ? null : item[0]);
+        pos = item[1];
+      }
+      return [items, pos];
+    }
+    default:
+      throw new Error(`Unexpected RESP type byte: ${type}`);
+  }
+}
+
+export class RedisClient {
+  private socket: Socket | null = null;
+  private buffer = Buffer.alloc(0);
+  private pending: Pending[] = [];
+  private readonly host: string;
+  private readonly port: number;
+  private readonly password: string;
+  private readonly db: number;
+  private readonly timeoutMs: number;
+
+  constructor(url: string, timeoutMs: number = REDIS_TIMEOUT_MS) {
+    this.timeoutMs = timeoutMs;
+    const parsed = new URL(url);
+    this.host = parsed.hostname || '127.0.0.1';
+    this.port = parseInt(parsed.port || '6379', 10);
+    this.password = decodeURIComponent(parsed.password || '');
+    this.db = parseInt(parsed.pathname.slice(1) || '0', 10);
+  }
+
+  command(args: (string | number)[]): Promise<RedisValue> {
+    const socket = this.socket || this.open();
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        // Replies are positional, so a late one would be matched to the wrong command
+        this.fail(new Error(`Redis command timed out after ${this.timeoutMs}ms`));
+      }, this.timeoutMs);
+      this.pending.push({
+        resolve: value => {
+          clearTimeout(timer);
+          resolve(value);
+        },
+        reject: err => {
+          clearTimeout(timer);
+          reject(err);
+        }
+      });
+      socket.write(encode(args));
+    });
+  }
+
+  close(): void {
+    this.fail(new Error('Redis client closed'));
+  }
+
+  private open(): Socket {
+    const socket = connect({ host: this.host, port: this.port });
+    socket.setNoDelay(true);
+    // Events from a connection that has already been replaced are ignored
+    socket.on('data', chunk => {
+      if (this.socket === socket) this.onData(chunk);
+    });
+    socket.on('error', err => {
+      if (this.socket === socket) this.fail(err);
+    });
+    socket.on('close', () => {
+      if (this.socket === socket) this.fail(new Error('Redis connection closed'));
+    });
+    this.socket = socket;
+    this.buffer = Buffer.alloc(0);
+
+    // Queued ahead of the caller's command; replies are discarded unless they fail
+    const setup: (string | number)[][] = [];
+    if (this.password) setup.push(['AUTH', this.password]);
+    if (this.db) setup.push(['SELECT', this.db]);
+    for (const args of setup) {
+      this.pending.push({ resolve: () => {}, reject: () => {} });
+      socket.write(encode(args));
+    }
+    return socket;
+  }
+
+  private onData(chunk: Buffer): void {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    let offset = 0;
+    while (offset < this.buffer.length) {
+      let parsed;
+      try {
+        parsed = parse(this.buffer, offset);
+      } catch (err) {
+        this.fail(err as Error);
+        return;
+      }
+      if (!parsed) break;
+      const [value, next] = parsed;
+      offset = next;
+      const pending = this.pending.shift();
+      if (!pending) continue;
+      if (value instanceof Error) pending.reject(value);
+      else pending.resolve(value);
+    }
+    this.buffer = this.buffer.subarray(offset);
+  }
+
+  /**
+   * Drop the connection and fail everything waiting on it
+   */
+  private fail(err: Error): void {
+    const socket = this.socket;
+    this.socket = null;
+    const pending = this.pending.splice(0, this.pending.length);
+    if (socket) socket.destroy();
+    for (const p of pending) p.reject(err);
+  }
+}
@@ -0,0 +1,148 @@
+/**
+ * Selector hit-rate statistics and adaptive selector ordering
+ *
+ * Every extraction checks all candidate selectors for a field and records
+ * which ones matched. Candidates are then tried in order of smoothed hit
+ * rate, so when LinkedIn changes its markup the selectors that still work
+ * move to the front without a code change. Ranking happens within two
+ * tiers: the catch-all FALLBACK_SELECTORS match almost every page, so they
+ * always come after the specific selectors and only supply a value when
+ * none of those matched. Ties keep the order in SELECTORS.
+ *
+ * Stats are kept in memory, written to SELECTOR_STATS_FILE at most every
+ * SELECTOR_STATS_FLUSH_MS, and loaded on startup. Counts are halved once a
+ * selector reaches SELECTOR_STATS_DECAY_AT attempts so recent pages
+ * outweigh old ones.
+ */
+
+import { readFileSync, writeFileSync, mkdirSync, renameSync } from 'fs';
+import { dirname, join } from 'path';
+import { tmpdir } from 'os';
+import { SELECTORS, FALLBACK_SELECTORS } from './selectors';
+
+// docker-compose points this at the job_fetcher_data volume so stats survive container rebuilds
+const STATS_FILE = process.env.SELECTOR_STATS_FILE || join(tmpdir(), 'job-fetcher', 'selector-stats.json');
+const FLUSH_MS = parseInt(process.env.SELECTOR_STATS_FLUSH_MS || '30000', 10);
+const DECAY_AT = parseInt(process.env.SELECTOR_STATS_DECAY_AT || '1000', 10);
+
+export type SelectorField = 'title' | 'company' | 'location' | 'description' | 'applyButton';
+
+export const SELECTOR_FIELDS: SelectorField[] = ['title', 'company', 'location', 'description', 'applyButton'];
+
+interface SelectorCounts {
+  hits: number;
+  attempts: number;
+}
+
+type FieldStats = Record<string, SelectorCounts>;
+
+const stats = {} as Record<SelectorField, FieldStats>;
+let dirty = false;
+
+function emptyStats(): void {
+  for (const field of SELECTOR_FIELDS) {
+    stats[field] = {};
+    for (const selector of SELECTORS[field]) stats[field][selector] = { hits: 0, attempts: 0 };
+  }
+}
+
+/**
+ * Load persisted counts for selectors that still exist in SELECTORS
+ */
+function load(): void {
+  emptyStats();
+  let saved: { fields?: Record<string, FieldStats> };
+  try {
+    saved = JSON.parse(readFileSync(STATS_FILE, 'utf-8'));
+  } catch {
+    return;
+  }
+  for (const field of SELECTOR_FIELDS) {
+    for (const [selector, counts] of Object.entries(saved.fields?.[field] || {})) {
+      if (stats[field][selector] && Number.isFinite(counts.hits) && Number.isFinite(counts.attempts)) {
+        stats[field][selector] = { hits: counts.hits, attempts: counts.attempts };
+      }
+    }
+  }
+  console.log(`[selectorStats] Loaded selector stats from ${STATS_FILE}`);
+}
+
+function hitRate(counts: SelectorCounts): number {
+  // Laplace smoothing: unseen selectors start at 0.5
+  return (counts.hits + 1) / (counts.attempts + 2);
+}
+
+/**
+ * Candidate selectors for a field, most successful first within each tier,
+ * fallbacks last
+ */
+export function orderedSelectors(field: SelectorField): string[] {
+  const fieldStats = stats[field];
+  const fallbacks = new Set(FALLBACK_SELECTORS[field] || []);
+  return SELECTORS[field]
+    .map((selector, index) => ({
+      selector,
+      index,
+      tier: fallbacks.has(selector) ? 1 : 0,
+      rate: hitRate(fieldStats[selector])
+    }))
+    .sort((a, b) => a.tier - b.tier || b.rate - a.rate || a.index - b.index)
+    .map(entry => entry.selector);
+}
+
+/**
+ * Record which of the checked selectors matched for a field
+ */
+export function recordSelectorHits(field: SelectorField, checked: string[], matched: string[]): void {
+  const fieldStats = stats[field];
+  const hit = new Set(matched);
+  for (const selector of checked) {
+    const counts = fieldStats[selector];
+    if (!counts) continue;
+    counts.attempts++;
+    if (hit.has(selector)) counts.hits++;
+    if (counts.attempts >= DECAY_AT) {
+      counts.attempts = Math.round(counts.attempts / 2);
+      counts.hits = Math.round(counts.hits / 2);
+    }
+  }
+  dirty = true;
+}
+
+/**
+ * Write stats to SELECTOR_STATS_FILE if they changed (atomic rename)
+ */
+export function flushSelectorStats(): void {
+  if (!dirty) return;
+  dirty = false;
+  try {
+    mkdirSync(dirname(STATS_FILE), { recursive: true });
+    const tmp = `${STATS_FILE}.${process.pid}.tmp`;
+    writeFileSync(tmp, JSON.stringify({ version: 1, updatedAt: new Date().toISOString(), fields: stats }, null, 2));
+    renameSync(tmp, STATS_FILE);
+  } catch (err) {
+    console.warn(`[selectorStats] Could not write ${STATS_FILE}: ${err instanceof Error ? err.message : err}`);
+  }
+}
+
+/**
+ * Per field: selectors in their current order with hits, attempts and hit rate
+ */
+export function getSelectorStats() {
+  const result: Record<string, { selector: string; hits: number; attempts: number; hitRate: number }[]> = {};
+  for (const field of SELECTOR_FIELDS) {
+    result[field] = orderedSelectors(field).map(selector => {
+      const counts = stats[field][selector];
+      return {
+        selector,
+        hits: counts.hits,
+        attempts: counts.attempts,
+        hitRate: counts.attempts > 0 ? Math.round((counts.hits / counts.attempts) * 1000) / 1000 : 0
+      };
+    });
+  }
+  return { file: STATS_FILE, fields: result };
+}
+
+load();
+setInterval(flushSelectorStats, FLUSH_MS);
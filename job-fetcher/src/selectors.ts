@@ -0,0 +1,108 @@
+/**
+ * LinkedIn page selectors, block patterns and user agents, shared by the
+ * browser and plain-HTTP fetch tiers
+ */
+
+const MAX_DESCRIPTION_LENGTH = 60000;
+
+// Realistic User-Agents (rotated randomly)
+const USER_AGENTS = [
+  'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+  'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+  'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:123.0) Gecko/20100101 Firefox/123.0',
+  'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2.1 Safari/605.1.15'
+];
+
+// Get random user agent
+export const getRandomUserAgent = () => USER_AGENTS[Math.floor(Math.random() * USER_AGENTS.length)];
+
+// Selectors for job data
+export const SELECTORS = {
+  // Job title selectors (try multiple)
+  title: [
+    'h1.top-card-layout__title',
+    'h1.topcard__title',
+    'h1[class*="job-title"]',
+    '.job-details-jobs-unified-top-card__job-title h1',
+    'h1'
+  ],
+  // Company name
+  company: [
+    '.top-card-layout__card a.topcard__org-name-link',
+    '.topcard__org-name-link',
+    'a[data-tracking-control-name="public_jobs_topcard-org-name"]',
+    '.job-details-jobs-unified-top-card__company-name a',
+    '.job-details-jobs-unified-top-card__company-name'
+  ],
+  // Location
+  location: [
+    '.top-card-layout__card .topcard__flavor--bullet',
+    '.topcard__flavor--bullet',
+    '.job-details-jobs-unified-top-card__bullet',
+    '.job-details-jobs-unified-top-card__primary-description-container span'
+  ],
+  // Job description
+  description: [
+    '.description__text',
+    '.show-more-less-html__markup',
+    '.job-details-jobs-unified-top-card__job-description',
+    '[class*="description"] [class*="markup"]',
+    '.jobs-description__content',
+    'article'
+  ],
+  // "See more" / "Show more" buttons
+  showMore: [
+    'button.show-more-less-html__button',
+    'button[aria-label*="more"]',
+    'button[class*="show-more"]',
+    '.show-more-less-html__button--more'
+  ],
+  // Apply button / URL
+  applyButton: [
+    'a.apply-button',
+    'a[data-tracking-control-name*="apply"]',
+    '.jobs-apply-button',
+    'a[href*="apply"]'
+  ]
+};
+
+// Catch-all selectors that match nearly any page. Matching is no sign they
+// found the right element, so they stay behind the specific ones whatever
+// their hit rate
+export const FALLBACK_SELECTORS: Record<string, string[]> = {
+  title: ['h1'],
+  description: ['[class*="description"] [class*="markup"]', 'article'],
+  applyButton: ['a[href*="apply"]']
+};
+
+// Login/block detection patterns
+export const BLOCK_PATTERNS = {
+  loginUrls: ['/login', '/checkpoint', '/authwall', '/uas/login'],
+  loginText: ['Sign in', 'Join now', 'Log in', 'Sign up'],
+  captchaText: ['captcha', 'verify you', 'security verification', 'prove you'],
+  rateLimitText: ['too many requests', 'rate limit', 'slow down']
+};
+
+/**
+ * Clean description text
+ */
+export function cleanDescriptionText(text: string): string {
+  if (!text) return '';
+
+  // Preserve line breaks but collapse excessive whitespace
+  let cleaned = text
+    .replace(/\r\n/g, '\n')
+    .replace(/\r/g, '\n')
+    .replace(/[ \t]+/g, ' ')           // Collapse horizontal whitespace
+    .replace(/\n[ \t]+/g, '\n')        // Remove leading whitespace on lines
+    .replace(/[ \t]+\n/g, '\n')        // Remove trailing whitespace on lines
+    .replace(/\n{3,}/g, '\n\n')        // Max 2 consecutive newlines
+    .trim();
+
+  // Truncate if too long
+  if (cleaned.length > MAX_DESCRIPTION_LENGTH) {
+    cleaned = cleaned.substring(0, MAX_DESCRIPTION_LENGTH) + '\n...[TRUNCATED]...';
+  }
+
+  return cleaned;
+}
@@ -4,12 +4,21 @@
 
 import express, { Request, Response, NextFunction } from 'express';
 import { fetchLinkedInJob, FetchOptions } from './fetchLinkedIn';
-import { checkRateLimit, getRateLimitHeaders } from './rateLimit';
-import { getCurrentConcurrency, getQueueLength, getMaxConcurrency } from './concurrency';
+import { checkRateLimit, getRateLimitHeaders, getRateLimitStats, capacityExceededBody, retryAfterBody } from './rateLimit';
+import { getCurrentConcurrency, getQueueLength, getMaxConcurrency, getSchedulerStats, PriorityClass } from './concurrency';
+import { warmPool, closePool, getPoolStats } from './browserPool';
+import { getOrFetch, clearJobCache, getJobCacheStats } from './jobCache';
+import { normalizeLinkedInUrl } from './normalizeUrl';
+import { runBatch, planBatch } from './batch';
+import { renderMetrics, observeHttpResponse } from './metrics';
+import { getSelectorStats, flushSelectorStats } from './selectorStats';
+import { getNetworkProfile } from './networkProfile';
 
 const app = express();
 const PORT = parseInt(process.env.PORT || '3000', 10);
 const REQUEST_TIMEOUT_MS = parseInt(process.env.REQUEST_TIMEOUT_MS || '120000', 10);
+const BATCH_MAX_URLS = parseInt(process.env.BATCH_MAX_URLS || '100', 10);
+const BATCH_TIMEOUT_MS = parseInt(process.env.BATCH_TIMEOUT_MS || '1800000', 10);
 
 // Middleware
 app.use(express.json({ limit: '1mb' }));
@@ -33,6 +42,8 @@ app.use((req: Request, res: Response, next: NextFunction) => {
   res.on('finish', () => {
     const duration = Date.now() - start;
     console.log(`${req.method} ${req.path} ${res.statusCode} ${duration}ms`);
+    // Label by route pattern so unknown paths cannot blow up the series count
+    observeHttpResponse(req.method, req.route ? req.route.path : 'unmatched', res.statusCode);
   });
   next();
 });
@@ -45,16 +56,40 @@ app.get('/health', (req: Request, res: Response) => {
       current: getCurrentConcurrency(),
       max: getMaxConcurrency(),
       queued: getQueueLength()
-    }
+    },
+    scheduler: getSchedulerStats(),
+    browserPool: getPoolStats(),
+    cache: getJobCacheStats(),
+    rateLimit: getRateLimitStats(),
+    // Interception rules live for browser fetches
+    network: getNetworkProfile()
   });
 });
 
+// Selector hit rates, in the order they are currently tried
+app.get('/stats/selectors', (req: Request, res: Response) => {
+  res.json({ ok: true, ...getSelectorStats() });
+});
+
+// Prometheus scrape endpoint
+app.get('/metrics', (req: Request, res: Response) => {
+  res.setHeader('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+  res.send(renderMetrics());
+});
+
+// Drop every cached posting
+app.delete('/cache', (req: Request, res: Response) => {
+  const cleared = clearJobCache();
+  console.log(`[cache] Cleared ${cleared} entries`);
+  res.json({ ok: true, cleared });
+});
+
 // Fetch endpoint
 app.post('/fetch', async (req: Request, res: Response) => {
   const clientIp = req.ip || req.socket.remoteAddress || 'unknown';
 
   // Rate limit check
-  const rateLimitResult = checkRateLimit(clientIp);
+  const rateLimitResult = await checkRateLimit(clientIp);
   const rateLimitHeaders = getRateLimitHeaders(rateLimitResult);
 
   // Set rate limit headers
@@ -66,13 +101,16 @@ app.post('/fetch', async (req: Request, res: Response) => {
     res.status(429).json({
       ok: false,
       error: 'RATE_LIMIT_EXCEEDED',
-      retryAfter: Math.ceil((rateLimitResult.resetAt - Date.now()) / 1000)
+      ...retryAfterBody(rateLimitResult)
     });
     return;
   }
 
   // Validate request body
-  const { url, options = {} } = req.body as { url?: string; options?: FetchOptions };
+  const { url, options = {} } = req.body as {
+    url?: string;
+    options?: FetchOptions & { noCache?: boolean; priority?: PriorityClass };
+  };
 
   if (!url || typeof url !== 'string') {
     res.status(400).json({
@@ -88,8 +126,39 @@ app.post('/fetch', async (req: Request, res: Response) => {
   const jobIdLog = jobIdMatch ? jobIdMatch[1] : 'unknown';
   console.log(`[fetch] Starting fetch for jobId=${jobIdLog}`);
 
+  // Drop the request from the concurrency queue if the client goes away
+  const aborter = new AbortController();
+  res.on('close', () => {
+    if (!res.writableEnded) aborter.abort();
+  });
+  const schedule = {
+    clientId: clientIp,
+    // Callers may mark themselves as bulk traffic, never the other way round
+    priority: (options.priority === 'batch' ? 'batch' : 'interactive') as PriorityClass
+  };
+
   try {
-    const result = await fetchLinkedInJob(url, options);
+    // Same posting -> same jobId: serve from cache or share an in-flight fetch
+    const normalized = normalizeLinkedInUrl(url);
+    const bypass = options.noCache === true || String(req.headers['cache-control'] || '').includes('no-cache');
+    let result;
+    if (normalized.ok && normalized.jobId) {
+      const cached = await getOrFetch(
+        normalized.jobId,
+        signal => fetchLinkedInJob(url, options, { ...schedule, signal }),
+        bypass,
+        aborter.signal
+      );
+      result = cached.result;
+      res.setHeader('X-Cache', cached.cache.status);
+    } else {
+      result = await fetchLinkedInJob(url, options, { ...schedule, signal: aborter.signal });
+    }
+
+    if (aborter.signal.aborted) {
+      console.log(`[fetch] Client went away for jobId=${jobIdLog}`);
+      return;
+    }
 
     // Log result (minimal)
     if (result.ok && !result.blocked) {
@@ -112,6 +181,87 @@ app.post('/fetch', async (req: Request, res: Response) => {
   }
 });
 
+// Batch fetch endpoint: one NDJSON line per posting as it completes, then a summary line
+app.post('/fetch/batch', async (req: Request, res: Response) => {
+  const clientIp = req.ip || req.socket.remoteAddress || 'unknown';
+  const { urls, options = {} } = req.body as { urls?: unknown; options?: FetchOptions & { noCache?: boolean } };
+
+  if (!Array.isArray(urls) || urls.length === 0 || !urls.every(u => typeof u === 'string')) {
+    res.status(400).json({
+      ok: false,
+      error: 'INVALID_URLS',
+      message: 'Request body must include a non-empty "urls" array of LinkedIn job URLs'
+    });
+    return;
+  }
+
+  if (urls.length > BATCH_MAX_URLS) {
+    res.status(400).json({
+      ok: false,
+      error: 'BATCH_TOO_LARGE',
+      message: `At most ${BATCH_MAX_URLS} URLs per batch`
+    });
+    return;
+  }
+
+  // Rate limit by unique postings, checked once for the whole batch
+  const unique = planBatch(urls as string[]).filter(item => item.jobId).length;
+
+  // More postings than the bucket holds would be refused on every retry
+  const oversized = capacityExceededBody(unique);
+  if (oversized) {
+    res.status(400).json(oversized);
+    return;
+  }
+
+  const rateLimitResult = await checkRateLimit(clientIp, unique);
+  Object.entries(getRateLimitHeaders(rateLimitResult)).forEach(([key, value]) => {
+    res.setHeader(key, value);
+  });
+
+  if (!rateLimitResult.allowed) {
+    res.status(429).json({
+      ok: false,
+      error: 'RATE_LIMIT_EXCEEDED',
+      ...retryAfterBody(rateLimitResult)
+    });
+    return;
+  }
+
+  console.log(`[batch] Starting batch of ${urls.length} URLs (${unique} unique)`);
+
+  // Batches outlive the per-request timeout; headers are sent before it could fire
+  res.setTimeout(BATCH_TIMEOUT_MS);
+  res.status(200);
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.flushHeaders();
+
+  const aborter = new AbortController();
+  res.on('close', () => {
+    if (!res.writableEnded) aborter.abort();
+  });
+
+  const bypass = options.noCache === true || String(req.headers['cache-control'] || '').includes('no-cache');
+  try {
+    const summary = await runBatch(
+      urls as string[],
+      options,
+      bypass,
+      line => {
+        if (!aborter.signal.aborted) res.write(JSON.stringify(line) + '\n');
+      },
+      { clientId: clientIp, priority: 'batch', signal: aborter.signal }
+    );
+    console.log(`[batch] Done: ${summary.ok} ok, ${summary.blocked} blocked, ${summary.errors} errors in ${summary.durationMs}ms`);
+    if (!aborter.signal.aborted) res.end(JSON.stringify(summary) + '\n');
+  } catch (err) {
+    const error = err instanceof Error ? err.message : String(err);
+    console.error(`[batch] Unexpected error: ${error}`);
+    if (!aborter.signal.aborted) res.end(JSON.stringify({ type: 'error', ok: false, error: 'INTERNAL_ERROR', message: error }) + '\n');
+  }
+});
+
 // 404 handler
 app.use((req: Request, res: Response) => {
   res.status(404).json({
@@ -134,7 +284,22 @@ app.use((err: Error, req: Request, res: Response, next: NextFunction) => {
 });
 
 // Start server
-app.listen(PORT, '0.0.0.0', () => {
+const server = app.listen(PORT, '0.0.0.0', () => {
   console.log(`[server] Job Fetcher listening on port ${PORT}`);
   console.log(`[server] Config: HEADLESS=${process.env.HEADLESS !== 'false'}, MAX_CONCURRENCY=${getMaxConcurrency()}`);
+
+  // Launch the first browser now so the first fetch does not pay for it
+  warmPool(process.env.HEADLESS !== 'false')
+    .then(() => console.log(`[server] Browser pool warm: ${getPoolStats().browsers} browser(s)`))
+    .catch(err => console.error('[server] Browser pool warm-up failed:', err));
 });
+
+// Close pooled browsers on shutdown
+for (const signal of ['SIGTERM', 'SIGINT'] as const) {
+  process.on(signal, () => {
+    console.log(`[server] ${signal} received, closing browsers`);
+    server.close();
+    flushSelectorStats();
+    closePool().finally(() => process.exit(0));
+  });
+}
@@ -0,0 +1,41 @@
+/**
+ * Content-addressed cache keys for chat completion requests
+ * Key format: <model>:<sha256 of the canonical request body>
+ */
+
+import { createHash } from 'crypto';
+
+// Fields that do not change the completion and must not split the cache
+const IGNORED_FIELDS = new Set(['model', 'stream', 'user', 'stream_options']);
+
+/**
+ * JSON with object keys sorted, so logically equal bodies hash the same
+ */
+function canonicalJson(value: unknown): string {
+  if (Array.isArray(value)) {
+    return `[${value.map(canonicalJson).join(',')}]`;
+  }
+  if (value !== null && typeof value === 'object') {
+    const obj = value as Record<string, unknown>;
+    const keys = Object.keys(obj).filter(k => obj[k] !== undefined).sort();
+    return `{${keys.map(k => `${JSON.stringify(k)}:${canonicalJson(obj[k])}`).join(',')}}`;
+  }
+  return JSON.stringify(value);
+}
+
+/**
+ * Build the cache key from the model id and everything that shapes the
+ * completion: the rendered messages (prompt template + inputs) and the
+ * sampling parameters.
+ */
+export function buildCacheKey(body: Record<string, unknown>): string {
+  const model = typeof body.model === 'string' ? body.model : 'unknown';
+  const rest: Record<string, unknown> = {};
+  for (const [key, value] of Object.entries(body)) {
+    if (!IGNORED_FIELDS.has(key)) {
+      rest[key] = value;
+    }
+  }
+  const digest = createHash('sha256').update(canonicalJson(rest)).digest('hex');
+  return `${model}:${digest}`;
+}
@@ -0,0 +1,212 @@
+/**
+ * LLM Cache Express Server
+ *
+ * OpenAI-compatible proxy that caches chat completions by content.
+ * Point the n8n OpenAI credential's Base URL at http://llm-cache:3000/v1
+ */
+
+import express, { Request, Response, NextFunction } from 'express';
+import { buildCacheKey } from './cacheKey';
+import { getCached, setCached, recordBypass, clearCache, getCacheStats } from './cache';
+
+const app = express();
+const PORT = parseInt(process.env.PORT || '3000', 10);
+const OPENAI_BASE_URL = (process.env.OPENAI_BASE_URL || 'https://api.openai.com/v1').replace(/\/+$/, '');
+const CACHE_ENABLED = process.env.CACHE_ENABLED !== 'false';
+const UPSTREAM_TIMEOUT_MS = parseInt(process.env.UPSTREAM_TIMEOUT_MS || '180000', 10);
+
+// Headers forwarded to the upstream API
+const FORWARDED_HEADERS = ['authorization', 'openai-organization', 'openai-project', 'openai-beta'];
+
+// Middleware
+app.use(express.json({ limit: '10mb' }));
+
+// Log requests (minimal)
+app.use((req: Request, res: Response, next: NextFunction) => {
+  const start = Date.now();
+  res.on('finish', () => {
+    const duration = Date.now() - start;
+    const cacheStatus = res.getHeader('X-Cache') || '-';
+    console.log(`${req.method} ${req.path} ${res.statusCode} ${cacheStatus} ${duration}ms`);
+  });
+  next();
+});
+
+/**
+ * Bypass the cache via the /nocache prefix, an X-Cache-Bypass header,
+ * Cache-Control: no-cache, or CACHE_ENABLED=false
+ */
+function isBypass(req: Request): boolean {
+  if (!CACHE_ENABLED || req.path.startsWith('/nocache/')) {
+    return true;
+  }
+  const bypassHeader = String(req.headers['x-cache-bypass'] || '').toLowerCase();
+  if (bypassHeader === '1' || bypassHeader === 'true') {
+    return true;
+  }
+  return String(req.headers['cache-control'] || '').includes('no-cache');
+}
+
+/**
+ * Map /v1/... and /nocache/v1/... to the upstream path
+ */
+function upstreamUrl(req: Request): string {
+  const path = req.originalUrl.replace(/^\/nocache/, '').replace(/^\/v1/, '');
+  return `${OPENAI_BASE_URL}${path}`;
+}
+
+async function callUpstream(req: Request): Promise<globalThis.Response> {
+  const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+  for (const name of FORWARDED_HEADERS) {
+    const value = req.headers[name];
+    if (typeof value === 'string') {
+      headers[name] = value;
+    }
+  }
+
+  const hasBody = req.method !== 'GET' && req.method !== 'HEAD';
+  return fetch(upstreamUrl(req), {
+    method: req.method,
+    headers,
+    body: hasBody ? JSON.stringify(req.body ?? {}) : undefined,
+    signal: AbortSignal.timeout(UPSTREAM_TIMEOUT_MS)
+  });
+}
+
+/**
+ * Stream an upstream response to the client unchanged
+ */
+async function pipeUpstream(upstream: globalThis.Response, res: Response): Promise<void> {
+  res.status(upstream.status);
+  const contentType = upstream.headers.get('content-type');
+  if (contentType) {
+    res.setHeader('Content-Type', contentType);
+  }
+  if (!upstream.body) {
+    res.end();
+    return;
+  }
+  const reader = upstream.body.getReader();
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    res.write(value);
+  }
+  res.end();
+}
+
+function sendUpstreamError(res: Response, err: unknown): void {
+  const error = err instanceof Error ? err.message : String(err);
+  console.error(`[llm-cache] Upstream error: ${error}`);
+  if (!res.headersSent) {
+    res.status(502).json({
+      ok: false,
+      error: 'UPSTREAM_ERROR',
+      message: error
+    });
+  }
+}
+
+// Health check endpoint with cache counters
+app.get('/health', (req: Request, res: Response) => {
+  res.json({
+    ok: true,
+    upstream: OPENAI_BASE_URL,
+    cacheEnabled: CACHE_ENABLED,
+    cache: getCacheStats()
+  });
+});
+
+// Drop every cached response
+app.delete('/cache', (req: Request, res: Response) => {
+  const cleared = clearCache();
+  console.log(`[llm-cache] Cleared ${cleared} entries`);
+  res.json({ ok: true, cleared });
+});
+
+// Cached chat completions
+app.post(['/v1/chat/completions', '/nocache/v1/chat/completions'], async (req: Request, res: Response) => {
+  const body = req.body as Record<string, unknown>;
+  if (!body || typeof body !== 'object' || !Array.isArray(body.messages)) {
+    res.status(400).json({
+      ok: false,
+      error: 'INVALID_REQUEST',
+      message: 'Request body must be a chat completion request with "messages"'
+    });
+    return;
+  }
+
+  // Streamed responses are passed through untouched
+  const bypass = isBypass(req) || body.stream === true;
+  const key = buildCacheKey(body);
+
+  if (bypass) {
+    recordBypass();
+  } else {
+    const cached = getCached(key);
+    if (cached !== null) {
+      res.setHeader('X-Cache', 'HIT');
+      res.setHeader('X-Cache-Key', key);
+      res.type('application/json').send(cached);
+      return;
+    }
+  }
+
+  try {
+    const upstream = await callUpstream(req);
+    res.setHeader('X-Cache', bypass ? 'BYPASS' : 'MISS');
+    res.setHeader('X-Cache-Key', key);
+
+    if (bypass) {
+      await pipeUpstream(upstream, res);
+      return;
+    }
+
+    const text = await upstream.text();
+    // Only successful completions are cached; errors are retried upstream
+    if (upstream.status === 200) {
+      setCached(key, text);
+    }
+    res.status(upstream.status).type(upstream.headers.get('content-type') || 'application/json').send(text);
+  } catch (err) {
+    sendUpstreamError(res, err);
+  }
+});
+
+// Everything else under /v1 (e.g. GET /v1/models for credential tests) is proxied as-is
+app.all(['/v1/*', '/nocache/v1/*'], async (req: Request, res: Response) => {
+  try {
+    const upstream = await callUpstream(req);
+    res.setHeader('X-Cache', 'BYPASS');
+    await pipeUpstream(upstream, res);
+  } catch (err) {
+    sendUpstreamError(res, err);
+  }
+});
+
+// 404 handler
+app.use((req: Request, res: Response) => {
+  res.status(404).json({
+    ok: false,
+    error: 'NOT_FOUND',
+    message: `Endpoint ${req.method} ${req.path} not found`
+  });
+});
+
+// Error handler
+app.use((err: Error, req: Request, res: Response, next: NextFunction) => {
+  console.error('[server] Unhandled error:', err);
+  if (!res.headersSent) {
+    res.status(500).json({
+      ok: false,
+      error: 'INTERNAL_ERROR',
+      message: err.message
+    });
+  }
+});
+
+// Start server
+app.listen(PORT, '0.0.0.0', () => {
+  console.log(`[server] LLM Cache listening on port ${PORT}`);
+  console.log(`[server] Config: UPSTREAM=${OPENAI_BASE_URL}, CACHE_ENABLED=${CACHE_ENABLED}`);
+});
@@ -0,0 +1,118 @@
+/**
+ * In-memory LRU cache with TTL for rendered PDFs
+ */
+
+const CACHE_TTL_MS = parseInt(process.env.CACHE_TTL_MS || '604800000', 10);
+const CACHE_MAX_ENTRIES = parseInt(process.env.CACHE_MAX_ENTRIES || '500', 10);
+const CACHE_MAX_BYTES = parseInt(process.env.CACHE_MAX_BYTES || String(128 * 1024 * 1024), 10);
+
+export interface CachedPdf {
+  body: Buffer;
+  contentType: string;
+  /** Gotenberg's Content-Disposition (carries the Gotenberg-Output-Filename name) */
+  contentDisposition: string | null;
+}
+
+interface CacheEntry extends CachedPdf {
+  bytes: number;
+  expiresAt: number;
+}
+
+export interface CacheStats {
+  entries: number;
+  bytes: number;
+  maxEntries: number;
+  maxBytes: number;
+  ttlMs: number;
+  hits: number;
+  misses: number;
+  bypasses: number;
+  evictions: number;
+  expirations: number;
+  hitRate: number;
+}
+
+// Map iteration order is insertion order: re-inserting on read keeps the
+// least recently used entry at the front, so eviction is O(1).
+const store = new Map<string, CacheEntry>();
+let totalBytes = 0;
+
+const counters = {
+  hits: 0,
+  misses: 0,
+  bypasses: 0,
+  evictions: 0,
+  expirations: 0
+};
+
+function remove(key: string, entry: CacheEntry): void {
+  store.delete(key);
+  totalBytes -= entry.bytes;
+}
+
+export function getCached(key: string): CachedPdf | null {
+  const entry = store.get(key);
+  if (!entry) {
+    counters.misses++;
+    return null;
+  }
+
+  if (entry.expiresAt < Date.now()) {
+    remove(key, entry);
+    counters.expirations++;
+    counters.misses++;
+    return null;
+  }
+
+  // Mark as most recently used
+  store.delete(key);
+  store.set(key, entry);
+  counters.hits++;
+  return entry;
+}
+
+export function setCached(key: string, pdf: CachedPdf, ttlMs: number = CACHE_TTL_MS): void {
+  const bytes = pdf.body.length;
+  if (bytes > CACHE_MAX_BYTES) {
+    return;
+  }
+
+  const existing = store.get(key);
+  if (existing) {
+    remove(key, existing);
+  }
+
+  store.set(key, { ...pdf, bytes, expiresAt: Date.now() + ttlMs });
+  totalBytes += bytes;
+
+  // Evict least recently used entries until within bounds
+  while (store.size > CACHE_MAX_ENTRIES || totalBytes > CACHE_MAX_BYTES) {
+    const oldestKey = store.keys().next().value as string;
+    remove(oldestKey, store.get(oldestKey) as CacheEntry);
+    counters.evictions++;
+  }
+}
+
+export function recordBypass(): void {
+  counters.bypasses++;
+}
+
+export function clearCache(): number {
+  const cleared = store.size;
+  store.clear();
+  totalBytes = 0;
+  return cleared;
+}
+
+export function getCacheStats(): CacheStats {
+  const lookups = counters.hits + counters.misses;
+  return {
+    entries: store.size,
+    bytes: totalBytes,
+    maxEntries: CACHE_MAX_ENTRIES,
+    maxBytes: CACHE_MAX_BYTES,
+    ttlMs: CACHE_TTL_MS,
+    ...counters,
+    hitRate: lookups > 0 ? Math.round((counters.hits / lookups) * 1000) / 1000 : 0
+  };
+}
@@ -0,0 +1,87 @@
+/**
+ * Content-addressed cache keys for Gotenberg conversion requests
+ * Key format: <route>:<sha256 of the form parts and output file name>
+ *
+ * The multipart boundary changes on every request, so the key is built from
+ * the parsed parts (field name, file name, content) instead of the raw body.
+ * Conversion options (paperWidth, margins, ...) are form fields too, so they
+ * are part of the key. So is the Gotenberg-Output-Filename header: it sets
+ * the file name in the response's Content-Disposition, which is cached with
+ * the PDF.
+ */
+
+import { createHash } from 'crypto';
+
+export interface FormPart {
+  name: string;
+  filename: string | null;
+  data: Buffer;
+}
+
+const CRLF = Buffer.from('\r\n\r\n');
+
+/**
+ * Split a multipart/form-data body into its parts
+ */
+export function parseMultipart(body: Buffer, contentType: string): FormPart[] {
+  const match = /boundary=(?:"([^"]+)"|([^;\s]+))/i.exec(contentType);
+  if (!match) {
+    throw new Error('INVALID_MULTIPART');
+  }
+  const delimiter = Buffer.from(`--${match[1] || match[2]}`);
+
+  const parts: FormPart[] = [];
+  let start = body.indexOf(delimiter);
+  if (start === -1) {
+    throw new Error('INVALID_MULTIPART');
+  }
+  for (;;) {
+    start += delimiter.length;
+    // "--" right after a delimiter closes the body
+    if (body[start] === 0x2d && body[start + 1] === 0x2d) {
+      break;
+    }
+    const end = body.indexOf(delimiter, start);
+    if (end === -1) {
+      throw new Error('INVALID_MULTIPART');
+    }
+
+    // CRLF, headers, blank line, data, CRLF
+    const part = body.subarray(start + 2, end - 2);
+    const split = part.indexOf(CRLF);
+    if (split === -1) {
+      throw new Error('INVALID_MULTIPART');
+    }
+    const headers = part.subarray(0, split).toString('utf-8');
+    const disposition = /^content-disposition:.*$/im.exec(headers)?.[0] || '';
+    parts.push({
+      name: /\bname="([^"]*)"/i.exec(disposition)?.[1] ?? '',
+      filename: /\bfilename="([^"]*)"/i.exec(disposition)?.[1] ?? null,
+      data: part.subarray(split + CRLF.length)
+    });
+    start = end;
+  }
+  return parts;
+}
+
+/**
+ * Build the cache key from the conversion route, every form part (in a fixed
+ * order so the client's field order does not matter) and the requested
+ * output file name
+ */
+export function buildRenderKey(route: string, parts: FormPart[], outputFilename: string | null = null): string {
+  const hash = createHash('sha256');
+  const name = Buffer.from(outputFilename ?? '');
+  hash.update(`${name.length}:`);
+  hash.update(name);
+  const sorted = [...parts].sort((a, b) =>
+    a.name.localeCompare(b.name) || (a.filename || '').localeCompare(b.filename || ''));
+  for (const part of sorted) {
+    // Length-prefix each field so part boundaries can't collide
+    for (const field of [Buffer.from(part.name), Buffer.from(part.filename ?? ''), part.data]) {
+      hash.update(`${field.length}:`);
+      hash.update(field);
+    }
+  }
+  return `${route}:${hash.digest('hex')}`;
+}
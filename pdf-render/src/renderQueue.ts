@@ -0,0 +1,141 @@
+/**
+ * Bounded queue in front of Gotenberg
+ *
+ * At most RENDER_CONCURRENCY conversions run at once; further requests wait
+ * in FIFO order. When RENDER_QUEUE_MAX requests are already waiting, new ones
+ * are refused (QUEUE_FULL) instead of piling onto Chromium's memory, and a
+ * waiter gives up after RENDER_QUEUE_TIMEOUT_MS (QUEUE_TIMEOUT).
+ *
+ * Identical documents already being rendered are not sent again: later
+ * requests for the same key share the in-flight conversion.
+ */
+
+const RENDER_CONCURRENCY = parseInt(process.env.RENDER_CONCURRENCY || '2', 10);
+const RENDER_QUEUE_MAX = parseInt(process.env.RENDER_QUEUE_MAX || '20', 10);
+const RENDER_QUEUE_TIMEOUT_MS = parseInt(process.env.RENDER_QUEUE_TIMEOUT_MS || '60000', 10);
+
+export interface RenderTiming {
+  /** Time spent queued before a Gotenberg slot was free */
+  queueMs: number;
+  /** Gotenberg conversion time */
+  renderMs: number;
+  /** The request joined an identical in-flight conversion */
+  coalesced: boolean;
+}
+
+interface Waiter {
+  cancelled: boolean;
+  grant: () => void;
+}
+
+let running = 0;
+let live = 0;
+let head = 0;
+let waiters: Waiter[] = [];
+const inFlight = new Map<string, Promise<{ result: unknown; queueMs: number; renderMs: number }>>();
+
+const counters = {
+  started: 0,
+  coalesced: 0,
+  rejected: 0,
+  timeouts: 0
+};
+
+function next(): Waiter | undefined {
+  while (head < waiters.length) {
+    const waiter = waiters[head++];
+    if (!waiter.cancelled) {
+      live--;
+      return waiter;
+    }
+  }
+  // Drop the consumed prefix once the queue drains
+  waiters = [];
+  head = 0;
+  return undefined;
+}
+
+function release(): void {
+  running--;
+  const waiter = next();
+  if (waiter) {
+    running++;
+    waiter.grant();
+  }
+}
+
+function acquire(): Promise<number> {
+  if (running < RENDER_CONCURRENCY && live === 0) {
+    running++;
+    return Promise.resolve(0);
+  }
+  if (live >= RENDER_QUEUE_MAX) {
+    counters.rejected++;
+    return Promise.reject(new Error('QUEUE_FULL'));
+  }
+
+  return new Promise((resolve, reject) => {
+    const enqueuedAt = Date.now();
+    const waiter: Waiter = {
+      cancelled: false,
+      grant: () => {
+        waiter.cancelled = true;
+        clearTimeout(timeoutId);
+        resolve(Date.now() - enqueuedAt);
+      }
+    };
+    const timeoutId = setTimeout(() => {
+      if (waiter.cancelled) return;
+      waiter.cancelled = true;
+      live--;
+      counters.timeouts++;
+      reject(new Error('QUEUE_TIMEOUT'));
+    }, RENDER_QUEUE_TIMEOUT_MS);
+    waiters.push(waiter);
+    live++;
+  });
+}
+
+/**
+ * Run `render` under the concurrency cap, sharing one run per key
+ */
+export async function runRender<T>(key: string, render: () => Promise<T>): Promise<{ result: T; timing: RenderTiming }> {
+  const existing = inFlight.get(key);
+  if (existing) {
+    counters.coalesced++;
+    const shared = await existing;
+    return { result: shared.result as T, timing: { queueMs: shared.queueMs, renderMs: shared.renderMs, coalesced: true } };
+  }
+
+  const run = (async () => {
+    const queueMs = await acquire();
+    counters.started++;
+    const start = Date.now();
+    try {
+      const result = await render();
+      return { result: result as unknown, queueMs, renderMs: Date.now() - start };
+    } finally {
+      release();
+    }
+  })();
+
+  inFlight.set(key, run);
+  try {
+    const { result, queueMs, renderMs } = await run;
+    return { result: result as T, timing: { queueMs, renderMs, coalesced: false } };
+  } finally {
+    inFlight.delete(key);
+  }
+}
+
+export function getQueueStats() {
+  return {
+    concurrency: RENDER_CONCURRENCY,
+    running,
+    queued: live,
+    maxQueued: RENDER_QUEUE_MAX,
+    queueTimeoutMs: RENDER_QUEUE_TIMEOUT_MS,
+    inFlight: inFlight.size,
+    ...counters
+  };
+}
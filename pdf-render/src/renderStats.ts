@@ -0,0 +1,86 @@
+/**
+ * Per-document render records and render-time histogram
+ */
+
+const RENDER_LOG_SIZE = parseInt(process.env.RENDER_LOG_SIZE || '200', 10);
+
+// Upper bounds of the render-time histogram buckets, in ms
+export const RENDER_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000];
+
+export type RenderOutcome = 'HIT' | 'MISS' | 'COALESCED' | 'BYPASS' | 'ERROR';
+
+export interface RenderRecord {
+  at: string;
+  key: string;
+  /** Gotenberg-Output-Filename, when the client sets it */
+  document: string | null;
+  outcome: RenderOutcome;
+  status: number;
+  bytes: number;
+  queueMs: number;
+  renderMs: number;
+  totalMs: number;
+}
+
+// Ring buffer of the most recent renders
+const log: RenderRecord[] = [];
+let nextSlot = 0;
+
+const outcomes: Record<RenderOutcome, number> = { HIT: 0, MISS: 0, COALESCED: 0, BYPASS: 0, ERROR: 0 };
+const renderBuckets = new Array(RENDER_BUCKETS_MS.length + 1).fill(0);
+let renderCount = 0;
+let renderSumMs = 0;
+let renderMaxMs = 0;
+
+export function recordRender(record: RenderRecord): void {
+  outcomes[record.outcome]++;
+  if (log.length < RENDER_LOG_SIZE) {
+    log.push(record);
+  } else {
+    log[nextSlot] = record;
+  }
+  nextSlot = (nextSlot + 1) % RENDER_LOG_SIZE;
+
+  // Only conversions Gotenberg actually ran count towards render time
+  if (record.outcome === 'MISS' || record.outcome === 'BYPASS') {
+    let bucket = RENDER_BUCKETS_MS.findIndex(le => record.renderMs <= le);
+    if (bucket === -1) bucket = RENDER_BUCKETS_MS.length;
+    renderBuckets[bucket]++;
+    renderCount++;
+    renderSumMs += record.renderMs;
+    renderMaxMs = Math.max(renderMaxMs, record.renderMs);
+  }
+}
+
+/**
+ * Most recent renders, newest first
+ */
+export function getRecentRenders(limit: number = RENDER_LOG_SIZE): RenderRecord[] {
+  const ordered = log.length < RENDER_LOG_SIZE ? [...log] : [...log.slice(nextSlot), ...log.slice(0, nextSlot)];
+  return ordered.reverse().slice(0, limit);
+}
+
+/**
+ * Outcome counts and render-time histogram (cumulative counts per upper
+ * bound, as in a Prometheus histogram)
+ */
+export function getRenderStats() {
+  let cumulative = 0;
+  const buckets: Record<string, number> = {};
+  RENDER_BUCKETS_MS.forEach((le, i) => {
+    cumulative += renderBuckets[i];
+    buckets[String(le)] = cumulative;
+  });
+  buckets['+Inf'] = cumulative + renderBuckets[RENDER_BUCKETS_MS.length];
+
+  return {
+    outcomes: { ...outcomes },
+    renderMs: {
+      buckets,
+      count: renderCount,
+      sum: renderSumMs,
+      max: renderMaxMs,
+      mean: renderCount > 0 ? Math.round(renderSumMs / renderCount) : 0
+    }
+  };
+}
@@ -0,0 +1,217 @@
+/**
+ * PDF Render Express Server
+ *
+ * Gotenberg-compatible proxy that caches PDFs by content and caps concurrent
+ * conversions. Point the workflow's Convert to PDF node at
+ * http://pdf-render:3000/forms/chromium/convert/html
+ */
+
+import express, { Request, Response, NextFunction } from 'express';
+import { parseMultipart, buildRenderKey } from './renderKey';
+import { getCached, setCached, recordBypass, clearCache, getCacheStats, CachedPdf } from './cache';
+import { runRender, getQueueStats } from './renderQueue';
+import { recordRender, getRecentRenders, getRenderStats, RenderOutcome } from './renderStats';
+
+const app = express();
+const PORT = parseInt(process.env.PORT || '3000', 10);
+const GOTENBERG_URL = (process.env.GOTENBERG_URL || 'http://gotenberg:3000').replace(/\/+$/, '');
+const CACHE_ENABLED = process.env.CACHE_ENABLED !== 'false';
+const UPSTREAM_TIMEOUT_MS = parseInt(process.env.UPSTREAM_TIMEOUT_MS || '120000', 10);
+const MAX_BODY_SIZE = process.env.MAX_BODY_SIZE || '50mb';
+
+// Conversions whose output depends only on the uploaded form. URL conversions
+// fetch live pages, so they are queued but never cached.
+const CACHEABLE_ROUTES = new Set(['/forms/chromium/convert/html', '/forms/chromium/convert/markdown']);
+
+interface UpstreamPdf extends CachedPdf {
+  status: number;
+}
+
+let bypassSeq = 0;
+
+// Log requests (minimal)
+app.use((req: Request, res: Response, next: NextFunction) => {
+  const start = Date.now();
+  res.on('finish', () => {
+    const duration = Date.now() - start;
+    const cacheStatus = res.getHeader('X-Cache') || '-';
+    console.log(`${req.method} ${req.path} ${res.statusCode} ${cacheStatus} ${duration}ms`);
+  });
+  next();
+});
+
+/**
+ * Bypass the cache via the /nocache prefix, an X-Cache-Bypass header,
+ * Cache-Control: no-cache, or CACHE_ENABLED=false
+ */
+function isBypass(req: Request): boolean {
+  if (!CACHE_ENABLED || req.path.startsWith('/nocache/')) {
+    return true;
+  }
+  const bypassHeader = String(req.headers['x-cache-bypass'] || '').toLowerCase();
+  if (bypassHeader === '1' || bypassHeader === 'true') {
+    return true;
+  }
+  return String(req.headers['cache-control'] || '').includes('no-cache');
+}
+
+async function callGotenberg(req: Request, route: string): Promise<UpstreamPdf> {
+  const headers: Record<string, string> = { 'Content-Type': String(req.headers['content-type'] || '') };
+  // Gotenberg options sent as headers (Gotenberg-Output-Filename, Gotenberg-Trace, ...)
+  for (const [name, value] of Object.entries(req.headers)) {
+    if (name.startsWith('gotenberg-') && typeof value === 'string') {
+      headers[name] = value;
+    }
+  }
+
+  const upstream = await fetch(`${GOTENBERG_URL}${route}`, {
+    method: 'POST',
+    headers,
+    body: req.body as Buffer,
+    signal: AbortSignal.timeout(UPSTREAM_TIMEOUT_MS)
+  });
+  return {
+    status: upstream.status,
+    contentType: upstream.headers.get('content-type') || 'application/pdf',
+    contentDisposition: upstream.headers.get('content-disposition'),
+    body: Buffer.from(await upstream.arrayBuffer())
+  };
+}
+
+function sendPdf(res: Response, status: number, pdf: CachedPdf): void {
+  if (pdf.contentDisposition) {
+    res.setHeader('Content-Disposition', pdf.contentDisposition);
+  }
+  res.status(status).type(pdf.contentType).send(pdf.body);
+}
+
+function sendError(res: Response, status: number, error: string, message: string): void {
+  if (!res.headersSent) {
+    res.status(status).json({ ok: false, error, message });
+  }
+}
+
+// Health check endpoint with cache, queue and render counters
+app.get('/health', (req: Request, res: Response) => {
+  res.json({
+    ok: true,
+    upstream: GOTENBERG_URL,
+    cacheEnabled: CACHE_ENABLED,
+    cache: getCacheStats(),
+    queue: getQueueStats(),
+    renders: getRenderStats()
+  });
+});
+
+// Most recent renders, newest first, with queue and render time per document
+app.get('/renders', (req: Request, res: Response) => {
+  const limit = parseInt(String(req.query.limit || '50'), 10);
+  res.json({ ok: true, renders: getRecentRenders(Number.isNaN(limit) ? 50 : limit) });
+});
+
+// Drop every cached PDF
+app.delete('/cache', (req: Request, res: Response) => {
+  const cleared = clearCache();
+  console.log(`[pdf-render] Cleared ${cleared} entries`);
+  res.json({ ok: true, cleared });
+});
+
+// Gotenberg conversions: cached by form content, queued under the concurrency cap
+app.post(['/forms/*', '/nocache/forms/*'], express.raw({ type: () => true, limit: MAX_BODY_SIZE }), async (req: Request, res: Response) => {
+  const start = Date.now();
+  const route = req.path.replace(/^\/nocache/, '');
+  const document = typeof req.headers['gotenberg-output-filename'] === 'string'
+    ? req.headers['gotenberg-output-filename']
+    : null;
+
+  let key: string;
+  try {
+    key = buildRenderKey(route, parseMultipart(req.body as Buffer, String(req.headers['content-type'] || '')), document);
+  } catch (err) {
+    sendError(res, 400, 'INVALID_REQUEST', 'Request body must be multipart/form-data, as Gotenberg expects');
+    return;
+  }
+
+  const bypass = isBypass(req) || !CACHEABLE_ROUTES.has(route);
+  const record = (outcome: RenderOutcome, status: number, bytes: number, queueMs: number, renderMs: number) => {
+    recordRender({
+      at: new Date(start).toISOString(),
+      key,
+      document,
+      outcome,
+      status,
+      bytes,
+      queueMs,
+      renderMs,
+      totalMs: Date.now() - start
+    });
+  };
+
+  if (bypass) {
+    recordBypass();
+  } else {
+    const cached = getCached(key);
+    if (cached !== null) {
+      record('HIT', 200, cached.body.length, 0, 0);
+      res.setHeader('X-Cache', 'HIT');
+      res.setHeader('X-Cache-Key', key);
+      res.setHeader('X-Render-Time-Ms', '0');
+      sendPdf(res, 200, cached);
+      return;
+    }
+  }
+
+  try {
+    // Bypassed requests never share a conversion with another request
+    const { result, timing } = await runRender(bypass ? `bypass:${bypassSeq++}` : key, () => callGotenberg(req, route));
+    const outcome: RenderOutcome = bypass ? 'BYPASS' : timing.coalesced ? 'COALESCED' : 'MISS';
+    record(outcome, result.status, result.body.length, timing.queueMs, timing.renderMs);
+
+    // Only successful conversions are cached; errors are retried upstream
+    if (!bypass && !timing.coalesced && result.status === 200) {
+      setCached(key, { body: result.body, contentType: result.contentType, contentDisposition: result.contentDisposition });
+    }
+    res.setHeader('X-Cache', outcome === 'COALESCED' ? 'MISS' : outcome);
+    res.setHeader('X-Cache-Key', key);
+    res.setHeader('X-Queue-Wait-Ms', String(timing.queueMs));
+    res.setHeader('X-Render-Time-Ms', String(timing.renderMs));
+    sendPdf(res, result.status, result);
+  } catch (err) {
+    const error = err instanceof Error ? err.message : String(err);
+    record('ERROR', 0, 0, 0, 0);
+    if (error === 'QUEUE_FULL' || error === 'QUEUE_TIMEOUT') {
+      res.setHeader('Retry-After', '5');
+      sendError(res, 503, error, 'Gotenberg is busy; retry shortly');
+      return;
+    }
+    console.error(`[pdf-render] Upstream error: ${error}`);
+    sendError(res, 502, 'UPSTREAM_ERROR', error);
+  }
+});
+
+// 404 handler
+app.use((req: Request, res: Response) => {
+  res.status(404).json({
+    ok: false,
+    error: 'NOT_FOUND',
+    message: `Endpoint ${req.method} ${req.path} not found`
+  });
+});
+
+// Error handler
+app.use((err: Error, req: Request, res: Response, next: NextFunction) => {
+  console.error('[server] Unhandled error:', err);
+  if (!res.headersSent) {
+    res.status(500).json({
+      ok: false,
+      error: 'INTERNAL_ERROR',
+      message: err.message
+    });
+  }
+});
+
+// Start server
+app.listen(PORT, '0.0.0.0', () => {
+  console.log(`[server] PDF Render listening on port ${PORT}`);
+  console.log(`[server] Config: UPSTREAM=${GOTENBERG_URL}, CACHE_ENABLED=${CACHE_ENABLED}`);
+});
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Async Submit-and-Poll Client
+
+Submits runs to the workflow's async webhook, which answers immediately with
+the n8n execution id (HTTP 202), then polls the executions API until each run
+finishes. Hundreds of runs share one event loop and one connection pool, so
+nothing holds a connection open for the minutes a run takes.
+
+Requires aiohttp (pip install aiohttp).
+
+Usage:
+    python async_client.py --jobs 200 [--corpus DIR] [--json-out FILE]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime
+
+import aiohttp
+
+from test_runner import load_corpus, load_fixtures, corpus_payload, summarize_load, print_status
+
+
+DEFAULT_ASYNC_PATH = "resume-enhance-v3-async"
+
+# Execution states that will not change any more
+FINISHED_STATUSES = {"success", "error", "crashed", "canceled"}
+
+# Submit responses worth retrying
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class ExecutionTimeout(Exception):
+    """A run did not finish within the client's deadline"""
+
+
+def extract_result(execution: dict):
+    """Return the last node's first output item, like a lastNode webhook would"""
+    result_data = (execution.get("data") or {}).get("resultData") or {}
+    last_node = result_data.get("lastNodeExecuted")
+    runs = (result_data.get("runData") or {}).get(last_node) or []
+    if not runs:
+        return None
+    outputs = (runs[-1].get("data") or {}).get("main") or []
+    for output in outputs:
+        if output:
+            return output[0].get("json")
+    return None
+
+
+def extract_error(execution: dict) -> str | None:
+    result_data = (execution.get("data") or {}).get("resultData") or {}
+    error = result_data.get("error")
+    if isinstance(error, dict):
+        return error.get("message") or error.get("name")
+    return error
+
+
+class AsyncWorkflowClient:
+    """Submit workflow runs and poll n8n for their results"""
+
+    def __init__(self, base_url: str, api_key: str, webhook_path: str = DEFAULT_ASYNC_PATH,
+                 max_api_concurrency: int = 20, poll_initial_s: float = 2.0,
+                 poll_max_s: float = 30.0, poll_factor: float = 1.6,
+                 submit_retries: int = 4, timeout_s: float = 900):
+        self.base_url = base_url.rstrip("/")
+        self.api_url = f"{self.base_url}/api/v1"
+        self.webhook_url = f"{self.base_url}/webhook/{webhook_path.strip('/')}"
+        self.headers = {"X-N8N-API-KEY": api_key}
+        self.poll_initial_s = poll_initial_s
+        self.poll_max_s = poll_max_s
+        self.poll_factor = poll_factor
+        self.submit_retries = submit_retries
+        self.timeout_s = timeout_s
+        self.max_api_concurrency = max_api_concurrency
+        self._api_slots = asyncio.Semaphore(max_api_concurrency)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_api_concurrency, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=60)
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    def _backoff(self, delay: float) -> float:
+        """Next poll delay: exponential with +/-20% jitter so polls don't align"""
+        delay = min(delay * self.poll_factor, self.poll_max_s)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def submit(self, payload: dict) -> str:
+        """POST to the async webhook and return the execution id"""
+        delay = 1.0
+        for attempt in range(self.submit_retries + 1):
+            try:
+                async with self._api_slots:
+                    async with self._session.post(self.webhook_url, json=payload) as response:
+                        if response.status in RETRY_STATUSES and attempt < self.submit_retries:
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, (), status=response.status
+                            )
+                        response.raise_for_status()
+                        body = await response.json(content_type=None)
+                execution_id = body.get("execution_id") if isinstance(body, dict) else None
+                if not execution_id:
+                    raise ValueError(f"Async webhook returned no execution_id: {body}")
+                return str(execution_id)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError, asyncio.TimeoutError) as e:
+                status = getattr(e, "status", None)
+                if attempt >= self.submit_retries or (status and status not in RETRY_STATUSES):
+                    raise
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                delay *= 2
+
+    async def get_execution(self, execution_id: str, include_data: bool = False) -> dict | None:
+        """GET /executions/{id}; None while n8n has not stored the execution yet"""
+        params = {"includeData": "true"} if include_data else None
+        async with self._api_slots:
+            async with self._session.get(
+                f"{self.api_url}/executions/{execution_id}",
+                headers=self.headers,
+                params=params
+            ) as response:
+                if response.status == 404:
+                    return None
+                response.raise_for_status()
+                return await response.json()
+
+    async def wait(self, execution_id: str) -> dict:
+        """Poll until the execution finishes, then fetch its data once"""
+        deadline = time.monotonic() + self.timeout_s
+        delay = self.poll_initial_s
+        polls = 0
+
+        while True:
+            await asyncio.sleep(delay)
+            polls += 1
+            try:
+                execution = await self.get_execution(execution_id)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                execution = None
+
+            status = (execution or {}).get("status")
+            if status is None and execution is not None:
+                status = "success" if execution.get("finished") else "running"
+            if status in FINISHED_STATUSES:
+                break
+            if time.monotonic() >= deadline:
+                raise ExecutionTimeout(f"Execution {execution_id} still {status or 'pending'} after {self.timeout_s}s")
+            delay = self._backoff(delay)
+
+        # Only the finished execution is fetched with data; polls stay small
+        execution = await self.get_execution(execution_id, include_data=True) or {}
+        return {
+            "execution_id": execution_id,
+            "status": status,
+            "result": extract_result(execution),
+            "error": extract_error(execution),
+            "polls": polls
+        }
+
+    async def run(self, payload: dict) -> dict:
+        """Submit one run and wait for it; never raises"""
+        start = time.perf_counter()
+        sample = {"request_id": payload.get("request_id"), "execution_id": None}
+        try:
+            sample["execution_id"] = await self.submit(payload)
+            outcome = await self.wait(sample["execution_id"])
+            sample.update(outcome)
+            if outcome["status"] != "success":
+                sample["error"] = f"execution_{outcome['status']}"
+            elif isinstance(outcome["result"], dict) and outcome["result"].get("success") is False:
+                sample["error"] = "workflow_error"
+            else:
+                sample["error"] = None
+        except ExecutionTimeout:
+            sample["error"] = "timeout"
+        except aiohttp.ClientResponseError as e:
+            sample["error"] = f"http_{e.status}"
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            sample["error"] = "connection_error"
+        except ValueError:
+            sample["error"] = "invalid_response"
+        sample["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return sample
+
+    async def run_many(self, payloads: list, max_in_flight: int = 200) -> list:
+        """Run every payload with at most max_in_flight submitted and unfinished"""
+        slots = asyncio.Semaphore(max_in_flight)
+
+        async def bounded(payload):
+            async with slots:
+                return await self.run(payload)
+
+        return await asyncio.gather(*(bounded(p) for p in payloads))
+
+
+async def run_async_load(base_url: str, api_key: str, corpus: list, fixtures: dict,
+                         jobs: int, max_in_flight: int, **client_kwargs) -> dict:
+    """Submit `jobs` runs through the async webhook and summarize them"""
+    run_id = f"async_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+    payloads = [
+        corpus_payload(corpus[i % len(corpus)], fixtures, f"{run_id}_{i:04d}")
+        for i in range(jobs)
+    ]
+
+    start = time.perf_counter()
+    async with AsyncWorkflowClient(base_url, api_key, **client_kwargs) as client:
+        samples = await client.run_many(payloads, max_in_flight)
+    duration = time.perf_counter() - start
+
+    report = summarize_load(samples, duration, max_in_flight)
+    report["url"] = client.webhook_url
+    report["polls"] = sum(s.get("polls", 0) for s in samples)
+    report["samples"] = samples
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async submit-and-poll client for the Resume Enhancer workflow")
+    parser.add_argument(
+        "--n8n-url",
+        default=os.getenv("N8N_HOST", "http://localhost:5678"),
+        help="n8n base URL (default: $N8N_HOST or http://localhost:5678)"
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.getenv("N8N_API_KEY", ""),
+        help="n8n API key (default: $N8N_API_KEY)"
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Runs to submit (default: 1)")
+    parser.add_argument("--max-in-flight", type=int, default=200, help="Unfinished runs at once (default: 200)")
+    parser.add_argument("--corpus", default=os.getenv("LOAD_CORPUS", ""), help="Directory of JD .txt / payload .json files")
+    parser.add_argument("--webhook-path", default=DEFAULT_ASYNC_PATH, help=f"Async webhook path (default: {DEFAULT_ASYNC_PATH})")
+    parser.add_argument("--poll-max-s", type=float, default=30.0, help="Longest wait between polls (default: 30)")
+    parser.add_argument("--timeout", type=float, default=900, help="Per-run deadline in seconds (default: 900)")
+    parser.add_argument("--json-out", default="", help="Also write the full report with per-run samples to this file")
+    args = parser.parse_args()
+
+    if not args.api_key:
+        print("Error: n8n API key is required to poll executions")
+        print("Set N8N_API_KEY environment variable or use --api-key")
+        sys.exit(1)
+
+    corpus = load_corpus(args.corpus)
+    print_status(f"Submitting {args.jobs} runs (max {args.max_in_flight} in flight)", "info")
+    report = asyncio.run(run_async_load(
+        args.n8n_url, args.api_key, corpus, load_fixtures(), args.jobs, args.max_in_flight,
+        webhook_path=args.webhook_path, poll_max_s=args.poll_max_s, timeout_s=args.timeout
+    ))
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print_status(f"Report written to {args.json_out}", "info")
+
+    print(json.dumps({k: v for k, v in report.items() if k != "samples"}, indent=2))
+    sys.exit(1 if report["succeeded"] == 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Local ATS Scorer
+
+Runs the workflow's Score ATS Keywords node outside n8n: one resume against
+any number of job descriptions in a single call, ranked by score. Handy for
+triaging a batch of postings before spending LLM calls on any of them.
+
+The scorer is read from the workflow JSON, so this always runs the code the
+workflow ships. Node.js must be on PATH.
+
+Usage:
+    python ats_score.py jobs/*.txt
+    python ats_score.py --resume parsed_resume.json jobs/*.txt --json
+    python ats_score.py --resume resume.txt jd1.txt jd2.txt --missing 10
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from workflow_engine import CodeRunner, WorkflowError, DEFAULT_WORKFLOW, TESTS_DIR
+
+
+SCORER_NODE = "Score ATS Keywords"
+
+
+def load_scorer(workflow: str = str(DEFAULT_WORKFLOW)) -> str:
+    """The Score ATS Keywords node's JavaScript"""
+    with open(workflow, encoding="utf-8") as f:
+        nodes = json.load(f)["nodes"]
+    for node in nodes:
+        if node["name"] == SCORER_NODE:
+            return node["parameters"]["jsCode"]
+    raise WorkflowError(f"No '{SCORER_NODE}' node in {workflow}")
+
+
+def load_resume(path: str):
+    """Parsed resume JSON (sectioned, scored per section) or plain resume text"""
+    text = Path(path).read_text(encoding="utf-8")
+    if path.endswith(".json"):
+        return json.loads(text)
+    return text
+
+
+def score_batch(resume, jds: dict, workflow: str = str(DEFAULT_WORKFLOW), runner: CodeRunner = None) -> list:
+    """
+    Score one resume against many JDs ({name: text}) in one scorer call.
+    Returns one result per JD, best score first.
+    """
+    items = [{"json": {"corrected_resume": resume, "jd_text": text, "jd_name": name}} for name, text in jds.items()]
+    own_runner = runner is None
+    runner = runner or CodeRunner()
+    try:
+        out = runner.call("code", code=load_scorer(workflow), ctx={"input": items, "nodes": {}})
+    finally:
+        if own_runner:
+            runner.close()
+
+    results = [{"jd": item["json"]["jd_name"], **item["json"]["ats_local"]} for item in out["items"]]
+    return sorted(results, key=lambda r: -1 if r["ats_score"] is None else r["ats_score"], reverse=True)
+
+
+def format_results(results: list, missing: int = 5) -> str:
+    lines = [f"{'Score':>5}  {'Matched':>9}  {'JD':<40} Top missing", "-" * 96]
+    for r in results:
+        score = "-" if r["ats_score"] is None else f"{r['ats_score']}%"
+        matched = f"{len(r['matched_keywords'])}/{len(r['keywords'])}"
+        lines.append(f"{score:>5}  {matched:>9}  {r['jd'][:40]:<40} {', '.join(r['missing_keywords'][:missing])}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score one resume against many job descriptions locally")
+    parser.add_argument("jds", nargs="+", help="Job description text files")
+    parser.add_argument("--resume", default=str(TESTS_DIR / "fixtures" / "sample_resume.txt"),
+                        help="Parsed resume JSON (e.g. from the parsed-resume cache) or resume text")
+    parser.add_argument("--workflow", default=str(DEFAULT_WORKFLOW), help="Workflow JSON export")
+    parser.add_argument("--missing", type=int, default=5, help="Missing keywords to show per JD")
+    parser.add_argument("--json", action="store_true", help="Print full results as JSON")
+    args = parser.parse_args()
+
+    try:
+        resume = load_resume(args.resume)
+        jds = {path: Path(path).read_text(encoding="utf-8") for path in args.jds}
+        results = score_batch(resume, jds, args.workflow)
+    except (OSError, ValueError, WorkflowError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(results, indent=2) if args.json else format_results(results, args.missing))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Execution Profiler
+
+Breaks an n8n execution down per node from its runData: duration, queue
+wait (time between the node's input being ready and the node starting),
+items and bytes in/out, and token usage for OpenAI calls. Works on
+executions fetched from the n8n API, saved execution JSON, or an offline
+run of workflow_engine.py.
+
+Output formats: table (flame-style timeline), json, csv, folded (for
+flamegraph.pl / speedscope).
+
+Usage:
+    python execution_profiler.py --execution-id 1234
+    python execution_profiler.py --latest
+    python execution_profiler.py --file execution.json --format csv
+    python execution_profiler.py --offline --llm-latency-ms 1500
+"""
+
+import io
+import os
+import re
+import csv
+import sys
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+from n8n_client import shared_client
+
+
+CSV_FIELDS = [
+    "node", "type", "run", "status", "start_ms", "duration_ms", "queue_wait_ms",
+    "items_in", "items_out", "bytes_in", "bytes_out",
+    "prompt_tokens", "completion_tokens", "total_tokens", "token_source"
+]
+
+# n8n reports binary sizes with pretty-bytes (base 1000)
+SIZE_UNITS = {"b": 1, "kb": 1000, "mb": 1000 ** 2, "gb": 1000 ** 3}
+
+
+# ----------------------------------------------------------------------
+# Fetching
+# ----------------------------------------------------------------------
+
+def fetch_execution(base_url: str, api_key: str, execution_id: str) -> dict:
+    """GET one execution with its runData"""
+    return shared_client(base_url, api_key).get_execution(execution_id, include_data=True)
+
+
+def latest_execution_id(base_url: str, api_key: str, workflow_name: str = "Resume Enhancer") -> str | None:
+    """Most recent execution of the first workflow matching workflow_name"""
+    client = shared_client(base_url, api_key)
+    workflow = client.find_workflow(workflow_name)
+    if not workflow:
+        return None
+    execution = client.latest_execution(workflow["id"])
+    return str(execution["id"]) if execution else None
+
+
+def execution_from_offline_run(run: dict, workflow: dict) -> dict:
+    """Wrap a WorkflowEngine.run() result in the executions API shape"""
+    started = run["started_at"]
+    return {
+        "id": run["execution_id"],
+        "status": "success",
+        "mode": "offline",
+        "startedAt": datetime.fromtimestamp(started).astimezone().isoformat(),
+        "stoppedAt": datetime.fromtimestamp(started + run["total_ms"] / 1000).astimezone().isoformat(),
+        "workflowData": workflow,
+        "data": {"resultData": {"runData": run["run_data"], "lastNodeExecuted": run["last_node"]}}
+    }
+
+
+# ----------------------------------------------------------------------
+# Measuring
+# ----------------------------------------------------------------------
+
+def _epoch_ms(value) -> float | None:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000
+
+
+def binary_size(binary: dict) -> int:
+    """Size of one binary property: inline base64, byte count, or '12.3 kB'"""
+    if binary.get("data"):
+        return len(binary["data"]) * 3 // 4
+    size = binary.get("fileSize")
+    if isinstance(size, (int, float)):
+        return int(size)
+    match = re.match(r"^\s*([\d.]+)\s*([kmg]?b)\s*$", str(size or ""), re.IGNORECASE)
+    if match:
+        return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+    return 0
+
+
+def items_size(items: list) -> int:
+    """JSON bytes plus binary bytes of a list of items"""
+    total = 0
+    for item in items or []:
+        total += len(json.dumps(item.get("json", {}), ensure_ascii=False, default=str).encode("utf-8"))
+        for binary in (item.get("binary") or {}).values():
+            total += binary_size(binary)
+    return total
+
+
+def node_output(run_data: dict, node: str, run_index: int = 0, output_index: int | None = None) -> list:
+    """Items a node run emitted, on one output or all of them"""
+    runs = run_data.get(node) or []
+    if run_index >= len(runs):
+        return []
+    outputs = ((runs[run_index].get("data") or {}).get("main")) or []
+    if output_index is not None:
+        return (outputs[output_index] if output_index < len(outputs) else None) or []
+    return [item for output in outputs for item in (output or [])]
+
+
+def token_usage(items: list, node_type: str) -> dict | None:
+    """
+    Token usage reported in a node's output.
+
+    Understands OpenAI `usage` (HTTP Request calls, with or without Full
+    Response) and LangChain `tokenUsage`. OpenAI nodes that only return the
+    message (Simplify Output on) get a 4-chars-per-token estimate of the completion.
+    """
+    prompt = completion = 0
+    found = False
+    for item in items:
+        data = item.get("json") or {}
+        if isinstance(data.get("body"), dict) and "statusCode" in data:
+            # HTTP Request with Full Response on
+            data = data["body"]
+        usages = []
+        if isinstance(data.get("usage"), dict):
+            usages.append(data["usage"])
+        if isinstance(data.get("tokenUsage"), dict):
+            usages.append(data["tokenUsage"])
+        for usage in usages:
+            found = True
+            prompt += usage.get("prompt_tokens", usage.get("promptTokens", 0)) or 0
+            completion += usage.get("completion_tokens", usage.get("completionTokens", 0)) or 0
+    if found:
+        return {"prompt": prompt, "completion": completion, "total": prompt + completion, "source": "usage"}
+
+    if "openai" not in node_type.lower():
+        return None
+    chars = 0
+    for item in items:
+        content = ((item.get("json") or {}).get("message") or {}).get("content")
+        if content is not None:
+            chars += len(content if isinstance(content, str) else json.dumps(content))
+    return {"prompt": None, "completion": chars // 4, "total": None, "source": "estimated"}
+
+
+def profile_execution(execution: dict, workflow: dict | None = None) -> dict:
+    """Per-node breakdown of one execution"""
+    result_data = (execution.get("data") or {}).get("resultData") or {}
+    run_data = result_data.get("runData") or {}
+    workflow = workflow or execution.get("workflowData") or {}
+    node_types = {n["name"]: n.get("type", "") for n in workflow.get("nodes", [])}
+
+    starts = [r.get("startTime") for runs in run_data.values() for r in runs if r.get("startTime")]
+    started = _epoch_ms(execution.get("startedAt"))
+    # runData start times are whole milliseconds; never start after the first node
+    execution_start = min(filter(None, [started] + starts), default=0)
+    ends = {}
+
+    nodes = []
+    for name, runs in run_data.items():
+        for run_index, run in enumerate(runs):
+            start = run.get("startTime") or execution_start
+            duration = run.get("executionTime") or 0
+            ends[(name, run_index)] = start + duration
+            nodes.append({"node": name, "run": run_index, "start": start, "duration": duration, "raw": run})
+
+    profiled = []
+    for entry in sorted(nodes, key=lambda n: n["start"]):
+        name, run = entry["node"], entry["raw"]
+        node_type = node_types.get(name, "")
+
+        items_in, ready = [], execution_start
+        for source in run.get("source") or []:
+            if not source:
+                continue
+            parent = source.get("previousNode")
+            parent_run = source.get("previousNodeRun", 0) or 0
+            items_in += node_output(run_data, parent, parent_run, source.get("previousNodeOutput"))
+            ready = max(ready, ends.get((parent, parent_run), ready))
+
+        items_out = node_output(run_data, name, entry["run"])
+        tokens = token_usage(items_out, node_type) or {}
+        profiled.append({
+            "node": name,
+            "type": node_type,
+            "run": entry["run"],
+            "status": run.get("executionStatus") or ("error" if run.get("error") else "success"),
+            "start_ms": round(entry["start"] - execution_start, 1),
+            "duration_ms": round(entry["duration"], 1),
+            "queue_wait_ms": round(max(0, entry["start"] - ready), 1),
+            "items_in": len(items_in),
+            "items_out": len(items_out),
+            "bytes_in": items_size(items_in),
+            "bytes_out": items_size(items_out),
+            "prompt_tokens": tokens.get("prompt"),
+            "completion_tokens": tokens.get("completion"),
+            "total_tokens": tokens.get("total"),
+            "token_source": tokens.get("source")
+        })
+
+    stopped = _epoch_ms(execution.get("stoppedAt"))
+    last_end = max(ends.values()) if ends else execution_start
+    created = _epoch_ms(execution.get("createdAt"))
+    node_ms = sum(n["duration_ms"] for n in profiled)
+    bottleneck = max(profiled, key=lambda n: n["duration_ms"]) if profiled else None
+
+    return {
+        "execution_id": str(execution.get("id", "")),
+        "status": execution.get("status") or ("success" if execution.get("finished") else "unknown"),
+        "last_node": result_data.get("lastNodeExecuted"),
+        "wall_ms": round((stopped or last_end) - execution_start, 1),
+        "node_ms": round(node_ms, 1),
+        "execution_queue_wait_ms": round(started - created, 1) if created and started else None,
+        "tokens": {
+            "prompt": sum(n["prompt_tokens"] or 0 for n in profiled),
+            "completion": sum(n["completion_tokens"] or 0 for n in profiled),
+            "estimated_nodes": [n["node"] for n in profiled if n["token_source"] == "estimated"]
+        },
+        "bottleneck": bottleneck["node"] if bottleneck else None,
+        "nodes": profiled
+    }
+
+
+# ----------------------------------------------------------------------
+# Rendering
+# ----------------------------------------------------------------------
+
+def _fmt_ms(ms: float) -> str:
+    return f"{ms / 1000:.2f} s" if ms >= 1000 else f"{ms:.0f} ms"
+
+
+def _fmt_bytes(size: int) -> str:
+    for unit in ("B", "kB", "MB"):
+        if size < 1000:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1000
+    return f"{size:.1f} GB"
+
+
+def format_flame(profile: dict, width: int = 40, limit: int | None = None) -> str:
+    """
+    Flame-style summary: nodes by duration with a timeline bar showing when
+    each one ran within the execution.
+    """
+    wall = profile["wall_ms"] or 1
+    nodes = sorted(profile["nodes"], key=lambda n: n["duration_ms"], reverse=True)
+    if limit:
+        nodes = nodes[:limit]
+
+    lines = [
+        f"Execution {profile['execution_id']} ({profile['status']}): "
+        f"{_fmt_ms(profile['wall_ms'])} wall, {_fmt_ms(profile['node_ms'])} in nodes, "
+        f"{profile['tokens']['prompt'] + profile['tokens']['completion']} tokens",
+        f"Bottleneck: {profile['bottleneck']}",
+        "",
+        f"{'Node':<30} {'Duration':>9} {'Share':>6} {'Wait':>8} {'Out':>9} {'Tokens':>7}  Timeline"
+    ]
+    lines.append("-" * (len(lines[-1]) + width - 8))
+    for n in nodes:
+        offset = int(n["start_ms"] / wall * width)
+        length = max(1, round(n["duration_ms"] / wall * width)) if n["duration_ms"] > 0 else 0
+        offset = min(offset, width - length)
+        bar = " " * offset + "█" * length
+        tokens = n["total_tokens"] if n["total_tokens"] is not None else n["completion_tokens"]
+        token_text = "" if tokens is None else f"{'~' if n['token_source'] == 'estimated' else ''}{tokens}"
+        lines.append(
+            f"{n['node'][:30]:<30} {_fmt_ms(n['duration_ms']):>9} "
+            f"{n['duration_ms'] / wall * 100:>5.1f}% {_fmt_ms(n['queue_wait_ms']):>8} "
+            f"{_fmt_bytes(n['bytes_out']):>9} {token_text:>7}  |{bar:<{width}}|"
+        )
+    return "\n".join(lines)
+
+
+def to_csv(profile: dict) -> str:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    for n in profile["nodes"]:
+        writer.writerow(n)
+    return out.getvalue()
+
+
+def to_folded(profile: dict, root: str = "execution") -> str:
+    """Folded stacks (`root;type;node <ms>`) for flamegraph.pl or speedscope"""
+    lines = []
+    for n in profile["nodes"]:
+        kind = n["type"].split(".")[-1] or "node"
+        frame = n["node"].replace(";", ",")
+        lines.append(f"{root};{kind};{frame} {max(0, round(n['duration_ms']))}")
+    return "\n".join(lines) + "\n"
+
+
+def render(profile: dict, fmt: str) -> str:
+    if fmt == "json":
+        return json.dumps(profile, indent=2)
+    if fmt == "csv":
+        return to_csv(profile)
+    if fmt == "folded":
+        return to_folded(profile)
+    return format_flame(profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-node latency breakdown of an n8n execution")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--execution-id", help="Execution to fetch from the n8n API")
+    source.add_argument("--latest", action="store_true", help="Profile the latest Resume Enhancer execution")
+    source.add_argument("--file", help="Execution JSON saved from GET /api/v1/executions/{id}?includeData=true")
+    source.add_argument("--offline", action="store_true", help="Profile an offline run of workflow_engine.py")
+    parser.add_argument(
+        "--n8n-url",
+        default=os.getenv("N8N_HOST", "http://localhost:5678"),
+        help="n8n base URL (default: $N8N_HOST or http://localhost:5678)"
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.getenv("N8N_API_KEY", ""),
+        help="n8n API key (default: $N8N_API_KEY)"
+    )
+    parser.add_argument("--workflow", default="", help="Workflow JSON (for node types; offline: the workflow to run)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Offline: simulated latency per LLM call")
+    parser.add_argument("--format", choices=["table", "json", "csv", "folded"], default="table")
+    parser.add_argument("--out", default="", help="Write to this file instead of stdout")
+    args = parser.parse_args()
+
+    workflow = None
+    if args.workflow:
+        with open(args.workflow, "r", encoding="utf-8") as f:
+            workflow = json.load(f)
+
+    if args.offline:
+        from workflow_engine import WorkflowEngine, TemplateEchoLLM, DEFAULT_WORKFLOW
+        fixtures = Path(__file__).parent / "fixtures"
+        resume_text = (fixtures / "sample_resume.txt").read_text(encoding="utf-8")
+        path = args.workflow or str(DEFAULT_WORKFLOW)
+        with WorkflowEngine.from_file(
+            path,
+            llm=TemplateEchoLLM(latency_ms=args.llm_latency_ms),
+            read_file=lambda p: resume_text.encode("utf-8"),
+            extract_pdf=lambda data: data.decode("utf-8")
+        ) as engine:
+            run = engine.run({"jd_text": (fixtures / "sample_job_description.txt").read_text(encoding="utf-8")})
+            execution = execution_from_offline_run(run, engine.workflow)
+    elif args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            execution = json.load(f)
+    else:
+        if not args.api_key:
+            print("Error: n8n API key is required")
+            print("Set N8N_API_KEY environment variable or use --api-key")
+            sys.exit(1)
+        execution_id = args.execution_id or latest_execution_id(args.n8n_url, args.api_key)
+        if not execution_id:
+            print("No executions found")
+            sys.exit(1)
+        execution = fetch_execution(args.n8n_url, args.api_key, execution_id)
+
+    output = render(profile_execution(execution, workflow), args.format)
+    if args.out:
+        Path(args.out).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Fake Redis
+
+Local stand-in for the Redis server behind job-fetcher's shared rate limiter
+(RATE_LIMIT_REDIS_URL), so several job-fetcher replicas can be tested against
+one store without installing Redis.
+
+Speaks RESP2 over TCP and implements the commands job-fetcher and these tests
+use: PING, ECHO, AUTH, SELECT, TIME, GET, SET (PX), DEL, EXISTS, PEXPIRE,
+PTTL, HSET, HMGET, HGETALL, KEYS, FLUSHALL, DBSIZE, SCRIPT LOAD/EXISTS/FLUSH,
+EVAL and EVALSHA. There is no Lua interpreter: EVAL only accepts scripts
+registered in SCRIPTS (by their first-line marker), which are re-implemented
+in Python. Each entry pins the SHA1 of the Lua source it was ported from, so
+a script whose Lua changed is refused until the port is updated to match.
+
+Usage:
+    python fake_redis.py [--port 6379]
+"""
+
+import sys
+import time
+import socket
+import fnmatch
+import hashlib
+import argparse
+import threading
+import socketserver
+
+
+class RespError(Exception):
+    """Sent to the client as an error reply"""
+
+
+class RespSimple(str):
+    """Sent as a simple string (+OK) rather than a bulk string"""
+
+
+def token_bucket(store: "FakeStore", keys: list, args: list):
+    """job-fetcher/src/rateLimit.ts TOKEN_BUCKET_SCRIPT"""
+    capacity, refill_per_ms, cost = float(args[0]), float(args[1]), float(args[2])
+    now = store.now_ms()
+    tokens, ts = store.hmget(keys[0], ["tokens", "ts"])
+    tokens = float(tokens) if tokens is not None else capacity
+    ts = int(ts) if ts is not None else now
+    tokens = min(capacity, tokens + max(0, now - ts) * refill_per_ms)
+    allowed = 0
+    if tokens >= cost:
+        tokens -= cost
+        allowed = 1
+    store.hset(keys[0], {"tokens": repr(tokens), "ts": str(now)})
+    store.pexpire(keys[0], int(args[3]))
+    return [allowed, repr(tokens)]
+
+
+# First line of the Lua source -> (Python implementation, SHA1 of the Lua it ports)
+SCRIPTS = {
+    "-- job-fetcher:token-bucket": (token_bucket, "e1b121c60dbb3ba2859cc995ba06a5da286be02a"),
+}
+
+
+class FakeStore:
+    """Keyspace with millisecond expiry (checked lazily on access)"""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.lock = threading.RLock()
+        self.data = {}
+        self.expires = {}
+        self.scripts = {}
+        self.commands = 0
+
+    def now_ms(self) -> int:
+        return int(self.clock() * 1000)
+
+    def _live(self, key: str):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= self.now_ms():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def _hash(self, key: str) -> dict:
+        value = self._live(key)
+        if value is None:
+            value = self.data[key] = {}
+        if not isinstance(value, dict):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def hset(self, key: str, fields: dict) -> int:
+        h = self._hash(key)
+        added = len([f for f in fields if f not in h])
+        h.update(fields)
+        return added
+
+    def hmget(self, key: str, fields: list) -> list:
+        value = self._live(key)
+        if value is None:
+            return [None] * len(fields)
+        if not isinstance(value, dict):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return [value.get(f) for f in fields]
+
+    def pexpire(self, key: str, ms: int) -> int:
+        if self._live(key) is None:
+            return 0
+        self.expires[key] = self.now_ms() + ms
+        return 1
+
+    def pttl(self, key: str) -> int:
+        if self._live(key) is None:
+            return -2
+        expires = self.expires.get(key)
+        return -1 if expires is None else expires - self.now_ms()
+
+    def load_script(self, source: str) -> str:
+        marker = source.lstrip().split("\n", 1)[0].strip()
+        if marker not in SCRIPTS:
+            raise RespError(f"ERR fake_redis does not implement this script ({marker[:40]!r})")
+        implementation, ported_sha = SCRIPTS[marker]
+        sha = hashlib.sha1(source.encode()).hexdigest()
+        if sha != ported_sha:
+            raise RespError(f"ERR fake_redis ports a different version of {marker[3:]!r} "
+                            f"(Lua SHA1 {sha}, port {ported_sha}); update {implementation.__name__}()")
+        self.scripts[sha] = implementation
+        return sha
+
+    def run_script(self, sha: str, args: list):
+        script = self.scripts.get(sha.lower())
+        if script is None:
+            raise RespError("NOSCRIPT No matching script. Please use EVAL.")
+        numkeys = int(args[0])
+        return script(self, args[1:1 + numkeys], args[1 + numkeys:])
+
+    def execute(self, args: list):
+        """Run one command; returns the reply value"""
+        name = args[0].upper()
+        rest = args[1:]
+        with self.lock:
+            self.commands += 1
+            if name == "PING":
+                return RespSimple(rest[0] if rest else "PONG")
+            if name == "ECHO":
+                return rest[0]
+            if name in ("AUTH", "SELECT"):
+                return RespSimple("OK")
+            if name == "TIME":
+                now = self.clock()
+                return [str(int(now)), str(int((now % 1) * 1_000_000))]
+            if name == "GET":
+                value = self._live(rest[0])
+                if isinstance(value, dict):
+                    raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+                return value
+            if name == "SET":
+                self.data[rest[0]] = rest[1]
+                self.expires.pop(rest[0], None)
+                options = [o.upper() for o in rest[2:]]
+                if "PX" in options:
+                    self.expires[rest[0]] = self.now_ms() + int(rest[2 + options.index("PX") + 1])
+                return RespSimple("OK")
+            if name == "DEL":
+                removed = 0
+                for key in rest:
+                    if self._live(key) is not None:
+                        removed += 1
+                    self.data.pop(key, None)
+                    self.expires.pop(key, None)
+                return removed
+            if name == "EXISTS":
+                return sum(1 for key in rest if self._live(key) is not None)
+            if name == "PEXPIRE":
+                return self.pexpire(rest[0], int(rest[1]))
+            if name == "PTTL":
+                return self.pttl(rest[0])
+            if name == "HSET":
+                return self.hset(rest[0], dict(zip(rest[1::2], rest[2::2])))
+            if name == "HMGET":
+                return self.hmget(rest[0], rest[1:])
+            if name == "HGETALL":
+                value = self._live(rest[0]) or {}
+                return [item for pair in value.items() for item in pair]
+            if name == "KEYS":
+                pattern = rest[0] if rest else "*"
+                return sorted(k for k in list(self.data)
+                              if self._live(k) is not None and fnmatch.fnmatchcase(k, pattern))
+            if name == "DBSIZE":
+                return len([k for k in list(self.data) if self._live(k) is not None])
+            if name == "FLUSHALL":
+                self.data.clear()
+                self.expires.clear()
+                return RespSimple("OK")
+            if name == "SCRIPT":
+                sub = rest[0].upper()
+                if sub == "LOAD":
+                    return self.load_script(rest[1])
+                if sub == "EXISTS":
+                    return [1 if sha.lower() in self.scripts else 0 for sha in rest[1:]]
+                if sub == "FLUSH":
+                    self.scripts.clear()
+                    return RespSimple("OK")
+            if name == "EVAL":
+                return self.run_script(self.load_script(rest[0]), rest[1:])
+            if name == "EVALSHA":
+                return self.run_script(rest[0], rest[1:])
+        raise RespError(f"ERR unknown command '{args[0]}'")
+
+
+def encode(value) -> bytes:
+    if isinstance(value, RespError):
+        return f"-{value}\r\n".encode()
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespSimple):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, bool):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, (list, tuple)):
+        return f"*{len(value)}\r\n".encode() + b"".join(encode(v) for v in value)
+    data = str(value).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    """One client connection; commands may be pipelined"""
+
+    store: FakeStore
+
+    def read_command(self) -> list | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command (e.g. typed into telnet)
+            return line.decode().split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2].decode())
+        return args
+
+    def handle(self):
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                args = self.read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                reply = self.store.execute(args)
+            except RespError as e:
+                reply = e
+            except (IndexError, ValueError):
+                reply = RespError(f"ERR wrong number or type of arguments for '{args[0]}'")
+            self.wfile.write(encode(reply))
+            self.wfile.flush()
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class FakeRedis:
+    """Run the fake on a background thread: `with FakeRedis() as redis: redis.url`"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, clock=time.time):
+        self.store = FakeStore(clock)
+        handler = type("BoundRespHandler", (RespHandler,), {"store": self.store})
+        self.server = RespServer((host, port), handler)
+        self.url = f"redis://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Redis for job-fetcher's shared rate limiter")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    fake = FakeRedis(args.host, args.port)
+    print(f"[fake_redis] Listening on {args.host}:{fake.server.server_address[1]}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
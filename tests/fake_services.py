@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Fake Services
+
+Local stand-ins for the workflow's external dependencies, with configurable
+latency distributions and failure rates, so pipeline changes can be
+benchmarked reproducibly without network access.
+
+One server answers for all of them, routed by path:
+
+    POST /v1/chat/completions            OpenAI (canned JSON from the prompt's template)
+    POST /forms/chromium/convert/html    Gotenberg (fixture PDF)
+    POST /fetch                          job-fetcher (fixture job posting)
+    GET  /<encoded url>                  Jina Reader (fixture job description)
+    GET  /health                         health check for all of the above
+    GET  /__fakes/stats                  request/failure counts and latency per service
+    PUT  /__fakes/config                 replace the behaviour config at runtime
+
+Config (JSON, see fixtures/fake_services.json):
+
+    {
+      "seed": 42,
+      "time_scale": 1.0,
+      "services": {
+        "openai": {
+          "latency": {"dist": "lognormal", "median_ms": 2000, "sigma": 0.4},
+          "failure_rate": 0.01, "failure_status": 500,
+          "hang_rate": 0.0, "hang_ms": 120000,
+          "models": {"gpt-4o-mini": {"latency": {"dist": "fixed", "ms": 800}}}
+        },
+        "job_fetcher": {"blocked_rate": 0.1, "block_reason": "LOGIN_REQUIRED", ...}
+      }
+    }
+
+Latency distributions: fixed (ms), uniform (min_ms, max_ms), normal
+(mean_ms, stddev_ms), lognormal (median_ms, sigma); all accept max_ms.
+time_scale multiplies every delay (0.01 runs a benchmark 100x faster).
+
+Usage:
+    python fake_services.py [--port 8000] [--config fixtures/fake_services.json]
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from workflow_engine import TemplateEchoLLM, FAKE_PDF
+
+
+TESTS_DIR = Path(__file__).parent
+DEFAULT_CONFIG = TESTS_DIR / "fixtures" / "fake_services.json"
+SERVICES = ("openai", "gotenberg", "job_fetcher", "jina")
+
+
+def sample_latency_ms(spec: dict, rng: random.Random) -> float:
+    """Draw one delay from a latency spec"""
+    dist = spec.get("dist", "fixed")
+    if dist == "fixed":
+        value = spec.get("ms", 0)
+    elif dist == "uniform":
+        value = rng.uniform(spec.get("min_ms", 0), spec.get("max_ms", 0))
+    elif dist == "normal":
+        value = rng.gauss(spec.get("mean_ms", 0), spec.get("stddev_ms", 0))
+    elif dist == "lognormal":
+        value = rng.lognormvariate(math.log(max(spec.get("median_ms", 1), 1e-3)), spec.get("sigma", 0.5))
+    else:
+        raise ValueError(f"Unknown latency distribution: {dist}")
+    if "max_ms" in spec and dist != "uniform":
+        value = min(value, spec["max_ms"])
+    return max(0.0, value)
+
+
+def _percentile(values: list, pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 1)
+
+
+class FakeBehaviour:
+    """Latency and failure decisions for every service, plus counters"""
+
+    def __init__(self, config: dict):
+        self.lock = threading.Lock()
+        self.configure(config)
+
+    def configure(self, config: dict):
+        with self.lock:
+            self.config = config
+            self.rng = random.Random(config.get("seed"))
+            self.time_scale = config.get("time_scale", 1.0)
+            self.stats = {s: {"requests": 0, "failures": 0, "hangs": 0, "blocked": 0, "latency_ms": []}
+                          for s in SERVICES}
+
+    def spec(self, service: str, model: str | None = None) -> dict:
+        spec = dict(self.config.get("services", {}).get(service, {}))
+        if model:
+            spec.update(spec.get("models", {}).get(model, {}))
+        return spec
+
+    def decide(self, service: str, model: str | None = None) -> dict:
+        """Pick this request's outcome: ok, fail, hang or blocked, and its delay"""
+        spec = self.spec(service, model)
+        with self.lock:
+            roll = self.rng.random()
+            delay = sample_latency_ms(spec.get("latency", {}), self.rng)
+            stats = self.stats[service]
+            stats["requests"] += 1
+
+            hang_rate = spec.get("hang_rate", 0)
+            failure_rate = spec.get("failure_rate", 0)
+            blocked_rate = spec.get("blocked_rate", 0)
+            if roll < hang_rate:
+                outcome, delay = "hang", spec.get("hang_ms", 120000)
+                stats["hangs"] += 1
+            elif roll < hang_rate + failure_rate:
+                outcome = "fail"
+                stats["failures"] += 1
+            elif roll < hang_rate + failure_rate + blocked_rate:
+                outcome = "blocked"
+                stats["blocked"] += 1
+            else:
+                outcome = "ok"
+            stats["latency_ms"].append(delay)
+
+        return {
+            "outcome": outcome,
+            "delay_s": delay * self.time_scale / 1000,
+            "status": spec.get("failure_status", 500),
+            "block_reason": spec.get("block_reason", "LOGIN_REQUIRED")
+        }
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                service: {
+                    "requests": s["requests"],
+                    "failures": s["failures"],
+                    "hangs": s["hangs"],
+                    "blocked": s["blocked"],
+                    "latency_ms": {
+                        "p50": _percentile(s["latency_ms"], 50),
+                        "p95": _percentile(s["latency_ms"], 95),
+                        "max": round(max(s["latency_ms"]), 1) if s["latency_ms"] else None
+                    }
+                }
+                for service, s in self.stats.items()
+            }
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """Routes requests to the fake services"""
+
+    behaviour: FakeBehaviour = None
+    llm = TemplateEchoLLM()
+    jd_text = ""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    # -- plumbing ------------------------------------------------------
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body, content_type: str = "application/json"):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _apply(self, service: str, model: str | None = None) -> dict | None:
+        """Sleep for the sampled latency; answer failures. Returns the decision when ok"""
+        decision = self.behaviour.decide(service, model)
+        time.sleep(decision["delay_s"])
+        if decision["outcome"] == "hang":
+            self._send(504, {"ok": False, "error": "FAKE_TIMEOUT"})
+            return None
+        if decision["outcome"] == "fail":
+            self._send(decision["status"], {"ok": False, "error": "FAKE_FAILURE",
+                                            "message": f"Injected {service} failure"})
+            return None
+        return decision
+
+    # -- routes --------------------------------------------------------
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send(200, {"ok": True, "fake": True})
+        elif path == "/__fakes/stats":
+            self._send(200, self.behaviour.snapshot())
+        else:
+            self._jina(unquote(self.path.lstrip("/")))
+
+    def do_PUT(self):
+        if urlsplit(self.path).path == "/__fakes/config":
+            self.behaviour.configure(json.loads(self._body() or b"{}"))
+            self._send(200, {"ok": True})
+        else:
+            self._send(404, {"ok": False, "error": "NOT_FOUND"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = self._body()
+        if path.endswith("/chat/completions"):
+            self._openai(json.loads(body or b"{}"))
+        elif path == "/forms/chromium/convert/html":
+            self._gotenberg()
+        elif path == "/fetch":
+            self._job_fetcher(json.loads(body or b"{}"))
+        else:
+            self._send(404, {"ok": False, "error": "NOT_FOUND",
+                             "message": f"Endpoint POST {path} not found"})
+
+    def _openai(self, request: dict):
+        model = request.get("model", "")
+        if self._apply("openai", model) is None:
+            return
+        messages = request.get("messages", [])
+        content = self.llm("fake", model, messages)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        self._send(200, {
+            "id": f"chatcmpl-fake{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "logprobs": None,
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+    def _gotenberg(self):
+        if self._apply("gotenberg") is None:
+            return
+        self._send(200, FAKE_PDF, "application/pdf")
+
+    def _job_fetcher(self, request: dict):
+        decision = self._apply("job_fetcher")
+        if decision is None:
+            return
+        url = request.get("url", "")
+        match = re.search(r"/jobs/view/(?:[^/]*?-)?(\d+)", url) or re.search(r"currentJobId=(\d+)", url)
+        job_id = match.group(1) if match else "0"
+        canonical = f"https://www.linkedin.com/jobs/view/{job_id}/"
+        if decision["outcome"] == "blocked":
+            self._send(200, {
+                "ok": False, "blocked": True, "reason": decision["block_reason"],
+                "jobId": job_id, "canonicalUrl": canonical, "applyUrl": None,
+                "debug": {"finalUrl": "https://www.linkedin.com/authwall", "httpStatus": 200, "tier": "browser"}
+            })
+            return
+        self._send(200, {
+            "ok": True, "blocked": False, "jobId": job_id, "canonicalUrl": canonical,
+            "title": "Senior Software Engineer", "company": "Acme Corp", "location": "Remote",
+            "descriptionText": self.jd_text, "applyUrl": None,
+            "debug": {"finalUrl": canonical, "httpStatus": 200, "tier": "http",
+                      "timingsMs": {"queue": 0, "acquire": 0, "launch": 0,
+                                    "goto": round(decision["delay_s"] * 1000), "extract": 0}}
+        })
+
+    def _jina(self, target: str):
+        if self._apply("jina") is None:
+            return
+        self._send(200, f"Title: Senior Software Engineer\n\nURL Source: {target}\n\n"
+                        f"Markdown Content:\n{self.jd_text}", "text/plain; charset=utf-8")
+
+
+def load_config(path: str | None = None) -> dict:
+    with open(path or DEFAULT_CONFIG, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeServices:
+    """Run the fakes on a background thread: `with FakeServices(config) as fakes: fakes.url`"""
+
+    def __init__(self, config: dict | None = None, host: str = "127.0.0.1", port: int = 0):
+        behaviour = FakeBehaviour(config if config is not None else load_config())
+        jd_text = (TESTS_DIR / "fixtures" / "sample_job_description.txt").read_text(encoding="utf-8")
+        handler = type("BoundFakeHandler", (FakeHandler,), {"behaviour": behaviour, "jd_text": jd_text})
+        self.behaviour = behaviour
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self) -> dict:
+        return self.behaviour.snapshot()
+
+
+# ----------------------------------------------------------------------
+# WorkflowEngine adapters
+# ----------------------------------------------------------------------
+
+def fakes_llm(base_url: str, timeout: float = 300):
+    """LLM callable for WorkflowEngine that calls the fake OpenAI endpoint"""
+    import requests
+    session = requests.Session()
+
+    def llm(node_name, model, messages):
+        response = session.post(f"{base_url}/v1/chat/completions",
+                                json={"model": model, "messages": messages}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+    return llm
+
+
+def fakes_http(base_url: str, timeout: float = 300):
+    """HTTP callable for WorkflowEngine that sends every request to the fakes"""
+    import requests
+    session = requests.Session()
+
+    def http(node_name, request):
+        parts = urlsplit(request["url"])
+        if parts.netloc == "r.jina.ai":
+            url = f"{base_url}{parts.path}"
+        else:
+            url = f"{base_url}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        files = {name: ("index.html", data, "text/html") for name, data in request.get("binary", {}).items()}
+        response = session.request(
+            request["method"], url,
+            json=request["body"] if request["body"] is not None and not files else None,
+            files=files or None,
+            timeout=timeout
+        )
+        response.raise_for_status()
+        if response.headers.get("content-type", "").startswith("application/json"):
+            return response.json()
+        if response.headers.get("content-type", "").startswith("text/"):
+            return response.text
+        return response.content
+    return http
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI, Gotenberg, job-fetcher and Jina Reader")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Behaviour config JSON")
+    parser.add_argument("--time-scale", type=float, default=None, help="Override the config's time_scale")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.time_scale is not None:
+        config["time_scale"] = args.time_scale
+
+    fakes = FakeServices(config, args.host, args.port)
+    print(f"[fakes] Listening on {args.host}:{fakes.server.server_port} (config: {args.config})")
+    try:
+        fakes.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fakes.server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Pooled n8n API Client
+
+Shared HTTP layer for the test and ops scripts (test_runner.py,
+test_mcp_integration.py, execution_profiler.py):
+
+- one requests.Session per client, so calls reuse keep-alive connections
+- cursor pagination over /workflows and /executions (n8n returns at most
+  250 items per page plus a nextCursor)
+- retries with exponential backoff and full jitter on connection errors and
+  429/502/503/504, honouring Retry-After; non-idempotent calls (POST) are
+  only retried when asked to
+- timing hooks called once per logical call with its latency and attempts
+
+Usage:
+    from n8n_client import N8nClient, CallTimings
+
+    timings = CallTimings()
+    with N8nClient("http://localhost:5678", api_key, hooks=[timings]) as client:
+        for wf in client.iter_workflows():
+            print(wf["id"], wf["name"])
+    print(timings.summary())
+"""
+
+import time
+import random
+from functools import lru_cache
+from typing import Callable, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# n8n's public API rejects page sizes above 250
+MAX_PAGE_SIZE = 250
+
+# Responses worth retrying
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Methods that are safe to repeat after a failed attempt
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+# Path segments followed by an id; the id is folded into {id} for timing stats
+ID_COLLECTIONS = {"workflows", "executions", "credentials", "tags", "users", "projects"}
+
+
+def percentile(values: list, pct: float) -> float | None:
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return round(ordered[low] + (ordered[high] - ordered[low]) * (rank - low), 1)
+
+
+def endpoint_template(path: str) -> str:
+    """/api/v1/executions/123 -> /api/v1/executions/{id}"""
+    parts = path.split("?", 1)[0].split("/")
+    for i in range(1, len(parts)):
+        if parts[i - 1] in ID_COLLECTIONS and parts[i]:
+            parts[i] = "{id}"
+    return "/".join(parts)
+
+
+class CallTimings:
+    """Timing hook that keeps every call and summarises them per endpoint"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, record: dict):
+        self.calls.append(record)
+
+    def summary(self) -> dict:
+        by_endpoint = {}
+        for call in self.calls:
+            by_endpoint.setdefault(f"{call['method']} {call['endpoint']}", []).append(call)
+
+        return {
+            endpoint: {
+                "calls": len(calls),
+                "errors": sum(1 for c in calls if c["error"]),
+                "retries": sum(c["attempts"] - 1 for c in calls),
+                "p50_ms": percentile([c["elapsed_ms"] for c in calls], 50),
+                "p95_ms": percentile([c["elapsed_ms"] for c in calls], 95),
+                "max_ms": max(c["elapsed_ms"] for c in calls),
+                "total_ms": round(sum(c["elapsed_ms"] for c in calls), 1)
+            }
+            for endpoint, calls in sorted(by_endpoint.items())
+        }
+
+
+class N8nClient:
+    """n8n REST API and webhook client over one pooled keep-alive session"""
+
+    def __init__(self, base_url: str, api_key: str = "", timeout: float = 30,
+                 retries: int = 3, backoff_s: float = 0.5, backoff_max_s: float = 10,
+                 pool_size: int = 10, hooks: list[Callable[[dict], None]] | None = None):
+        self.base_url = base_url.rstrip("/")
+        self.api_url = f"{self.base_url}/api/v1"
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.hooks = list(hooks or [])
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if api_key:
+            self.session.headers["X-N8N-API-KEY"] = api_key
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def url(self, path: str) -> str:
+        """Absolute URL for a path; API paths are relative to /api/v1"""
+        if path.startswith(("http://", "https://")):
+            return path
+        if path.startswith(("/webhook", "/api/", "/healthz")):
+            return f"{self.base_url}{path}"
+        return f"{self.api_url}/{path.lstrip('/')}"
+
+    def webhook_url(self, webhook_path: str) -> str:
+        return f"{self.base_url}/webhook/{webhook_path.strip('/')}"
+
+    def _retry_delay(self, attempt: int, response: requests.Response | None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After if it sent one"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max_s)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_s * 2 ** attempt))
+
+    def request(self, method: str, path: str, retry: bool | None = None, **kwargs) -> requests.Response:
+        """
+        Send one logical call, retrying transient failures.
+
+        retry defaults to True for idempotent methods. The response is
+        returned whatever its status; connection errors and timeouts are
+        raised once the retries are used up. Hooks see one record per call.
+        """
+        method = method.upper()
+        url = self.url(path)
+        retries = self.retries if (retry if retry is not None else method in IDEMPOTENT_METHODS) else 0
+        kwargs.setdefault("timeout", self.timeout)
+
+        start = time.perf_counter()
+        response = None
+        error = None
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                    error = None
+                    if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                        return response
+                    error = f"http_{response.status_code}"
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    response = None
+                    error = type(e).__name__
+                    if attempt >= retries:
+                        raise
+                time.sleep(self._retry_delay(attempt, response))
+                attempt += 1
+        finally:
+            if response is not None and response.status_code >= 400:
+                error = f"http_{response.status_code}"
+            record = {
+                "method": method,
+                "url": url,
+                "endpoint": endpoint_template(url[len(self.base_url):] if url.startswith(self.base_url) else url),
+                "status": response.status_code if response is not None else 0,
+                "attempts": attempt + 1,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                "error": error
+            }
+            for hook in self.hooks:
+                hook(record)
+
+    def get_json(self, path: str, **kwargs):
+        response = self.request("GET", path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    # ------------------------------------------------------------------
+    # Pagination
+    # ------------------------------------------------------------------
+
+    def paginate(self, path: str, params: dict | None = None, page_size: int = MAX_PAGE_SIZE,
+                 max_items: int | None = None) -> Iterator[dict]:
+        """Yield items from a cursor-paginated list endpoint, fetching pages lazily"""
+        params = dict(params or {})
+        yielded = 0
+        while True:
+            limit = min(page_size, MAX_PAGE_SIZE)
+            if max_items is not None:
+                limit = min(limit, max_items - yielded)
+            page = self.get_json(path, params={**params, "limit": limit})
+            for item in page.get("data", []):
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+            cursor = page.get("nextCursor")
+            if not cursor or not page.get("data"):
+                return
+            params["cursor"] = cursor
+
+    def iter_workflows(self, max_items: int | None = None, **filters) -> Iterator[dict]:
+        """All workflows; filters are passed through (active, tags, name, projectId)"""
+        params = {k: str(v).lower() if isinstance(v, bool) else v for k, v in filters.items()}
+        return self.paginate("workflows", params, max_items=max_items)
+
+    def iter_executions(self, workflow_id: str | None = None, status: str | None = None,
+                        include_data: bool = False, max_items: int | None = None,
+                        page_size: int = MAX_PAGE_SIZE) -> Iterator[dict]:
+        """Executions, newest first"""
+        params = {}
+        if workflow_id:
+            params["workflowId"] = workflow_id
+        if status:
+            params["status"] = status
+        if include_data:
+            params["includeData"] = "true"
+        return self.paginate("executions", params, page_size=page_size, max_items=max_items)
+
+    # ------------------------------------------------------------------
+    # Workflows and executions
+    # ------------------------------------------------------------------
+
+    def health(self) -> bool:
+        """True when the API answers an authenticated request"""
+        return self.request("GET", "workflows", params={"limit": 1}).status_code == 200
+
+    def find_workflow(self, name: str) -> dict | None:
+        """First workflow whose name contains `name`; stops paging at the match"""
+        for wf in self.iter_workflows():
+            if name.lower() in wf.get("name", "").lower():
+                return wf
+        return None
+
+    def get_workflow(self, workflow_id: str) -> dict:
+        return self.get_json(f"workflows/{workflow_id}")
+
+    def create_workflow(self, workflow_data: dict) -> requests.Response:
+        return self.request("POST", "workflows", json=workflow_data)
+
+    def activate_workflow(self, workflow_id: str) -> requests.Response:
+        return self.request("PATCH", f"workflows/{workflow_id}", json={"active": True})
+
+    def get_execution(self, execution_id: str, include_data: bool = False) -> dict:
+        params = {"includeData": "true"} if include_data else None
+        return self.get_json(f"executions/{execution_id}", params=params, timeout=max(self.timeout, 60))
+
+    def latest_execution(self, workflow_id: str, status: str | None = None) -> dict | None:
+        return next(self.iter_executions(workflow_id, status=status, max_items=1), None)
+
+
+@lru_cache(maxsize=None)
+def shared_client(base_url: str, api_key: str = "") -> N8nClient:
+    """One pooled client per n8n instance for function-style callers"""
+    return N8nClient(base_url, api_key)
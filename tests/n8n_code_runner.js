@@ -0,0 +1,209 @@
+#!/usr/bin/env node
+/**
+ * n8n Code Node Runner
+ *
+ * Companion process for workflow_engine.py. Evaluates n8n Code nodes and
+ * `={{ ... }}` expressions outside of n8n so the workflow can be exercised
+ * offline.
+ *
+ * Protocol: one JSON request per line on stdin, one JSON response per line
+ * on stdout.
+ *
+ *   {"id": 1, "op": "code", "code": "...", "ctx": {...}}
+ *   {"id": 2, "op": "expr", "expr": "=...", "ctx": {...}}
+ *
+ * ctx fields:
+ *   input       - items passed to the node: [{json, binary?}]
+ *   nodes       - outputs of already executed nodes: {name: [items]}
+ *   params      - parameters of nodes read via $('Name').params
+ *   execution   - {id, mode}
+ *   staticData  - workflow static data ($getWorkflowStaticData('global'))
+ *   env         - values exposed as $env
+ */
+
+const readline = require('readline');
+
+const AsyncFunction = Object.getPrototypeOf(async function () {}).constructor;
+
+// Mirrors n8n's NODE_FUNCTION_ALLOW_BUILTIN (see docker-compose.yml)
+const ALLOWED_BUILTINS = (process.env.NODE_FUNCTION_ALLOW_BUILTIN || 'crypto').split(',').map(s => s.trim());
+
+function sandboxRequire(name) {
+  if (!ALLOWED_BUILTINS.includes('*') && !ALLOWED_BUILTINS.includes(name)) {
+    throw new Error(`Cannot find module '${name}'`);
+  }
+  return require(name);
+}
+
+// Keep stdout reserved for protocol responses
+console.log = (...args) => process.stderr.write(args.map(String).join(' ') + '\n');
+
+function nodeAccessor(ctx, name) {
+  const items = ctx.nodes[name];
+  const params = (ctx.params || {})[name];
+  if (!items) {
+    // Parameters are readable before a node runs; its data is not
+    const unexecuted = () => {
+      throw new Error(`Node '${name}' hasn't been executed`);
+    };
+    return {
+      get item() {
+        return unexecuted();
+      },
+      first: unexecuted,
+      last: unexecuted,
+      all: unexecuted,
+      params,
+      isExecuted: false
+    };
+  }
+  return {
+    item: items[0],
+    first: () => items[0],
+    last: () => items[items.length - 1],
+    all: () => items,
+    params,
+    isExecuted: true
+  };
+}
+
+function buildGlobals(ctx) {
+  const input = ctx.input || [];
+  const $ = (name) => nodeAccessor(ctx, name);
+  const $input = {
+    item: input[0],
+    first: () => input[0],
+    last: () => input[input.length - 1],
+    all: () => input
+  };
+  return {
+    $,
+    $input,
+    $json: input[0] ? input[0].json : {},
+    $binary: input[0] ? input[0].binary || {} : {},
+    $execution: ctx.execution || { id: 'offline', mode: 'manual' },
+    $env: ctx.env || {},
+    $now: new Date(),
+    $today: new Date(new Date().toDateString()),
+    $getWorkflowStaticData: () => ctx.staticData,
+    require: sandboxRequire
+  };
+}
+
+const helpers = (ctx) => ({
+  getBinaryDataBuffer: async (itemIndex, propertyName) => {
+    const item = (ctx.input || [])[itemIndex];
+    const binary = item && item.binary && item.binary[propertyName];
+    if (!binary) {
+      throw new Error(`No binary data '${propertyName}' on item ${itemIndex}`);
+    }
+    return Buffer.from(binary.data, 'base64');
+  }
+});
+
+async function runCode(code, ctx) {
+  const globals = buildGlobals(ctx);
+  const names = Object.keys(globals);
+  const fn = new AsyncFunction(...names, code);
+  const result = await fn.apply({ helpers: helpers(ctx) }, names.map(n => globals[n]));
+  const items = Array.isArray(result) ? result : [result];
+  return items
+    .filter(item => item !== undefined && item !== null)
+    .map(item => (item.json !== undefined ? item : { json: item }));
+}
+
+/**
+ * Find the closing `}}` of an expression starting at `start`.
+ * Tries each candidate and keeps the first one that compiles, so object
+ * literals inside the expression (`{{ fn({a: {b: 1}}) }}`) are handled.
+ */
+function findExpressionEnd(tpl, start) {
+  let pos = tpl.indexOf('}}', start);
+  while (pos !== -1) {
+    const body = tpl.slice(start, pos);
+    try {
+      new Function(`return (${body});`);
+      return pos;
+    } catch {
+      pos = tpl.indexOf('}}', pos + 1);
+    }
+  }
+  throw new Error(`Unterminated expression at offset ${start}`);
+}
+
+function evaluate(body, globals) {
+  const names = Object.keys(globals);
+  const fn = new Function(...names, `return (${body});`);
+  return fn(...names.map(n => globals[n]));
+}
+
+function stringify(value) {
+  if (value === undefined || value === null) return '';
+  if (typeof value === 'object') return JSON.stringify(value);
+  return String(value);
+}
+
+function renderExpression(expr, ctx) {
+  if (typeof expr !== 'string' || !expr.startsWith('=')) {
+    return expr;
+  }
+  const tpl = expr.slice(1);
+  const globals = buildGlobals(ctx);
+
+  // A lone `{{ ... }}` keeps the value's type, like n8n does
+  const whole = tpl.trim();
+  if (whole.startsWith('{{')) {
+    const end = findExpressionEnd(whole, 2);
+    if (end === whole.length - 2) {
+      return evaluate(whole.slice(2, end), globals);
+    }
+  }
+
+  let out = '';
+  let cursor = 0;
+  while (cursor < tpl.length) {
+    const open = tpl.indexOf('{{', cursor);
+    if (open === -1) {
+      out += tpl.slice(cursor);
+      break;
+    }
+    out += tpl.slice(cursor, open);
+    const end = findExpressionEnd(tpl, open + 2);
+    out += stringify(evaluate(tpl.slice(open + 2, end), globals));
+    cursor = end + 2;
+  }
+  return out;
+}
+
+async function handle(request) {
+  const ctx = request.ctx || {};
+  ctx.nodes = ctx.nodes || {};
+  ctx.staticData = ctx.staticData || {};
+  if (request.op === 'code') {
+    const items = await runCode(request.code, ctx);
+    return { items, staticData: ctx.staticData };
+  }
+  if (request.op === 'expr') {
+    return { value: renderExpression(request.expr, ctx) };
+  }
+  throw new Error(`Unknown op: ${request.op}`);
+}
+
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', async (line) => {
+  if (!line.trim()) return;
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (err) {
+    process.stdout.write(JSON.stringify({ id: null, ok: false, error: 'Invalid JSON request' }) + '\n');
+    return;
+  }
+  try {
+    const result = await handle(request);
+    process.stdout.write(JSON.stringify({ id: request.id, ok: true, result }) + '\n');
+  } catch (err) {
+    const error = err instanceof Error ? err.message : String(err);
+    process.stdout.write(JSON.stringify({ id: request.id, ok: false, error }) + '\n');
+  }
+});
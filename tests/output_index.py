@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Output Index
+
+Indexes the per-run manifests the workflow writes under /data/output so
+tooling can find a run by request_id without walking the output tree.
+
+Every run writes JobApplications/{company}/{role}-{date}/{request_id}/manifest.json
+and appends the same record as one line to manifests.jsonl at the output root.
+The index is a SQLite file next to that log (manifest_index.sqlite); sync()
+reads only the lines appended since the last sync, so its cost does not grow
+with the number of runs kept.
+
+Usage:
+    python output_index.py --output-dir ./output sync
+    python output_index.py --output-dir ./output show req_123
+    python output_index.py --output-dir ./output list --company Acme --limit 20
+    python output_index.py --output-dir ./output prune --keep-days 30 --dry-run
+    python output_index.py --output-dir ./output verify
+    python output_index.py --output-dir ./output rebuild
+"""
+
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+
+MANIFEST_LOG = "manifests.jsonl"
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "manifest_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    request_id TEXT PRIMARY KEY,
+    execution_id TEXT,
+    company TEXT,
+    role TEXT,
+    run_dir TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    total_ms INTEGER,
+    manifest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at);
+CREATE INDEX IF NOT EXISTS runs_company_role ON runs (company, role);
+CREATE TABLE IF NOT EXISTS files (
+    request_id TEXT NOT NULL REFERENCES runs (request_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    bytes INTEGER,
+    sha256 TEXT,
+    PRIMARY KEY (request_id, name)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OutputIndex:
+    """SQLite index of run manifests under one output directory"""
+
+    def __init__(self, output_dir: str, db_path: str = None):
+        self.output_dir = Path(output_dir)
+        self.db_path = Path(db_path) if db_path else self.output_dir / INDEX_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Loading manifests
+    # ------------------------------------------------------------------
+
+    def _meta(self, key: str, default: str = None) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def _set_meta(self, key: str, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _upsert(self, manifest: dict):
+        request_id = manifest["request_id"]
+        self.conn.execute("DELETE FROM runs WHERE request_id = ?", (request_id,))
+        self.conn.execute(
+            "INSERT INTO runs (request_id, execution_id, company, role, run_dir, created_at, total_ms, manifest) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                request_id,
+                None if manifest.get("execution_id") is None else str(manifest["execution_id"]),
+                manifest.get("company"),
+                manifest.get("role"),
+                manifest["run_dir"],
+                manifest["created_at"],
+                (manifest.get("timings") or {}).get("total_ms"),
+                json.dumps(manifest)
+            )
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files (request_id, name, bytes, sha256) VALUES (?, ?, ?, ?)",
+            [(request_id, f["name"], f.get("bytes"), f.get("sha256")) for f in manifest.get("files", [])]
+        )
+
+    def sync(self) -> int:
+        """Index manifest lines appended to manifests.jsonl since the last sync; returns how many"""
+        log_path = self.output_dir / MANIFEST_LOG
+        if not log_path.exists():
+            return 0
+
+        added = 0
+        with open(log_path, "rb") as f:
+            # Stat the open file so a rotation after this point can't mix two logs
+            stat = os.fstat(f.fileno())
+            offset = int(self._meta("log_offset", "0"))
+            if self._meta("log_inode") != str(stat.st_ino) or stat.st_size < offset:
+                # The log was rotated, replaced or truncated: read it again from the start
+                offset = 0
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A run is still appending this line; pick it up next time
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    manifest = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                # Runs pruned before the index saw them stay out
+                if (self.output_dir / manifest["run_dir"]).is_dir():
+                    self._upsert(manifest)
+                    added += 1
+        self._set_meta("log_offset", offset)
+        self._set_meta("log_inode", stat.st_ino)
+        self.conn.commit()
+        return added
+
+    def rebuild(self) -> int:
+        """Re-index from the manifest.json files on disk (one full scan); returns how many"""
+        self.conn.execute("DELETE FROM runs")
+        count = 0
+        for path in self.output_dir.glob(f"JobApplications/*/*/*/{MANIFEST_FILE}"):
+            try:
+                self._upsert(json.loads(path.read_text(encoding="utf-8")))
+                count += 1
+            except (OSError, ValueError, KeyError):
+                continue
+        log_path = self.output_dir / MANIFEST_LOG
+        if log_path.exists():
+            stat = log_path.stat()
+            self._set_meta("log_offset", stat.st_size)
+            self._set_meta("log_inode", stat.st_ino)
+        else:
+            self._set_meta("log_offset", 0)
+        self.conn.commit()
+        return count
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _run(self, row: sqlite3.Row) -> dict:
+        manifest = json.loads(row["manifest"])
+        return {**manifest, "path": str(self.output_dir / row["run_dir"])}
+
+    def get(self, request_id: str) -> dict | None:
+        """Manifest of one run plus its absolute path, or None"""
+        row = self.conn.execute("SELECT * FROM runs WHERE request_id = ?", (request_id,)).fetchone()
+        return self._run(row) if row else None
+
+    def list_runs(self, company: str = None, role: str = None, limit: int = None) -> list:
+        """Runs newest first, optionally filtered by company and role"""
+        query, args = "SELECT * FROM runs WHERE 1 = 1", []
+        if company:
+            query += " AND company = ?"
+            args.append(company)
+        if role:
+            query += " AND role = ?"
+            args.append(role)
+        query += " ORDER BY created_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            args.append(limit)
+        return [self._run(row) for row in self.conn.execute(query, args)]
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def prune(self, keep_days: int = None, keep_last: int = None, dry_run: bool = False) -> list:
+        """
+        Delete runs older than keep_days and beyond the newest keep_last.
+        Returns the request_ids removed (or that would be, with dry_run).
+        """
+        rows = self.conn.execute("SELECT request_id, run_dir, created_at FROM runs ORDER BY created_at DESC").fetchall()
+        cutoff = None
+        if keep_days is not None:
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).isoformat().replace("+00:00", "Z")
+
+        removed = []
+        root = self.output_dir.resolve()
+        for position, row in enumerate(rows):
+            too_old = cutoff is not None and row["created_at"] < cutoff
+            beyond_last = keep_last is not None and position >= keep_last
+            if not (too_old or beyond_last):
+                continue
+            removed.append(row["request_id"])
+            if dry_run:
+                continue
+            run_path = (self.output_dir / row["run_dir"]).resolve()
+            # Never delete anything outside the output directory
+            if run_path != root and root in run_path.parents and run_path.is_dir():
+                shutil.rmtree(run_path)
+            self.conn.execute("DELETE FROM runs WHERE request_id = ?", (row["request_id"],))
+        self.conn.commit()
+        return removed
+
+    def verify(self, request_id: str = None) -> list:
+        """Check indexed files against disk; returns one problem dict per missing or changed file"""
+        query, args = "SELECT r.request_id, r.run_dir, f.name, f.bytes, f.sha256 FROM files f " \
+                      "JOIN runs r ON r.request_id = f.request_id", []
+        if request_id:
+            query += " WHERE r.request_id = ?"
+            args.append(request_id)
+
+        problems = []
+        for row in self.conn.execute(query, args):
+            path = self.output_dir / row["run_dir"] / row["name"]
+            problem = {"request_id": row["request_id"], "file": row["name"]}
+            if not path.is_file():
+                problems.append({**problem, "problem": "missing"})
+            elif row["bytes"] is not None and path.stat().st_size != row["bytes"]:
+                problems.append({**problem, "problem": "size", "expected": row["bytes"], "actual": path.stat().st_size})
+            elif row["sha256"] and sha256_file(path) != row["sha256"]:
+                problems.append({**problem, "problem": "sha256"})
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and query the workflow's per-run output manifests")
+    parser.add_argument("--output-dir", default="/data/output", help="Workflow output root (holds manifests.jsonl)")
+    parser.add_argument("--db", default=None, help=f"Index file (default: <output-dir>/{INDEX_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("sync", help="Index runs appended since the last sync")
+    commands.add_parser("rebuild", help="Re-index every manifest.json on disk")
+    show = commands.add_parser("show", help="Print one run's manifest")
+    show.add_argument("request_id")
+    listing = commands.add_parser("list", help="List runs, newest first")
+    listing.add_argument("--company")
+    listing.add_argument("--role")
+    listing.add_argument("--limit", type=int, default=50)
+    prune = commands.add_parser("prune", help="Delete old runs and their files")
+    prune.add_argument("--keep-days", type=int)
+    prune.add_argument("--keep-last", type=int)
+    prune.add_argument("--dry-run", action="store_true")
+    verify = commands.add_parser("verify", help="Check files against their recorded sizes and hashes")
+    verify.add_argument("request_id", nargs="?")
+    args = parser.parse_args()
+
+    if args.command == "prune" and args.keep_days is None and args.keep_last is None:
+        parser.error("prune needs --keep-days and/or --keep-last")
+
+    with OutputIndex(args.output_dir, args.db) as index:
+        if args.command == "rebuild":
+            result = {"indexed": index.rebuild()}
+        else:
+            result = {"synced": index.sync()}
+        if args.command == "show":
+            run = index.get(args.request_id)
+            if run is None:
+                print(f"Error: no run indexed for {args.request_id}", file=sys.stderr)
+                sys.exit(1)
+            result = run
+        elif args.command == "list":
+            result = index.list_runs(args.company, args.role, args.limit)
+        elif args.command == "prune":
+            result = {"removed": index.prune(args.keep_days, args.keep_last, args.dry_run), "dry_run": args.dry_run}
+        elif args.command == "verify":
+            problems = index.verify(args.request_id)
+            result = {"ok": not problems, "problems": problems}
+
+    print(json.dumps(result, indent=2))
+    if args.command == "verify" and not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
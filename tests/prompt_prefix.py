@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Prompt Prefix Report
+
+Runs a workflow offline (workflow_engine.py), captures the prompt every LLM
+node sends, and reports how long a prefix each one shares with the others.
+Providers cache prompts by exact prefix (OpenAI from 1024 tokens, in
+128-token steps), so generators that open with the same resume + JD block
+only pay full time-to-first-token for that block once per run.
+
+Tokens are estimated at ~4 characters each, as in the workflow's Compact JD
+node.
+
+Usage:
+    python prompt_prefix.py
+    python prompt_prefix.py --workflow ../workflow/workflow_parallel.json --json
+    python prompt_prefix.py --jd jd.txt --group "ATS Analyzer,Generate Cover Letter"
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+from pathlib import Path
+
+from workflow_engine import WorkflowEngine, WorkflowError, TemplateEchoLLM, DEFAULT_WORKFLOW, TESTS_DIR
+
+
+# OpenAI prompt caching: nothing below 1024 tokens, then whole 128-token blocks
+CACHE_MIN_TOKENS = 1024
+CACHE_STEP_TOKENS = 128
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+def cacheable_tokens(tokens: int) -> int:
+    """Tokens of a shared prefix the provider can serve from cache"""
+    if tokens < CACHE_MIN_TOKENS:
+        return 0
+    return CACHE_MIN_TOKENS + (tokens - CACHE_MIN_TOKENS) // CACHE_STEP_TOKENS * CACHE_STEP_TOKENS
+
+
+def render_messages(messages: list) -> str:
+    """The request as the provider sees it for prefix matching: messages in order"""
+    return "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+
+
+def capture_prompts(workflow: str, jd_text: str, resume_text: str) -> dict:
+    """Run the workflow offline and return {node name: rendered prompt}"""
+    prompts = {}
+    echo = TemplateEchoLLM()
+
+    def llm(node_name, model, messages):
+        prompts[node_name] = render_messages(messages)
+        return echo(node_name, model, messages)
+
+    with WorkflowEngine.from_file(
+        workflow,
+        llm=llm,
+        read_file=lambda path: resume_text.encode("utf-8"),
+        extract_pdf=lambda data: data.decode("utf-8")
+    ) as engine:
+        engine.run({"jd_text": jd_text})
+    return prompts
+
+
+def prefix_report(prompts: dict, group: list = None, min_shared_tokens: int = 256) -> dict:
+    """
+    Per node: prompt size and the longest prefix it shares with another node.
+    Group: the prefix common to every node in `group`; by default the nodes
+    that share at least `min_shared_tokens` with some other node.
+    """
+    nodes = []
+    for name, prompt in prompts.items():
+        best_partner, best = None, 0
+        for other, other_prompt in prompts.items():
+            if other == name:
+                continue
+            shared = len(os.path.commonprefix([prompt, other_prompt]))
+            if shared > best:
+                best_partner, best = other, shared
+        shared_tokens = estimate_tokens(prompt[:best])
+        nodes.append({
+            "node": name,
+            "prompt_tokens": estimate_tokens(prompt),
+            "shared_with": best_partner,
+            "shared_chars": best,
+            "shared_tokens": shared_tokens,
+            "cacheable_tokens": cacheable_tokens(shared_tokens)
+        })
+
+    if group is None:
+        group = [n["node"] for n in nodes if n["shared_tokens"] >= min_shared_tokens]
+    missing = [name for name in group if name not in prompts]
+    if missing:
+        raise ValueError(f"No prompt captured for: {', '.join(missing)}")
+
+    common = os.path.commonprefix([prompts[name] for name in group]) if len(group) > 1 else ""
+    common_tokens = estimate_tokens(common)
+    return {
+        "nodes": nodes,
+        "group": {
+            "nodes": group,
+            "shared_chars": len(common),
+            "shared_tokens": common_tokens,
+            "cacheable_tokens": cacheable_tokens(common_tokens),
+            # Every call after the first can reuse the cached prefix
+            "cached_tokens_per_run": cacheable_tokens(common_tokens) * max(len(group) - 1, 0)
+        }
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{'Node':<30} {'Prompt':>8} {'Shared':>8} {'Cacheable':>10}  Shared with",
+        "-" * 84
+    ]
+    for n in report["nodes"]:
+        lines.append(
+            f"{n['node']:<30} {n['prompt_tokens']:>8} {n['shared_tokens']:>8} {n['cacheable_tokens']:>10}  "
+            f"{n['shared_with'] or '-'}"
+        )
+    group = report["group"]
+    lines.append("-" * 84)
+    lines.append(f"Group ({len(group['nodes'])} nodes): common prefix {group['shared_tokens']} tokens, "
+                 f"{group['cacheable_tokens']} cacheable, ~{group['cached_tokens_per_run']} cached tokens per run")
+    if group["shared_tokens"] and not group["cacheable_tokens"]:
+        lines.append(f"Common prefix is below the provider's {CACHE_MIN_TOKENS}-token caching minimum for this input")
+    lines.append("(token counts are estimates: ~4 characters per token)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared prompt prefix across the workflow's LLM nodes")
+    parser.add_argument("--workflow", default=str(DEFAULT_WORKFLOW), help="Workflow JSON export")
+    parser.add_argument("--jd", default=str(TESTS_DIR / "fixtures" / "sample_job_description.txt"),
+                        help="Job description text file")
+    parser.add_argument("--resume-text", default=str(TESTS_DIR / "fixtures" / "sample_resume.txt"),
+                        help="Resume text returned by the PDF extraction stub")
+    parser.add_argument("--group", default="",
+                        help="Comma-separated nodes whose common prefix to report "
+                             "(default: nodes sharing at least --min-shared-tokens with another node)")
+    parser.add_argument("--min-shared-tokens", type=int, default=256)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        prompts = capture_prompts(
+            args.workflow,
+            Path(args.jd).read_text(encoding="utf-8"),
+            Path(args.resume_text).read_text(encoding="utf-8")
+        )
+        group = [name.strip() for name in args.group.split(",") if name.strip()] or None
+        report = prefix_report(prompts, group, args.min_shared_tokens)
+    except (WorkflowError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Async Client Tests
+
+Runs async_client.py against a fake n8n (aiohttp web app) that accepts runs
+on the async webhook and finishes them after a delay. Also checks that the
+workflow's async webhook answers with the execution id before the run ends.
+
+Usage:
+    python test_async_client.py
+    python -m pytest test_async_client.py
+"""
+
+import sys
+import time
+import asyncio
+import itertools
+
+from aiohttp import web
+
+from async_client import AsyncWorkflowClient, run_async_load
+from test_runner import load_corpus, load_fixtures
+from test_offline_workflow import make_engine, manual_jd_payload
+
+
+class FakeN8n:
+    """Async webhook + executions API; a run's outcome is set by its jd_text"""
+
+    def __init__(self, run_seconds: float = 0.3):
+        self.run_seconds = run_seconds
+        self.executions = {}
+        self.ids = itertools.count(1000)
+        self.polls = 0
+        self.app = web.Application()
+        self.app.router.add_post("/webhook/resume-enhance-v3-async", self.submit)
+        self.app.router.add_get("/api/v1/executions/{id}", self.get_execution)
+
+    async def submit(self, request):
+        payload = await request.json()
+        execution_id = str(next(self.ids))
+        self.executions[execution_id] = (time.monotonic(), payload)
+        return web.json_response({"accepted": True, "execution_id": execution_id}, status=202)
+
+    async def get_execution(self, request):
+        self.polls += 1
+        execution_id = request.match_info["id"]
+        if execution_id not in self.executions:
+            return web.json_response({"message": "Not Found"}, status=404)
+        started, payload = self.executions[execution_id]
+        behaviour = payload.get("jd_text")
+        if behaviour == "hang" or time.monotonic() - started < self.run_seconds:
+            return web.json_response({"id": execution_id, "finished": False, "status": "running"})
+
+        status = "error" if behaviour == "crash" else "success"
+        body = {"id": execution_id, "finished": status == "success", "status": status}
+        if request.query.get("includeData") == "true":
+            summary = {"success": True, "request_id": payload["request_id"]}
+            body["data"] = {"resultData": {
+                "lastNodeExecuted": "Summary",
+                "runData": {"Summary": [{"data": {"main": [[{"json": summary}]]}}]},
+                **({"error": {"message": "Gotenberg unreachable"}} if status == "error" else {})
+            }}
+        return web.json_response(body)
+
+
+async def with_fake_n8n(fake, fn):
+    runner = web.AppRunner(fake.app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await fn(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+def test_hundreds_of_runs_share_one_loop():
+    """300 runs finish in about one run's duration, not 300"""
+    fake = FakeN8n(run_seconds=0.5)
+
+    async def scenario(base_url):
+        return await run_async_load(
+            base_url, "key", load_corpus(), load_fixtures(), jobs=300, max_in_flight=300,
+            poll_initial_s=0.1, poll_max_s=0.4
+        )
+
+    report = asyncio.run(with_fake_n8n(fake, scenario))
+
+    assert report["succeeded"] == 300
+    assert report["duration_s"] < 5
+    assert all(s["result"]["request_id"] == s["request_id"] for s in report["samples"])
+    # Backoff keeps polling well below one request per 100 ms per run
+    assert fake.polls < 300 * 12
+
+
+def test_failed_and_stuck_runs_are_classified():
+    """Errored executions and deadline overruns are reported, not raised"""
+    fake = FakeN8n(run_seconds=0.1)
+    corpus = [{"job_description": jd} for jd in ("ok", "crash", "hang")]
+
+    async def scenario(base_url):
+        return await run_async_load(
+            base_url, "key", corpus, load_fixtures(), jobs=3, max_in_flight=3,
+            poll_initial_s=0.05, poll_max_s=0.1, timeout_s=0.6
+        )
+
+    report = asyncio.run(with_fake_n8n(fake, scenario))
+    by_jd = {s["request_id"][-4:]: s for s in report["samples"]}
+
+    assert by_jd["0000"]["error"] is None
+    assert by_jd["0001"]["error"] == "execution_error"
+    assert by_jd["0001"]["status"] == "error"
+    assert by_jd["0002"]["error"] == "timeout"
+
+
+def test_unknown_execution_is_retried():
+    """A 404 right after submit is treated as not yet stored"""
+    fake = FakeN8n(run_seconds=0)
+
+    async def scenario(base_url):
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.2, fake.executions.__setitem__, "late", (time.monotonic(), {"request_id": "late"}))
+        async with AsyncWorkflowClient(base_url, "key", poll_initial_s=0.05) as client:
+            return await client.wait("late")
+
+    outcome = asyncio.run(with_fake_n8n(fake, scenario))
+    assert outcome["status"] == "success"
+    assert outcome["polls"] > 1
+
+
+def test_workflow_async_webhook_returns_execution_id():
+    """The async webhook answers 202 with the run's execution id"""
+    with make_engine() as engine:
+        run = engine.run(manual_jd_payload(), start_node="Webhook (Async)")
+
+    assert run["response"]["status"] == 202
+    assert run["response"]["body"]["execution_id"] == run["execution_id"]
+    assert run["result"]["success"] is True
+
+
+TESTS = [
+    test_hundreds_of_runs_share_one_loop,
+    test_failed_and_stuck_runs_are_classified,
+    test_unknown_execution_is_retried,
+    test_workflow_async_webhook_returns_execution_id,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+ATS Scorer Tests
+
+Checks the workflow's local ATS keyword scorer (Score ATS Keywords, run via
+ats_score.py), and that the workflow only calls the ATS Analyzer LLM when the
+request sets ats_refine. Node.js must be on PATH.
+
+Usage:
+    python test_ats_score.py
+    python -m pytest test_ats_score.py
+"""
+
+import sys
+from pathlib import Path
+
+from ats_score import score_batch
+from workflow_engine import WorkflowEngine, TemplateEchoLLM, DEFAULT_WORKFLOW
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PARALLEL_WORKFLOW = DEFAULT_WORKFLOW.parent / "workflow_parallel.json"
+
+
+def score(resume, jd: str) -> dict:
+    return score_batch(resume, {"jd": jd})[0]
+
+
+def run_workflow(workflow: Path, payload: dict) -> tuple:
+    """Run a variant on the sample fixtures; returns (run, {node: prompt})"""
+    prompts = {}
+
+    def llm(node_name, model, messages):
+        prompts[node_name] = messages[0]["content"]
+        return TemplateEchoLLM()(node_name, model, messages)
+
+    resume_text = (FIXTURES_DIR / "sample_resume.txt").read_text(encoding="utf-8")
+    jd_text = (FIXTURES_DIR / "sample_job_description.txt").read_text(encoding="utf-8")
+    with WorkflowEngine.from_file(
+        str(workflow),
+        llm=llm,
+        read_file=lambda path: resume_text.encode("utf-8"),
+        extract_pdf=lambda data: data.decode("utf-8")
+    ) as engine:
+        run = engine.run({"jd_text": jd_text, **payload})
+    return run, prompts
+
+
+def test_aliases_match_synonyms():
+    """Skill aliases match (k8s, Golang, Postgres); plain-English 'go' is not a skill"""
+    jd = "Requirements:\n- Kubernetes\n- Go\n- PostgreSQL\n- Ready to go"
+    result = score("Deployed services on k8s, written in Golang, backed by Postgres.", jd)
+
+    assert sorted(result["keywords"]) == ["go", "kubernetes", "postgresql"]
+    assert result["missing_keywords"] == []
+    assert result["ats_score"] == 100
+    assert result["scorer"] == "local"
+
+
+def test_section_weighting():
+    """Requirements outweigh nice-to-haves; skills outweigh an education mention"""
+    jd = "Requirements:\n- Python\n\nNice to have:\n- Rust"
+    assert score("Python", jd)["ats_score"] > score("Rust", jd)["ats_score"]
+
+    in_skills = {"skills": {"languages": ["Python"]}}
+    in_education = {"education": [{"degree": "BSc, thesis in Python"}]}
+    assert score(in_skills, "Requirements:\n- Python")["ats_score"] == 100
+    assert score(in_education, "Requirements:\n- Python")["ats_score"] == 75
+
+
+def test_batch_scores_one_resume_against_many_jds():
+    """One call scores every JD, best match first"""
+    jds = {
+        "backend": (FIXTURES_DIR / "sample_job_description.txt").read_text(encoding="utf-8"),
+        "data": "Requirements:\n- Excel and Tableau\n- Power BI dashboards",
+        "empty": "",
+    }
+    results = score_batch((FIXTURES_DIR / "sample_resume.txt").read_text(encoding="utf-8"), jds)
+
+    assert [r["jd"] for r in results] == ["backend", "data", "empty"]
+    assert results[0]["ats_score"] > 50
+    assert results[1]["missing_keywords"] == ["power bi", "excel", "tableau"]
+    assert results[2]["ats_score"] is None
+
+
+def test_workflow_scores_locally_by_default():
+    """No ATS Analyzer call unless asked; the result comes from the local scorer"""
+    for workflow in (DEFAULT_WORKFLOW, PARALLEL_WORKFLOW):
+        run, prompts = run_workflow(workflow, {})
+
+        assert "ATS Analyzer" not in prompts
+        ats = run["result"]["ats"]
+        assert ats["scorer"] == "local"
+        # The echo stub's corrected resume is an empty skeleton
+        assert "python" in ats["missing_keywords"]
+        assert ats["ats_score"] == 0
+
+
+def test_ats_refine_calls_llm_with_local_keywords():
+    """ats_refine sends the local keywords to the ATS Analyzer and uses its answer"""
+    serial, serial_prompts = run_workflow(DEFAULT_WORKFLOW, {"ats_refine": True})
+    parallel, parallel_prompts = run_workflow(PARALLEL_WORKFLOW, {"ats_refine": True})
+
+    assert serial_prompts["ATS Analyzer"] == parallel_prompts["ATS Analyzer"]
+    assert '"kubernetes"' in serial_prompts["ATS Analyzer"]
+    assert serial["result"]["ats"]["scorer"] == "llm"
+    assert parallel["result"]["ats"]["scorer"] == "llm"
+
+
+TESTS = [
+    test_aliases_match_synonyms,
+    test_section_weighting,
+    test_batch_scores_one_resume_against_many_jds,
+    test_workflow_scores_locally_by_default,
+    test_ats_refine_calls_llm_with_local_keywords,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Execution Profiler Tests
+
+Checks execution_profiler.py against a hand-written execution in the shape
+returned by GET /api/v1/executions/{id}?includeData=true, and against an
+offline run of the workflow.
+
+Usage:
+    python test_execution_profiler.py
+    python -m pytest test_execution_profiler.py
+"""
+
+import sys
+
+from execution_profiler import (
+    profile_execution, execution_from_offline_run, format_flame, to_csv, to_folded, binary_size
+)
+from test_offline_workflow import make_engine, manual_jd_payload
+
+
+T0 = 1_700_000_000_000
+
+
+def sample_execution() -> dict:
+    """Webhook -> Enhance Resume -> Convert to PDF, as n8n stores it"""
+    def run(start, duration, source, items):
+        return {
+            "startTime": T0 + start,
+            "executionTime": duration,
+            "executionStatus": "success",
+            "source": [{"previousNode": source}] if source else [],
+            "data": {"main": [items]}
+        }
+
+    return {
+        "id": "42",
+        "status": "success",
+        "createdAt": "2023-11-14T22:13:19.500Z",
+        "startedAt": "2023-11-14T22:13:20.000Z",
+        "stoppedAt": "2023-11-14T22:13:41.000Z",
+        "workflowData": {"nodes": [
+            {"name": "Webhook", "type": "n8n-nodes-base.webhook"},
+            {"name": "Enhance Resume", "type": "@n8n/n8n-nodes-langchain.openAi"},
+            {"name": "Call Generators", "type": "n8n-nodes-base.httpRequest"},
+            {"name": "Convert to PDF", "type": "n8n-nodes-base.httpRequest"},
+        ]},
+        "data": {"resultData": {
+            "lastNodeExecuted": "Convert to PDF",
+            "runData": {
+                "Webhook": [run(0, 2, None, [{"json": {"body": {"jd_text": "x" * 98}}}])],
+                "Enhance Resume": [run(10, 15000, "Webhook", [
+                    {"json": {"message": {"role": "assistant", "content": "y" * 400}}}
+                ])],
+                "Call Generators": [run(15010, 3000, "Enhance Resume", [
+                    {"json": {"choices": [], "usage": {"prompt_tokens": 900, "completion_tokens": 100}}},
+                    {"json": {"choices": [], "usage": {"prompt_tokens": 800, "completion_tokens": 200}}}
+                ])],
+                "Convert to PDF": [run(18510, 2400, "Call Generators", [
+                    {"json": {}, "binary": {"data": {"mimeType": "application/pdf", "fileSize": "45.2 kB"}}}
+                ])]
+            }
+        }}
+    }
+
+
+def test_profile_measures_each_node():
+    """Durations, queue wait, items and bytes come from runData"""
+    profile = profile_execution(sample_execution())
+    nodes = {n["node"]: n for n in profile["nodes"]}
+
+    assert [n["node"] for n in profile["nodes"]] == ["Webhook", "Enhance Resume", "Call Generators", "Convert to PDF"]
+    assert profile["bottleneck"] == "Enhance Resume"
+    assert profile["wall_ms"] == 21000
+    assert profile["execution_queue_wait_ms"] == 500
+    assert nodes["Enhance Resume"]["queue_wait_ms"] == 8
+    assert nodes["Convert to PDF"]["queue_wait_ms"] == 500
+    assert nodes["Convert to PDF"]["start_ms"] == 18510
+    assert nodes["Call Generators"]["items_out"] == 2
+    assert nodes["Convert to PDF"]["items_in"] == 2
+    assert nodes["Convert to PDF"]["bytes_out"] == 2 + 45200
+    assert nodes["Enhance Resume"]["bytes_in"] == nodes["Webhook"]["bytes_out"]
+
+
+def test_profile_records_tokens():
+    """Reported usage is summed; message-only OpenAI output is estimated"""
+    profile = profile_execution(sample_execution())
+    nodes = {n["node"]: n for n in profile["nodes"]}
+
+    assert nodes["Call Generators"]["prompt_tokens"] == 1700
+    assert nodes["Call Generators"]["completion_tokens"] == 300
+    assert nodes["Call Generators"]["token_source"] == "usage"
+    assert nodes["Enhance Resume"]["completion_tokens"] == 100
+    assert nodes["Enhance Resume"]["token_source"] == "estimated"
+    assert nodes["Webhook"]["token_source"] is None
+    assert profile["tokens"]["estimated_nodes"] == ["Enhance Resume"]
+
+
+def test_binary_sizes():
+    """Binary sizes parse from base64, byte counts and n8n's pretty sizes"""
+    assert binary_size({"data": "AAAA"}) == 3
+    assert binary_size({"fileSize": 1234}) == 1234
+    assert binary_size({"fileSize": "1.5 MB"}) == 1_500_000
+    assert binary_size({"fileSize": "512 B"}) == 512
+    assert binary_size({}) == 0
+
+
+def test_outputs_cover_every_node():
+    """Offline runs profile every node in all output formats"""
+    with make_engine() as engine:
+        run = engine.run(manual_jd_payload())
+        profile = profile_execution(execution_from_offline_run(run, engine.workflow))
+
+    assert {n["node"] for n in profile["nodes"]} == set(run["outputs"])
+    assert len(to_csv(profile).strip().splitlines()) == len(profile["nodes"]) + 1
+    assert len(to_folded(profile).strip().splitlines()) == len(profile["nodes"])
+    assert profile["bottleneck"] in format_flame(profile)
+    assert all(n["queue_wait_ms"] >= 0 for n in profile["nodes"])
+
+
+TESTS = [
+    test_profile_measures_each_node,
+    test_profile_records_tokens,
+    test_binary_sizes,
+    test_outputs_cover_every_node,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Fake Redis Tests
+
+Checks the RESP stand-in in fake_redis.py and its Python port of
+job-fetcher's token-bucket script (job-fetcher/src/rateLimit.ts), including
+batches larger than the bucket. The port is pinned to the Lua source, and when
+redis-server is on PATH the shipped Lua itself is run against it and compared
+with the port; otherwise that test is skipped.
+
+Usage:
+    python test_fake_redis.py
+    python -m pytest test_fake_redis.py
+"""
+
+import re
+import sys
+import time
+import shutil
+import socket
+import subprocess
+from pathlib import Path
+from unittest import SkipTest
+
+from fake_redis import FakeRedis
+
+
+RATE_LIMIT_TS = Path(__file__).parent.parent / "job-fetcher" / "src" / "rateLimit.ts"
+
+
+class FakeClock:
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Resp:
+    """Bare RESP client: enough to send commands and read replies"""
+
+    def __init__(self, url: str):
+        host, port = url.removeprefix("redis://").split(":")
+        self.sock = socket.create_connection((host, int(port)))
+        self.file = self.sock.makefile("rb")
+
+    @staticmethod
+    def encode(*args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    def read(self):
+        line = self.file.readline()[:-2]
+        kind, rest = line[:1], line[1:].decode()
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            return RuntimeError(rest)
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            return None if rest == "-1" else self.file.read(int(rest) + 2)[:-2].decode()
+        return [self.read() for _ in range(int(rest))]
+
+    def __call__(self, *args):
+        self.sock.sendall(self.encode(*args))
+        return self.read()
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def token_bucket_script() -> str:
+    """The Lua source as shipped in rateLimit.ts"""
+    source = RATE_LIMIT_TS.read_text(encoding="utf-8")
+    return re.search(r"TOKEN_BUCKET_SCRIPT = `(.*?)`;", source, re.S).group(1)
+
+
+def test_protocol_basics():
+    """Strings, hashes, expiry, pipelining and errors behave like Redis"""
+    clock = FakeClock()
+    with FakeRedis(clock=clock) as redis:
+        r = Resp(redis.url)
+        assert r("PING") == "PONG"
+        assert r("SET", "a", "1", "PX", 1000) == "OK"
+        assert r("GET", "a") == "1"
+        assert r("HSET", "h", "x", "1", "y", "2") == 2
+        assert r("HMGET", "h", "y", "z") == ["2", None]
+        assert isinstance(r("GET", "h"), RuntimeError)
+        assert isinstance(r("NOPE"), RuntimeError)
+
+        clock.now += 1.5
+        assert r("GET", "a") is None
+        assert r("PTTL", "h") == -1
+
+        # Pipelined: three commands in one write, three replies in order
+        r.sock.sendall(r.encode("SET", "b", "2") + r.encode("GET", "b") + r.encode("DEL", "b", "h"))
+        assert [r.read(), r.read(), r.read()] == ["OK", "2", 2]
+        assert r("KEYS", "*") == []
+        r.close()
+
+
+def test_token_bucket_script():
+    """fake_redis's port of the rate limiter's script spends, refuses and refills"""
+    clock = FakeClock()
+    script = token_bucket_script()
+    # 30 tokens per 600s window, as RATE_LIMIT_MAX / RATE_LIMIT_WINDOW_MS defaults
+    args = (1, "rl:1.2.3.4", 30, 30 / 600000, 1, 600000)
+    with FakeRedis(clock=clock) as redis:
+        r = Resp(redis.url)
+        # Any edit to the Lua is refused until the Python port is updated to match
+        edited = script.replace("tokens >= cost", "tokens > cost")
+        assert "port" in str(r("EVAL", edited, *args))
+
+        sha = r("SCRIPT", "LOAD", script)
+        r("SCRIPT", "FLUSH")
+        assert str(r("EVALSHA", sha, *args)).startswith("NOSCRIPT")
+
+        results = [r("EVAL", script, *args)]
+        results += [r("EVALSHA", sha, *args) for _ in range(30)]
+        assert [res[0] for res in results] == [1] * 30 + [0]
+        assert float(results[29][1]) == 0
+
+        # One token back every 20s
+        clock.now += 20
+        allowed, tokens = r("EVALSHA", sha, *args)
+        assert allowed == 1 and float(tokens) < 1e-9
+
+        # Cost above what is left is refused without spending
+        clock.now += 100
+        allowed, tokens = r("EVALSHA", sha, 1, "rl:1.2.3.4", 30, 30 / 600000, 10, 600000)
+        assert allowed == 0 and abs(float(tokens) - 5) < 1e-9
+
+        assert r("PTTL", "rl:1.2.3.4") == 600000
+        clock.now += 601
+        assert r("EXISTS", "rl:1.2.3.4") == 0
+        assert isinstance(r("EVAL", "return 1", 0), RuntimeError)
+        r.close()
+
+
+def test_replicas_share_buckets():
+    """Two connections (two job-fetcher replicas) draw from one bucket"""
+    script = token_bucket_script()
+    args = (1, "rl:shared", 4, 4 / 600000, 1, 600000)
+    with FakeRedis() as redis:
+        a, b = Resp(redis.url), Resp(redis.url)
+        allowed = [conn("EVAL", script, *args)[0] for conn in (a, b, a, b, a, b)]
+        assert allowed == [1, 1, 1, 1, 0, 0]
+        a.close()
+        b.close()
+
+
+def test_batch_above_capacity_is_rejected():
+    """A batch costing more than the bucket holds is refused even by a full bucket"""
+    clock = FakeClock()
+    script = token_bucket_script()
+    with FakeRedis(clock=clock) as redis:
+        r = Resp(redis.url)
+        # 31 unique postings against a full 30-token bucket, before and after a full refill
+        for _ in range(2):
+            allowed, tokens = r("EVAL", script, 1, "rl:batch", 30, 30 / 600000, 31, 600000)
+            assert allowed == 0 and float(tokens) == 30
+            clock.now += 600
+        r.close()
+
+
+def test_port_matches_redis():
+    """The shipped Lua run by redis-server gives the same replies as the port"""
+    if not shutil.which("redis-server"):
+        raise SkipTest("redis-server not on PATH")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen(
+        ["redis-server", "--port", str(port), "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(50):
+            try:
+                real = Resp(f"redis://127.0.0.1:{port}")
+                break
+            except ConnectionError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("redis-server did not start")
+
+        script = token_bucket_script()
+        # Spend the bucket, then ask for more than is left and more than it holds
+        costs = [1] * 31 + [10, 31]
+        with FakeRedis() as redis:
+            fake = Resp(redis.url)
+            for cost in costs:
+                args = (1, "rl:compare", 30, 30 / 600000, cost, 600000)
+                real_allowed, real_tokens = real("EVAL", script, *args)
+                fake_allowed, fake_tokens = fake("EVAL", script, *args)
+                assert real_allowed == fake_allowed
+                # Both refill a few milliseconds' worth between calls
+                assert abs(float(real_tokens) - float(fake_tokens)) < 0.01
+            assert abs(real("PTTL", "rl:compare") - fake("PTTL", "rl:compare")) < 1000
+            fake.close()
+        real.close()
+    finally:
+        server.terminate()
+        server.wait(timeout=5)
+
+
+TESTS = [
+    test_protocol_basics,
+    test_token_bucket_script,
+    test_port_matches_redis,
+    test_replicas_share_buckets,
+    test_batch_above_capacity_is_rejected,
+]
+
+
+def main():
+    failed = skipped = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except SkipTest as e:
+            skipped += 1
+            print(f"[SKIP] {test.__doc__}: {e}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed - skipped}")
+    print(f"Skipped: {skipped}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Fake Services Tests
+
+Checks the latency/failure injection of fake_services.py and runs the
+workflow offline against it on both the job-fetcher and Jina Reader paths.
+
+Usage:
+    python test_fake_services.py
+    python -m pytest test_fake_services.py
+"""
+
+import sys
+import random
+
+import requests
+
+from fake_services import FakeServices, sample_latency_ms, load_config, fakes_llm, fakes_http
+from test_offline_workflow import make_engine
+
+
+def fast_config(**services) -> dict:
+    """Default config with delays scaled down 1000x and service overrides"""
+    config = load_config()
+    config["time_scale"] = 0.001
+    for name, spec in services.items():
+        config["services"][name] = spec
+    return config
+
+
+def test_latency_distributions():
+    """Each distribution lands where its parameters put it"""
+    rng = random.Random(1)
+    fixed = [sample_latency_ms({"dist": "fixed", "ms": 250}, rng) for _ in range(10)]
+    uniform = [sample_latency_ms({"dist": "uniform", "min_ms": 100, "max_ms": 200}, rng) for _ in range(500)]
+    lognormal = sorted(sample_latency_ms({"dist": "lognormal", "median_ms": 1000, "sigma": 0.5}, rng)
+                       for _ in range(2001))
+    capped = [sample_latency_ms({"dist": "normal", "mean_ms": 500, "stddev_ms": 400, "max_ms": 600}, rng)
+              for _ in range(500)]
+
+    assert fixed == [250] * 10
+    assert all(100 <= v <= 200 for v in uniform)
+    assert 850 < lognormal[1000] < 1150
+    assert all(0 <= v <= 600 for v in capped)
+
+
+def test_failure_rates_are_injected():
+    """Failure and block rates match the config; a seed makes them repeatable"""
+    config = fast_config(
+        gotenberg={"latency": {"dist": "fixed", "ms": 0}, "failure_rate": 0.3, "failure_status": 503},
+        job_fetcher={"latency": {"dist": "fixed", "ms": 0}, "blocked_rate": 0.5, "block_reason": "CAPTCHA"}
+    )
+
+    def run_once():
+        with FakeServices(config) as fakes:
+            statuses = [
+                requests.post(f"{fakes.url}/forms/chromium/convert/html",
+                              files={"files": ("index.html", b"<p>hi</p>")}).status_code
+                for _ in range(200)
+            ]
+            fetches = [
+                requests.post(f"{fakes.url}/fetch", json={"url": "https://www.linkedin.com/jobs/view/42/"}).json()
+                for _ in range(200)
+            ]
+            return statuses, fetches, fakes.stats()
+
+    statuses, fetches, stats = run_once()
+    assert set(statuses) == {200, 503}
+    assert 40 <= statuses.count(503) <= 80
+    assert stats["gotenberg"]["failures"] == statuses.count(503)
+    blocked = [f for f in fetches if f.get("blocked")]
+    assert 70 <= len(blocked) <= 130
+    assert {f["reason"] for f in blocked} == {"CAPTCHA"}
+    assert all(f["jobId"] == "42" for f in fetches)
+
+    assert run_once()[0] == statuses
+
+
+def test_model_overrides_and_runtime_config():
+    """Per-model latency overrides apply and PUT /__fakes/config swaps behaviour"""
+    config = fast_config(openai={
+        "latency": {"dist": "fixed", "ms": 5000},
+        "models": {"gpt-4o-mini": {"latency": {"dist": "fixed", "ms": 1000}}}
+    })
+    body = {"messages": [{"role": "user", "content": "Return ONLY this JSON:\n{\"ok\": true}"}]}
+
+    with FakeServices(config) as fakes:
+        for model in ("gpt-4o", "gpt-4o-mini"):
+            response = requests.post(f"{fakes.url}/v1/chat/completions", json={**body, "model": model})
+            assert response.json()["choices"][0]["message"]["content"] == '{"ok": true}'
+        assert fakes.stats()["openai"]["latency_ms"] == {"p50": 5000, "p95": 5000, "max": 5000}
+
+        config["services"]["openai"] = {"failure_rate": 1.0, "failure_status": 429}
+        requests.put(f"{fakes.url}/__fakes/config", json=config)
+        response = requests.post(f"{fakes.url}/v1/chat/completions", json={**body, "model": "gpt-4o"})
+        assert response.status_code == 429
+        assert fakes.stats()["openai"]["requests"] == 1
+
+
+def test_workflow_runs_against_fakes():
+    """The workflow completes through the fakes on both JD fetch paths"""
+    config = fast_config(
+        openai={"latency": {"dist": "fixed", "ms": 0}},
+        job_fetcher={"latency": {"dist": "fixed", "ms": 0}},
+        jina={"latency": {"dist": "fixed", "ms": 0}}
+    )
+    with FakeServices(config) as fakes:
+        with make_engine(llm=fakes_llm(fakes.url), http=fakes_http(fakes.url)) as engine:
+            linkedin = engine.run({"job_url": "https://www.linkedin.com/jobs/view/123/"})
+            jina = engine.run({"job_url": "https://careers.example.com/jobs/123"})
+        stats = fakes.stats()
+
+    assert linkedin["result"]["success"] is True
+    assert linkedin["result"]["jd_source"] == "job-fetcher"
+    assert jina["result"]["jd_source"] == "jina"
+    assert stats["job_fetcher"]["requests"] == 1
+    assert stats["jina"]["requests"] == 1
+    assert stats["gotenberg"]["requests"] == 2
+    assert stats["openai"]["requests"] >= 18
+
+
+TESTS = [
+    test_latency_distributions,
+    test_failure_rates_are_injected,
+    test_model_overrides_and_runtime_config,
+    test_workflow_runs_against_fakes,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Load Mode Tests
+
+Exercises the load mode of test_runner.py against a local stub webhook
+(no n8n needed): concurrency, percentile maths and error classification.
+
+Usage:
+    python test_load_mode.py
+    python -m pytest test_load_mode.py
+"""
+
+import sys
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from test_runner import load_corpus, load_fixtures, percentile, run_load_test
+
+
+class StubWebhook(BaseHTTPRequestHandler):
+    """Answers like the workflow's last node; behaviour is set by jd_text"""
+
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with StubWebhook.lock:
+            StubWebhook.in_flight += 1
+            StubWebhook.peak = max(StubWebhook.peak, StubWebhook.in_flight)
+        try:
+            behaviour = payload.get("jd_text", "")
+            time.sleep(0.5 if behaviour == "slow" else 0.05)
+            if behaviour == "crash":
+                status, body = 500, {"message": "Workflow could not be started"}
+            elif behaviour == "reject":
+                status, body = 200, {"success": False, "error": "Resume text too short"}
+            else:
+                status, body = 200, {"success": True, "request_id": payload["request_id"]}
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with StubWebhook.lock:
+                StubWebhook.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def run_against_stub(corpus, submissions, concurrency, timeout=5):
+    StubWebhook.peak = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWebhook)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/webhook/resume-enhancer/retry"
+        return run_load_test(url, corpus, load_fixtures(), submissions, concurrency, timeout)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_percentile_interpolates():
+    """Percentiles interpolate between samples"""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50.5
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_load_respects_concurrency():
+    """All submissions complete with at most --concurrency in flight"""
+    report = run_against_stub(load_corpus(), submissions=12, concurrency=3)
+
+    assert report["submissions"] == 12
+    assert report["succeeded"] == 12
+    assert report["error_classes"] == {}
+    assert 1 < StubWebhook.peak <= 3
+    assert report["throughput_rps"] > 0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p95"] <= report["latency_ms"]["p99"]
+    assert len({s["request_id"] for s in report["samples"]}) == 12
+
+
+def test_load_classifies_errors():
+    """Timeouts, HTTP errors and workflow errors are counted separately"""
+    corpus = [{"job_description": jd} for jd in ("ok", "slow", "crash", "reject")]
+    report = run_against_stub(corpus, submissions=8, concurrency=4, timeout=0.25)
+
+    assert report["succeeded"] == 2
+    assert report["error_classes"] == {"timeout": 2, "http_500": 2, "workflow_error": 2}
+    assert report["timeout_rate"] == 0.25
+    assert report["error_rate"] == 0.75
+
+
+TESTS = [
+    test_percentile_interpolates,
+    test_load_respects_concurrency,
+    test_load_classifies_errors,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,29 +5,29 @@ MCP Integration Test Script
 Tests MCP n8n server integration for the Resume Enhancer workflow.
 This script simulates the MCP commands that Claude Code would use.
 
+API calls go through n8n_client.py, so they share one keep-alive session and
+list commands page through every workflow/execution.
+
 Usage:
-    python test_mcp_integration.py [--n8n-url URL] [--api-key KEY]
+    python test_mcp_integration.py [--n8n-url URL] [--api-key KEY] [--timings]
 """
 
 import os
 import sys
 import json
 import argparse
-import requests
 from pathlib import Path
-from datetime import datetime
+
+from n8n_client import N8nClient, CallTimings
 
 
 class MCPSimulator:
     """Simulates MCP n8n server commands via direct API calls"""
 
-    def __init__(self, base_url: str, api_key: str):
-        self.base_url = base_url.rstrip("/")
-        self.api_url = f"{self.base_url}/api/v1"
-        self.headers = {
-            "X-N8N-API-KEY": api_key,
-            "Content-Type": "application/json"
-        }
+    def __init__(self, base_url: str, api_key: str, client: N8nClient | None = None):
+        self.client = client or N8nClient(base_url, api_key)
+        self.base_url = self.client.base_url
+        self.api_url = self.client.api_url
 
     def health_check(self) -> dict:
         """Simulate n8n_health_check MCP command"""
@@ -35,11 +35,7 @@ class MCPSimulator:
 
         try:
             # Check API connectivity
-            response = requests.get(
-                f"{self.api_url}/workflows",
-                headers=self.headers,
-                timeout=10
-            )
+            response = self.client.request("GET", "workflows", params={"limit": 1}, timeout=10)
 
             return {
                 "success": response.status_code == 200,
@@ -54,30 +50,20 @@ class MCPSimulator:
                 "error": str(e)
             }
 
-    def list_workflows(self, limit: int = 100) -> dict:
-        """Simulate n8n_list_workflows MCP command"""
+    def list_workflows(self, limit: int | None = None) -> dict:
+        """Simulate n8n_list_workflows MCP command (all pages unless limit is set)"""
         print(f"\n[MCP] n8n_list_workflows(limit={limit})")
 
         try:
-            response = requests.get(
-                f"{self.api_url}/workflows",
-                headers=self.headers,
-                params={"limit": limit},
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                workflows = data.get("data", [])
-                return {
-                    "success": True,
-                    "count": len(workflows),
-                    "workflows": [
-                        {"id": w["id"], "name": w["name"], "active": w.get("active", False)}
-                        for w in workflows
-                    ]
-                }
-            return {"success": False, "error": f"HTTP {response.status_code}"}
+            workflows = list(self.client.iter_workflows(max_items=limit))
+            return {
+                "success": True,
+                "count": len(workflows),
+                "workflows": [
+                    {"id": w["id"], "name": w["name"], "active": w.get("active", False)}
+                    for w in workflows
+                ]
+            }
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -86,11 +72,7 @@ class MCPSimulator:
         print(f"\n[MCP] n8n_get_workflow(id='{workflow_id}', mode='{mode}')")
 
         try:
-            response = requests.get(
-                f"{self.api_url}/workflows/{workflow_id}",
-                headers=self.headers,
-                timeout=30
-            )
+            response = self.client.request("GET", f"workflows/{workflow_id}")
 
             if response.status_code == 200:
                 workflow = response.json()
@@ -111,12 +93,7 @@ class MCPSimulator:
         print(f"\n[MCP] n8n_create_workflow(name='{workflow_data.get('name')}')")
 
         try:
-            response = requests.post(
-                f"{self.api_url}/workflows",
-                headers=self.headers,
-                json=workflow_data,
-                timeout=30
-            )
+            response = self.client.create_workflow(workflow_data)
 
             if response.status_code in [200, 201]:
                 result = response.json()
@@ -137,12 +114,7 @@ class MCPSimulator:
         for op in operations:
             if op.get("type") == "activateWorkflow":
                 try:
-                    response = requests.patch(
-                        f"{self.api_url}/workflows/{workflow_id}",
-                        headers=self.headers,
-                        json={"active": True},
-                        timeout=30
-                    )
+                    response = self.client.activate_workflow(workflow_id)
 
                     return {
                         "success": response.status_code == 200,
@@ -174,39 +146,25 @@ class MCPSimulator:
             "nodes_count": result["nodes_count"]
         }
 
-    def list_executions(self, workflow_id: str = None, limit: int = 10) -> dict:
+    def list_executions(self, workflow_id: str = None, limit: int | None = 10) -> dict:
         """Simulate n8n_executions MCP command with action='list'"""
         print(f"\n[MCP] n8n_executions(action='list', workflowId='{workflow_id}', limit={limit})")
 
         try:
-            params = {"limit": limit}
-            if workflow_id:
-                params["workflowId"] = workflow_id
-
-            response = requests.get(
-                f"{self.api_url}/executions",
-                headers=self.headers,
-                params=params,
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                executions = data.get("data", [])
-                return {
-                    "success": True,
-                    "count": len(executions),
-                    "executions": [
-                        {
-                            "id": e.get("id"),
-                            "status": e.get("status"),
-                            "startedAt": e.get("startedAt"),
-                            "stoppedAt": e.get("stoppedAt")
-                        }
-                        for e in executions
-                    ]
-                }
-            return {"success": False, "error": f"HTTP {response.status_code}"}
+            executions = list(self.client.iter_executions(workflow_id, max_items=limit))
+            return {
+                "success": True,
+                "count": len(executions),
+                "executions": [
+                    {
+                        "id": e.get("id"),
+                        "status": e.get("status"),
+                        "startedAt": e.get("startedAt"),
+                        "stoppedAt": e.get("stoppedAt")
+                    }
+                    for e in executions
+                ]
+            }
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -215,11 +173,7 @@ class MCPSimulator:
         print(f"\n[MCP] n8n_executions(action='get', id='{execution_id}', mode='{mode}')")
 
         try:
-            response = requests.get(
-                f"{self.api_url}/executions/{execution_id}",
-                headers=self.headers,
-                timeout=30
-            )
+            response = self.client.request("GET", f"executions/{execution_id}")
 
             if response.status_code == 200:
                 execution = response.json()
@@ -243,7 +197,8 @@ def run_mcp_tests(args):
     print("MCP n8n Server Integration Tests")
     print("="*60)
 
-    mcp = MCPSimulator(args.n8n_url, args.api_key)
+    timings = CallTimings()
+    mcp = MCPSimulator(args.n8n_url, args.api_key, N8nClient(args.n8n_url, args.api_key, hooks=[timings]))
     results = {"passed": 0, "failed": 0}
 
     # Test 1: Health Check
@@ -351,6 +306,9 @@ def run_mcp_tests(args):
     print(f"Failed: {results['failed']}")
     print("="*60 + "\n")
 
+    if args.timings:
+        print(json.dumps({"api_timings": timings.summary()}, indent=2))
+
     return results
 
 
@@ -366,6 +324,11 @@ def main():
         default=os.getenv("N8N_API_KEY", ""),
         help="n8n API key"
     )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print per-endpoint API call latency"
+    )
 
     args = parser.parse_args()
 
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+n8n Client Tests
+
+Runs n8n_client.py against a stub n8n API (no n8n needed): keep-alive reuse,
+cursor pagination, retries and timing hooks.
+
+Usage:
+    python test_n8n_client.py
+    python -m pytest test_n8n_client.py
+"""
+
+import sys
+import json
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from n8n_client import N8nClient, CallTimings, endpoint_template
+from test_runner import find_workflow
+from test_mcp_integration import MCPSimulator
+
+
+WORKFLOWS = [{"id": f"wf{i:04d}", "name": f"Workflow {i}", "active": False} for i in range(600)]
+WORKFLOWS[555]["name"] = "Resume Enhancer v3"
+EXECUTIONS = [{"id": str(9000 - i), "workflowId": "wf0555", "status": "success"} for i in range(1200)]
+
+
+class StubN8n(BaseHTTPRequestHandler):
+    """Paginated /workflows and /executions; /flaky fails a set number of times"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = set()
+    requests_seen = []
+    flaky_failures = 0
+    lock = threading.Lock()
+
+    def _send(self, status: int, body: dict, headers: dict | None = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _page(self, items: list, query: dict):
+        limit = int(query.get("limit", ["100"])[0])
+        if limit > 250:
+            return self._send(400, {"message": "limit must be <= 250"})
+        start = int(query.get("cursor", ["0"])[0])
+        page = items[start:start + limit]
+        next_cursor = str(start + limit) if start + limit < len(items) else None
+        self._send(200, {"data": page, "nextCursor": next_cursor})
+
+    def _handle(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if self.headers.get("Content-Length"):
+            self.rfile.read(int(self.headers["Content-Length"]))
+        with StubN8n.lock:
+            StubN8n.connections.add(self.client_address[1])
+            StubN8n.requests_seen.append((self.command, url.path, query))
+            fail = url.path == "/api/v1/flaky" and StubN8n.flaky_failures > 0
+            if fail:
+                StubN8n.flaky_failures -= 1
+
+        if self.headers.get("X-N8N-API-KEY") != "key":
+            return self._send(401, {"message": "unauthorized"})
+        if fail:
+            return self._send(503, {"message": "busy"}, {"Retry-After": "0"})
+        if url.path == "/api/v1/flaky":
+            return self._send(200, {"ok": True})
+        if url.path == "/api/v1/workflows":
+            return self._page(WORKFLOWS, query)
+        if url.path == "/api/v1/executions":
+            items = [e for e in EXECUTIONS if e["workflowId"] == query.get("workflowId", ["wf0555"])[0]]
+            return self._page(items, query)
+        self._send(404, {"message": "not found"})
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def stub_n8n(flaky_failures: int = 0):
+    StubN8n.connections = set()
+    StubN8n.requests_seen = []
+    StubN8n.flaky_failures = flaky_failures
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubN8n)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pagination_walks_every_page():
+    """Workflows and executions are followed across nextCursor pages"""
+    with stub_n8n() as url:
+        with N8nClient(url, "key") as client:
+            workflows = list(client.iter_workflows())
+            executions = list(client.iter_executions("wf0555", max_items=300))
+            found = client.find_workflow("resume enhancer")
+        pages = [q for m, p, q in StubN8n.requests_seen if p == "/api/v1/workflows"]
+
+        assert [w["id"] for w in workflows] == [w["id"] for w in WORKFLOWS]
+        assert len(executions) == 300 and executions[0]["id"] == "9000"
+        assert found["id"] == "wf0555"
+        assert all(int(q["limit"][0]) <= 250 for q in pages)
+        # 3 pages for the full listing, 3 more for find (match on the last page)
+        assert len(pages) == 6
+
+        assert find_workflow(url, "key", "Resume Enhancer") == "wf0555"
+        assert MCPSimulator(url, "key").list_workflows()["count"] == 600
+
+
+def test_connections_are_reused():
+    """Fifty calls through one client share a single keep-alive connection"""
+    with stub_n8n() as url:
+        with N8nClient(url, "key") as client:
+            for _ in range(50):
+                assert client.health()
+        assert len(StubN8n.requests_seen) == 50
+        assert len(StubN8n.connections) == 1
+
+
+def test_retries_transient_failures():
+    """503s are retried with backoff for GET but not for POST"""
+    timings = CallTimings()
+    with stub_n8n(flaky_failures=2) as url:
+        with N8nClient(url, "key", backoff_s=0.01, hooks=[timings]) as client:
+            assert client.get_json("flaky") == {"ok": True}
+
+            StubN8n.flaky_failures = 1
+            assert client.request("POST", "flaky", json={}).status_code == 503
+
+            StubN8n.flaky_failures = 5
+            assert client.request("GET", "flaky").status_code == 503
+
+    assert [c["attempts"] for c in timings.calls] == [3, 1, 4]
+    assert [c["error"] for c in timings.calls] == [None, "http_503", "http_503"]
+
+
+def test_timing_hooks_group_by_endpoint():
+    """Hooks see one record per call; ids are folded into the endpoint"""
+    timings = CallTimings()
+    with stub_n8n() as url:
+        with N8nClient(url, "key", hooks=[timings]) as client:
+            client.health()
+            client.request("GET", "executions/123")
+            client.request("GET", "executions/456")
+            client.request("GET", f"{url}/webhook/resume-enhancer/retry")
+
+    summary = timings.summary()
+    assert set(summary) == {
+        "GET /api/v1/workflows", "GET /api/v1/executions/{id}", "GET /webhook/resume-enhancer/retry"
+    }
+    assert summary["GET /api/v1/executions/{id}"]["calls"] == 2
+    assert summary["GET /api/v1/executions/{id}"]["errors"] == 2
+    assert summary["GET /api/v1/workflows"]["p95_ms"] is not None
+    assert endpoint_template("/api/v1/workflows/abc/activate") == "/api/v1/workflows/{id}/activate"
+
+
+TESTS = [
+    test_pagination_walks_every_page,
+    test_connections_are_reused,
+    test_retries_transient_failures,
+    test_timing_hooks_group_by_endpoint,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Offline Workflow Tests
+
+Runs workflow/workflow.json and workflow/workflow_parallel.json through the
+offline engine (workflow_engine.py) with stubbed OpenAI, Gotenberg and file
+access. No n8n instance is needed, so these tests run in seconds on a laptop
+or CI box. Node.js must be on PATH.
+
+Usage:
+    python test_offline_workflow.py
+    python -m pytest test_offline_workflow.py
+"""
+
+import sys
+import json
+from pathlib import Path
+from collections import Counter
+
+from workflow_engine import WorkflowEngine, TemplateEchoLLM, DEFAULT_WORKFLOW
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PARALLEL_WORKFLOW = DEFAULT_WORKFLOW.parent / "workflow_parallel.json"
+
+# The ATS Analyzer only runs when the request sets ats_refine (see test_ats_score.py)
+GENERATORS = [
+    "Generate Cover Letter",
+    "Generate Recruiter Questions",
+    "Generate Interview Prep",
+    "Generate STAR Stories",
+    "Generate Why Company",
+    "Generate 30-60-90 Plan",
+    "Generate Gap Analysis",
+]
+
+
+def make_engine(workflow: Path = DEFAULT_WORKFLOW, **kwargs) -> WorkflowEngine:
+    """Engine wired to the sample resume fixture"""
+    resume_text = (FIXTURES_DIR / "sample_resume.txt").read_text(encoding="utf-8")
+    kwargs.setdefault("llm", TemplateEchoLLM())
+    return WorkflowEngine.from_file(
+        str(workflow),
+        read_file=lambda path: resume_text.encode("utf-8"),
+        extract_pdf=lambda data: data.decode("utf-8"),
+        **kwargs
+    )
+
+
+def manual_jd_payload() -> dict:
+    return {"jd_text": (FIXTURES_DIR / "sample_job_description.txt").read_text(encoding="utf-8")}
+
+
+def test_manual_jd_run_succeeds():
+    """Manual JD path reaches Summary with success"""
+    with make_engine() as engine:
+        run = engine.run(manual_jd_payload())
+
+    assert run["last_node"] == "Summary"
+    assert run["result"]["success"] is True
+    assert run["result"]["jd_source"] == "manual"
+
+
+def test_every_node_is_timed():
+    """Each executed node gets exactly one timing entry"""
+    with make_engine() as engine:
+        run = engine.run(manual_jd_payload())
+
+    timed = [t["node"] for t in run["timings"]]
+    assert len(timed) == len(set(timed))
+    assert set(timed) == set(run["outputs"])
+    assert all(t["duration_ms"] >= 0 for t in run["timings"])
+    assert "Fetch via Job-Fetcher" not in timed
+
+
+def test_llm_nodes_receive_rendered_prompts():
+    """OpenAI nodes see the JD text, not the raw expression"""
+    prompts = {}
+
+    def capture(node_name, model, messages):
+        prompts[node_name] = messages[0]["content"]
+        return TemplateEchoLLM()(node_name, model, messages)
+
+    with make_engine(llm=capture) as engine:
+        engine.run(manual_jd_payload())
+
+    assert "{{" not in prompts["Generate Cover Letter"]
+    assert "Senior Software Engineer" in prompts["Generate Cover Letter"]
+
+
+def test_linkedin_url_uses_job_fetcher():
+    """A LinkedIn URL is routed through the job-fetcher stub"""
+    calls = []
+
+    def http(node_name, request):
+        calls.append(request["url"])
+        if request["url"].endswith("/fetch"):
+            return {
+                "ok": True,
+                "blocked": False,
+                "title": "Senior Software Engineer",
+                "company": "Acme",
+                "location": "Remote",
+                "descriptionText": manual_jd_payload()["jd_text"],
+                "applyUrl": None
+            }
+        return b"%PDF-1.4\n%%EOF\n"
+
+    with make_engine(http=http) as engine:
+        run = engine.run({"job_url": "https://www.linkedin.com/jobs/view/123/"})
+
+    assert calls[0] == "http://job-fetcher:3000/fetch"
+    assert run["outputs"]["Merge JD Data"][0]["json"]["jd_source"] == "job-fetcher"
+    assert run["result"]["success"] is True
+
+
+def test_parallel_variant_matches_serial():
+    """Parallel variant sends the same prompts and returns the same result"""
+    def capture(prompts):
+        def llm(node_name, model, messages):
+            prompts[node_name] = (model, messages[0]["content"])
+            return TemplateEchoLLM()(node_name, model, messages)
+        return llm
+
+    # Same request id, so both runs write to the same output folder
+    payload = {**manual_jd_payload(), "request_id": "req_parity"}
+    serial_prompts, parallel_prompts = {}, {}
+    with make_engine(llm=capture(serial_prompts)) as engine:
+        serial = engine.run(payload)
+    with make_engine(PARALLEL_WORKFLOW, llm=capture(parallel_prompts)) as engine:
+        parallel = engine.run(payload)
+
+    assert serial_prompts == parallel_prompts
+    parallel_result = dict(parallel["result"])
+    assert parallel_result.pop("generator_failures") == []
+    assert parallel_result == serial["result"]
+
+
+def test_parallel_variant_fans_out():
+    """Generator latency collapses to roughly one LLM round trip"""
+    latency_ms = 200
+    with make_engine(PARALLEL_WORKFLOW, llm=TemplateEchoLLM(latency_ms=latency_ms)) as engine:
+        run = engine.run(manual_jd_payload())
+
+    fan_out = next(t for t in run["timings"] if t["node"] == "Call Generators (Parallel)")
+    assert fan_out["items_out"] == len(GENERATORS)
+    assert fan_out["duration_ms"] < latency_ms * 3
+
+
+def test_parallel_variant_tolerates_partial_failure():
+    """Failed generators are retried; one that keeps failing is reported without failing the run"""
+    calls = Counter()
+
+    def flaky(node_name, model, messages):
+        calls[node_name] += 1
+        if node_name == "Generate STAR Stories":
+            raise ConnectionError("upstream reset")
+        if node_name == "Generate Cover Letter" and calls[node_name] == 1:
+            raise ConnectionError("429 Too Many Requests")
+        return TemplateEchoLLM()(node_name, model, messages)
+
+    with make_engine(PARALLEL_WORKFLOW, llm=flaky) as engine:
+        run = engine.run(manual_jd_payload())
+
+    assert run["result"]["success"] is True
+    assert [f["generator"] for f in run["result"]["generator_failures"]] == ["Generate STAR Stories"]
+    assert "error" in run["result"]["star_stories"]
+    assert run["result"]["cover_letter"]
+    # Only the failed generators are sent again, up to three attempts in all
+    assert calls["Generate STAR Stories"] == 3
+    assert calls["Generate Cover Letter"] == 2
+    assert calls["Generate Gap Analysis"] == 1
+
+
+def test_parsed_resume_is_reused():
+    """A second run skips PDF extraction and Parse Resume"""
+    prompts = []
+
+    def capture(node_name, model, messages):
+        prompts.append(node_name)
+        return TemplateEchoLLM()(node_name, model, messages)
+
+    with make_engine(llm=capture) as engine:
+        first = engine.run(manual_jd_payload())
+        prompts.clear()
+        second = engine.run(manual_jd_payload())
+
+    assert first["result"]["resume_cache"] == {"text": "miss", "parse": "miss"}
+    assert second["result"]["resume_cache"] == {"text": "hit", "parse": "hit"}
+    timed = [t["node"] for t in second["timings"]]
+    assert "Extract PDF Text" not in timed
+    assert "Parse Resume" not in prompts
+    enhanced = [run["outputs"]["Verify Resume"][0]["json"]["enhanced_resume"] for run in (first, second)]
+    assert enhanced[0] == enhanced[1]
+    assert second["result"]["cover_letter"] == first["result"]["cover_letter"]
+
+
+def test_parse_prompt_change_invalidates_resume_cache():
+    """Editing the Parse Resume prompt forces a re-parse"""
+    with make_engine() as engine:
+        engine.run(manual_jd_payload())
+        message = engine.nodes["Parse Resume"]["parameters"]["messages"]["values"][0]
+        message["content"] += "\nUse ISO dates."
+        run = engine.run(manual_jd_payload())
+
+    assert run["result"]["resume_cache"] == {"text": "hit", "parse": "miss"}
+    assert "Parse Resume" in run["outputs"]
+
+
+def noisy_jd_payload() -> dict:
+    """Sample JD padded like a scraped posting: long company blurb, perks, EEO text, page chrome"""
+    jd = manual_jd_payload()["jd_text"]
+    history = [f"TechGiant was founded in {2000 + i} and serves customers in {40 + i} countries." for i in range(150)]
+    # Scraped pages often repeat the company blurb
+    about = "About Us:\n" + "\n".join(history + history[:20])
+    eeo = (
+        "TechGiant is an equal opportunity employer. We consider all applicants without regard to race, "
+        "color, religion, sex, national origin, disability or protected veteran status."
+    )
+    perks = "Perks:\n" + "\n".join(f"- Perk number {i}: free snacks and gym" for i in range(40))
+    chrome = "Show more\nShow less\nReport this job"
+    return {"jd_text": "\n\n".join([about, jd, perks, eeo, chrome, eeo])}
+
+
+def test_jd_is_compacted_to_node_budgets():
+    """Boilerplate is dropped and the JD fits each budget, requirements first"""
+    prompts = {}
+
+    def capture(node_name, model, messages):
+        prompts[node_name] = messages[0]["content"]
+        return TemplateEchoLLM()(node_name, model, messages)
+
+    with make_engine(llm=capture) as engine:
+        run = engine.run(noisy_jd_payload())
+
+    compaction = run["outputs"]["Compact JD"][0]["json"]["jd_compaction"]
+    assert compaction["tokens_after"] < compaction["tokens_before"]
+    assert compaction["dropped_lines"] == {"boilerplate": 5, "duplicate": 20}
+    assert run["result"]["jd_compaction"]["per_node"] == compaction["per_node"]
+    for node in GENERATORS:
+        assert "equal opportunity" not in prompts[node]
+        assert "Perk number" not in prompts[node]
+        assert "Show more" not in prompts[node]
+    # Over budget, the company blurb is cut before the requirements
+    assert compaction["per_node"]["Generator Context"] <= 1500
+    assert compaction["per_node"]["Enhance Resume"] <= 1000
+    assert "Strong proficiency in Python" in prompts["Generate Cover Letter"]
+    assert "founded in 2149" not in prompts["Generate Cover Letter"]
+    assert "Strong proficiency in Python" in prompts["Enhance Resume"]
+
+
+def test_parallel_variant_compacts_jd_like_serial():
+    """Both variants send the same compacted JD to every generator"""
+    def capture(prompts):
+        def llm(node_name, model, messages):
+            prompts[node_name] = messages[0]["content"]
+            return TemplateEchoLLM()(node_name, model, messages)
+        return llm
+
+    serial_prompts, parallel_prompts = {}, {}
+    with make_engine(llm=capture(serial_prompts)) as engine:
+        engine.run(noisy_jd_payload())
+    with make_engine(PARALLEL_WORKFLOW, llm=capture(parallel_prompts)) as engine:
+        engine.run(noisy_jd_payload())
+
+    assert serial_prompts == parallel_prompts
+
+
+PARSED_RESUME = {
+    "name": "Jane Doe",
+    "title": "Software Engineer",
+    "contact": {"email": "jane@example.com", "phone": "+1 555 0100", "location": "Berlin"},
+    "summary": "Backend engineer with 6 years of Python experience.",
+    "experience": [{
+        "title": "Software Engineer",
+        "company": "Acme Corp",
+        "dates": "2019 - Present",
+        "bullets": [
+            "Built REST APIs in Python and Django serving 2M requests a day",
+            "Mentored 3 junior engineers"
+        ]
+    }],
+    "education": [{"degree": "BSc Computer Science", "school": "TU Berlin", "dates": "2015 - 2019"}],
+    "skills": {"technical": ["Python", "SQL"], "frameworks": ["Django"], "tools": ["Docker"]},
+    "certifications": []
+}
+
+
+def resume_llm(enhance, verify=None, prompts=None):
+    """LLM stub with a real parsed resume; `enhance` edits a copy of it"""
+    def llm(node_name, model, messages):
+        if prompts is not None:
+            prompts[node_name] = messages[0]["content"]
+        if node_name == "Parse Resume":
+            return json.dumps(PARSED_RESUME)
+        if node_name == "Enhance Resume":
+            resume = json.loads(json.dumps(PARSED_RESUME))
+            enhance(resume)
+            return json.dumps({"detected_level": "mid", "enhanced_resume": resume})
+        if node_name == "Verify LLM" and verify:
+            return json.dumps(verify)
+        return TemplateEchoLLM()(node_name, model, messages)
+    return llm
+
+
+def test_rephrasing_skips_verify_llm():
+    """Rephrased bullets with no new facts never reach Verify LLM"""
+    def rephrase(resume):
+        resume["experience"][0]["bullets"][0] = "Designed REST APIs in Python and Django serving 2M requests a day"
+
+    prompts = {}
+    with make_engine(llm=resume_llm(rephrase, prompts=prompts)) as engine:
+        engine.run(manual_jd_payload())
+        run = engine.run(manual_jd_payload())
+
+    assert "Verify LLM" not in prompts
+    check = run["result"]["pre_verification"]
+    assert check["fields_flagged"] == 0
+    assert check["verify_llm"] is False
+    assert (check["runs"], check["skipped"], check["skip_rate"]) == (2, 2, 1)
+    resume = run["outputs"]["Prepare ATS Input"][0]["json"]["corrected_resume"]
+    assert resume["experience"][0]["bullets"][0].startswith("Designed")
+
+
+def test_new_facts_are_verified_field_by_field():
+    """Only flagged fields go to Verify LLM, and its corrections are applied"""
+    def embellish(resume):
+        resume["experience"][0]["bullets"][1] = "Mentored 3 junior engineers and cut deploy time by 40% with Kubernetes"
+        resume["experience"][0]["company"] = "Acme Corporation International"
+        resume["skills"]["tools"].append("Terraform")
+
+    verify = {
+        "verified": False,
+        "violations_found": 3,
+        "corrections": [
+            {"id": "f1", "value": "Acme Corp"},
+            {"id": "f2", "value": "Mentored 3 junior engineers"},
+            {"id": "f3", "value": None}
+        ]
+    }
+    prompts = {}
+    with make_engine(llm=resume_llm(embellish, verify, prompts)) as engine:
+        run = engine.run(manual_jd_payload())
+
+    flagged = run["outputs"]["Verify Resume"][0]["json"]["flagged_fields"]
+    assert [(f["id"], f["field"]) for f in flagged] == [
+        ("f1", "experience[0].company"), ("f2", "experience[0].bullets[1]"), ("f3", "skills.tools[1]")
+    ]
+    assert run["result"]["pre_verification"]["flags"] == {"employer": 1, "metric": 1, "skill": 2}
+    assert "cut deploy time by 40%" in prompts["Verify LLM"]
+    assert "Built REST APIs" not in prompts["Verify LLM"].split("flagged these fields")[1]
+
+    resume = run["outputs"]["Prepare ATS Input"][0]["json"]["corrected_resume"]
+    assert resume["skills"]["tools"] == ["Docker"]
+    assert "40%" not in json.dumps(resume)
+    assert resume["experience"][0]["company"] == "Acme Corp"
+    assert run["result"]["violations_corrected"] == 3
+
+
+def test_tone_change_regenerates_only_tone_artifacts():
+    """A tone-only resubmit reruns the cover letter and why-company text, nothing else"""
+    def embellish(resume):
+        resume["skills"]["tools"].append("Terraform")
+
+    verify = {"verified": False, "violations_found": 1, "corrections": [{"id": "f1", "value": None}]}
+    prompts = {}
+    with make_engine(llm=resume_llm(embellish, verify, prompts)) as engine:
+        first = engine.run(manual_jd_payload())
+        prompts.clear()
+        second = engine.run({**manual_jd_payload(), "tone": "confident"})
+
+    assert set(prompts) == {"Generate Cover Letter", "Generate Why Company"}
+    assert "Tone: confident" in prompts["Generate Cover Letter"]
+    assert "Tone: confident" in prompts["Generate Why Company"]
+    assert second["result"]["regeneration"] == {
+        "recomputed": ["Generate Cover Letter", "Generate Why Company"],
+        "reused": ["Enhance Resume", "Verify LLM"] + [g for g in GENERATORS if g not in prompts]
+    }
+    # Memoized verification still corrects the resume
+    assert second["outputs"]["Prepare ATS Input"][0]["json"]["corrected_resume"]["skills"]["tools"] == ["Docker"]
+    for key in ("ats", "interview_prep", "gap_analysis", "violations_corrected"):
+        assert second["result"][key] == first["result"][key]
+
+
+def test_language_and_page_changes_rerun_their_dependents():
+    """Language reruns every generator; pages also rerun the resume enhancement"""
+    prompts = {}
+    with make_engine(llm=resume_llm(lambda resume: None, prompts=prompts)) as engine:
+        engine.run(manual_jd_payload())
+        prompts.clear()
+        language = engine.run({**manual_jd_payload(), "language": "de"})
+        language_prompts = dict(prompts)
+        prompts.clear()
+        pages = engine.run({**manual_jd_payload(), "language": "de", "pages": 2})
+
+    assert set(language_prompts) == set(GENERATORS)
+    assert all("Language: de" in prompts[g] for g in GENERATORS)
+    assert language["result"]["regeneration"]["reused"] == ["Enhance Resume"]
+    assert set(prompts) == {"Enhance Resume", *GENERATORS}
+    assert "Max pages: 2" in prompts["Enhance Resume"]
+    assert pages["result"]["regeneration"]["reused"] == []
+
+
+def test_parallel_variant_fans_out_only_changed_generators():
+    """The parallel variant sends only stale generators, and none on an identical resubmit"""
+    with make_engine(PARALLEL_WORKFLOW) as engine:
+        first = engine.run(manual_jd_payload())
+        tone = engine.run({**manual_jd_payload(), "tone": "confident"})
+        same = engine.run({**manual_jd_payload(), "tone": "confident"})
+
+    fan_out = next(t for t in tone["timings"] if t["node"] == "Call Generators (Parallel)")
+    assert fan_out["items_out"] == 2
+    assert "Call Generators (Parallel)" not in same["outputs"]
+    assert same["result"]["regeneration"]["recomputed"] == []
+    assert same["result"]["generator_failures"] == []
+    assert same["result"]["interview_prep"] == first["result"]["interview_prep"]
+    assert same["result"]["cover_letter"] == tone["result"]["cover_letter"]
+
+
+def test_declared_inputs_match_prompts():
+    """Every request field a prompt reads is a declared input of that node"""
+    with make_engine() as engine:
+        run = engine.run(manual_jd_payload())
+
+    plan = run["outputs"]["Plan Regeneration"][0]["json"]["nodes"]
+    for name, node in plan.items():
+        content = engine.nodes[name]["parameters"]["messages"]["values"][0]["content"]
+        for field in ("tone", "language", "pages"):
+            assert (f"json.{field} }}}}" in content) == (field in node["inputs"]), (name, field)
+
+
+TESTS = [
+    test_manual_jd_run_succeeds,
+    test_every_node_is_timed,
+    test_llm_nodes_receive_rendered_prompts,
+    test_linkedin_url_uses_job_fetcher,
+    test_parallel_variant_matches_serial,
+    test_parallel_variant_fans_out,
+    test_parallel_variant_tolerates_partial_failure,
+    test_parsed_resume_is_reused,
+    test_parse_prompt_change_invalidates_resume_cache,
+    test_jd_is_compacted_to_node_budgets,
+    test_parallel_variant_compacts_jd_like_serial,
+    test_rephrasing_skips_verify_llm,
+    test_new_facts_are_verified_field_by_field,
+    test_tone_change_regenerates_only_tone_artifacts,
+    test_language_and_page_changes_rerun_their_dependents,
+    test_parallel_variant_fans_out_only_changed_generators,
+    test_declared_inputs_match_prompts,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
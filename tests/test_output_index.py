@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Output Index Tests
+
+Checks the per-run manifests the workflow writes (manifest.json in the run
+folder plus one line in manifests.jsonl) and the SQLite index output_index.py
+builds from them: incremental sync, lookups, retention pruning and integrity
+checks. Node.js must be on PATH for the workflow run.
+
+Usage:
+    python test_output_index.py
+    python -m pytest test_output_index.py
+"""
+
+import sys
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+from output_index import OutputIndex, MANIFEST_LOG, MANIFEST_FILE
+from workflow_engine import WorkflowEngine, TemplateEchoLLM, DEFAULT_WORKFLOW, FAKE_PDF
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PARALLEL_WORKFLOW = DEFAULT_WORKFLOW.parent / "workflow_parallel.json"
+
+
+def write_run(output_dir: Path, request_id: str, created_at: str, company: str = "Acme",
+              role: str = "Engineer", content: bytes = b"%PDF-1.4 resume") -> dict:
+    """Lay out one run the way the workflow does and append its manifest line"""
+    run_dir = f"JobApplications/{company}/{role}-{created_at[:10]}/{request_id}"
+    (output_dir / run_dir).mkdir(parents=True)
+    (output_dir / run_dir / "improved_resume.pdf").write_bytes(content)
+    manifest = {
+        "manifest_version": 1,
+        "request_id": request_id,
+        "execution_id": "1",
+        "company": company,
+        "role": role,
+        "run_dir": run_dir,
+        "created_at": created_at,
+        "files": [{"name": "improved_resume.pdf", "bytes": len(content), "sha256": hashlib.sha256(content).hexdigest()}],
+        "timings": {"received_at": created_at, "finished_at": created_at, "total_ms": 1200}
+    }
+    (output_dir / run_dir / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+    with open(output_dir / MANIFEST_LOG, "a", encoding="utf-8") as f:
+        f.write(json.dumps(manifest) + "\n")
+    return manifest
+
+
+def run_workflow(workflow: Path, output_dir: Path, request_id: str) -> dict:
+    resume_text = (FIXTURES_DIR / "sample_resume.txt").read_text(encoding="utf-8")
+    jd_text = (FIXTURES_DIR / "sample_job_description.txt").read_text(encoding="utf-8")
+    with WorkflowEngine.from_file(
+        str(workflow),
+        llm=TemplateEchoLLM(),
+        read_file=lambda path: resume_text.encode("utf-8"),
+        extract_pdf=lambda data: data.decode("utf-8"),
+        output_dir=str(output_dir)
+    ) as engine:
+        return engine.run({"jd_text": jd_text, "request_id": request_id})
+
+
+def test_workflow_writes_manifest():
+    """Both variants write manifest.json and a manifests.jsonl line that index to the PDF"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        for workflow, request_id in [(DEFAULT_WORKFLOW, "req_serial"), (PARALLEL_WORKFLOW, "req_parallel")]:
+            run = run_workflow(workflow, output_dir, request_id)
+            assert run["result"]["request_id"] == request_id
+            assert run["result"]["output_files"]["manifest"].endswith(f"/{request_id}/manifest.json")
+
+        lines = (output_dir / MANIFEST_LOG).read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["request_id"] for line in lines] == ["req_serial", "req_parallel"]
+
+        with OutputIndex(str(output_dir)) as index:
+            assert index.sync() == 2
+            run = index.get("req_parallel")
+            assert run is not None
+            assert (Path(run["path"]) / MANIFEST_FILE).is_file()
+            pdf = Path(run["path"]) / "improved_resume.pdf"
+            assert pdf.read_bytes() == FAKE_PDF
+            assert run["files"] == [{
+                "name": "improved_resume.pdf",
+                "bytes": len(FAKE_PDF),
+                "sha256": hashlib.sha256(FAKE_PDF).hexdigest()
+            }]
+            assert run["timings"]["total_ms"] >= 0
+            assert index.verify() == []
+
+
+def test_sync_reads_only_new_lines():
+    """sync() resumes from the last offset and leaves a half-written line for later"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        write_run(output_dir, "req_1", "2025-01-01T10:00:00.000Z")
+        with OutputIndex(tmp) as index:
+            assert index.sync() == 1
+            assert index.sync() == 0
+
+            write_run(output_dir, "req_2", "2025-01-02T10:00:00.000Z")
+            with open(output_dir / MANIFEST_LOG, "a", encoding="utf-8") as f:
+                f.write('{"request_id": "req_partial"')
+            assert index.sync() == 1
+            assert index.get("req_partial") is None
+
+            with open(output_dir / MANIFEST_LOG, "a", encoding="utf-8") as f:
+                f.write(', "run_dir": "missing", "created_at": "2025-01-03T10:00:00.000Z"}\n')
+            # Complete now, but its folder is gone, so it is not indexed
+            assert index.sync() == 0
+            assert [run["request_id"] for run in index.list_runs()] == ["req_2", "req_1"]
+
+
+def test_sync_follows_rotated_log():
+    """A rotated manifests.jsonl is read from the start even once it outgrows the old offset"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        write_run(output_dir, "req_1", "2025-01-01T10:00:00.000Z")
+        write_run(output_dir, "req_2", "2025-01-02T10:00:00.000Z")
+        with OutputIndex(tmp) as index:
+            assert index.sync() == 2
+
+            # Keep the old file so its inode is not handed to the new one
+            (output_dir / MANIFEST_LOG).rename(output_dir / f"{MANIFEST_LOG}.1")
+            for day in (3, 4, 5):
+                write_run(output_dir, f"req_{day}", f"2025-01-0{day}T10:00:00.000Z")
+            assert index.sync() == 3
+            assert [run["request_id"] for run in index.list_runs()] == ["req_5", "req_4", "req_3", "req_2", "req_1"]
+            assert index.sync() == 0
+
+
+def test_get_and_list_runs():
+    """Runs are found by request_id and listed newest first with filters"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        write_run(output_dir, "req_a", "2025-01-01T10:00:00.000Z", company="Acme")
+        write_run(output_dir, "req_b", "2025-01-03T10:00:00.000Z", company="Globex")
+        write_run(output_dir, "req_c", "2025-01-02T10:00:00.000Z", company="Acme", role="Manager")
+        with OutputIndex(tmp) as index:
+            index.sync()
+            assert index.get("req_b")["path"] == str(output_dir / "JobApplications/Globex/Engineer-2025-01-03/req_b")
+            assert index.get("req_missing") is None
+            assert [r["request_id"] for r in index.list_runs()] == ["req_b", "req_c", "req_a"]
+            assert [r["request_id"] for r in index.list_runs(company="Acme")] == ["req_c", "req_a"]
+            assert [r["request_id"] for r in index.list_runs(company="Acme", role="Engineer")] == ["req_a"]
+            assert [r["request_id"] for r in index.list_runs(limit=1)] == ["req_b"]
+
+        # A fresh index rebuilt from manifest.json files sees the same runs
+        (output_dir / "manifest_index.sqlite").unlink()
+        with OutputIndex(tmp) as index:
+            assert index.rebuild() == 3
+            assert index.sync() == 0
+            assert index.get("req_c")["role"] == "Manager"
+
+
+def test_prune_removes_old_runs():
+    """prune() deletes run folders and rows beyond the retention limits"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        write_run(output_dir, "req_old", "2000-01-01T10:00:00.000Z")
+        write_run(output_dir, "req_mid", "2099-01-01T10:00:00.000Z")
+        write_run(output_dir, "req_new", "2099-01-02T10:00:00.000Z")
+        with OutputIndex(tmp) as index:
+            index.sync()
+            assert index.prune(keep_days=30, dry_run=True) == ["req_old"]
+            assert index.get("req_old") is not None
+
+            assert index.prune(keep_days=30) == ["req_old"]
+            assert index.get("req_old") is None
+            assert not (output_dir / "JobApplications/Acme/Engineer-2000-01-01/req_old").exists()
+
+            assert index.prune(keep_last=1) == ["req_mid"]
+            assert [r["request_id"] for r in index.list_runs()] == ["req_new"]
+            # Pruned runs stay out when the log is read again from the start
+            index.conn.execute("DELETE FROM meta")
+            index.sync()
+            assert [r["request_id"] for r in index.list_runs()] == ["req_new"]
+
+
+def test_verify_detects_changed_files():
+    """verify() reports missing, resized and modified files"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        runs = {
+            request_id: write_run(output_dir, request_id, f"2025-01-0{day}T10:00:00.000Z")
+            for day, request_id in enumerate(["req_ok", "req_gone", "req_resized", "req_edited"], start=1)
+        }
+        (output_dir / runs["req_gone"]["run_dir"] / "improved_resume.pdf").unlink()
+        (output_dir / runs["req_resized"]["run_dir"] / "improved_resume.pdf").write_bytes(b"%PDF")
+        (output_dir / runs["req_edited"]["run_dir"] / "improved_resume.pdf").write_bytes(b"%PDF-1.4 RESUME")
+        with OutputIndex(tmp) as index:
+            index.sync()
+            problems = {p["request_id"]: p["problem"] for p in index.verify()}
+            assert problems == {"req_gone": "missing", "req_resized": "size", "req_edited": "sha256"}
+            assert index.verify("req_ok") == []
+
+
+TESTS = [
+    test_workflow_writes_manifest,
+    test_sync_reads_only_new_lines,
+    test_sync_follows_rotated_log,
+    test_get_and_list_runs,
+    test_prune_removes_old_runs,
+    test_verify_detects_changed_files,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Prompt Prefix Tests
+
+Checks prompt_prefix.py's prefix math, and that the workflow's generator
+prompts open with one shared resume + JD block (see Prepare ATS Input's
+generator_context). Node.js must be on PATH.
+
+Usage:
+    python test_prompt_prefix.py
+    python -m pytest test_prompt_prefix.py
+"""
+
+import sys
+from pathlib import Path
+
+from prompt_prefix import cacheable_tokens, capture_prompts, prefix_report
+from workflow_engine import DEFAULT_WORKFLOW
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PARALLEL_WORKFLOW = DEFAULT_WORKFLOW.parent / "workflow_parallel.json"
+
+GENERATORS = {
+    "Generate Cover Letter",
+    "Generate Recruiter Questions",
+    "Generate Interview Prep",
+    "Generate STAR Stories",
+    "Generate Why Company",
+    "Generate 30-60-90 Plan",
+    "Generate Gap Analysis",
+}
+
+
+def sample_prompts(workflow: Path) -> dict:
+    return capture_prompts(
+        str(workflow),
+        (FIXTURES_DIR / "sample_job_description.txt").read_text(encoding="utf-8"),
+        (FIXTURES_DIR / "sample_resume.txt").read_text(encoding="utf-8")
+    )
+
+
+def test_cacheable_tokens():
+    """Nothing is cacheable below 1024 tokens, then in 128-token steps"""
+    assert cacheable_tokens(1023) == 0
+    assert cacheable_tokens(1024) == 1024
+    assert cacheable_tokens(1151) == 1024
+    assert cacheable_tokens(1152) == 1152
+
+
+def test_prefix_report():
+    """Per-node best partner and the group's common prefix"""
+    context = "x" * 8000
+    prompts = {
+        "A": context + "task a",
+        "B": context + "task b",
+        "C": context[:400] + "other",
+        "D": "unrelated",
+    }
+    report = prefix_report(prompts)
+    by_node = {n["node"]: n for n in report["nodes"]}
+
+    assert by_node["A"]["shared_with"] == "B"
+    assert by_node["A"]["shared_tokens"] == 2002
+    assert by_node["A"]["cacheable_tokens"] == 1920
+    assert by_node["D"]["shared_tokens"] == 0
+    assert report["group"]["nodes"] == ["A", "B"]
+    assert report["group"]["cached_tokens_per_run"] == 1920
+
+    explicit = prefix_report(prompts, group=["A", "B", "C"])
+    assert explicit["group"]["shared_chars"] == 400
+
+
+def test_generators_share_context_prefix():
+    """Every generator opens with the same resume + JD block, in both variants"""
+    for workflow in (DEFAULT_WORKFLOW, PARALLEL_WORKFLOW):
+        prompts = sample_prompts(workflow)
+        report = prefix_report(prompts)
+
+        assert set(report["group"]["nodes"]) == GENERATORS
+        common = prompts["Generate Cover Letter"][:report["group"]["shared_chars"]]
+        assert "CANDIDATE RESUME:" in common
+        assert "Strong proficiency in Python" in common
+        assert common.rstrip().endswith("---")
+
+
+TESTS = [
+    test_cacheable_tokens,
+    test_prefix_report,
+    test_generators_share_context_prefix,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"[PASS] {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__doc__}: {e!r}")
+
+    print(f"\nPassed: {len(TESTS) - failed}")
+    print(f"Failed: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,16 @@ Resume Enhancer n8n Workflow Test Runner
 This script tests the Resume Enhancer workflow without depending on LinkedIn.
 It uses the /retry endpoint with a sample job description.
 
+Load mode (--load N) skips the functional tests and instead submits N requests
+from a fixture corpus at a fixed concurrency, then prints throughput, latency
+percentiles, timeout rate and error classes as JSON.
+
+API calls go through n8n_client.py (pooled keep-alive session, cursor
+pagination, retries with jitter); --timings prints per-endpoint latency.
+
 Usage:
     python test_runner.py [--n8n-url URL] [--api-key KEY] [--output-dir DIR]
+    python test_runner.py --load 50 --concurrency 5 [--corpus DIR] [--json-out FILE]
 """
 
 import os
@@ -17,6 +25,14 @@ import argparse
 import requests
 from pathlib import Path
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from n8n_client import N8nClient, CallTimings, shared_client, percentile
+from output_index import OutputIndex
+
+
+DEFAULT_WEBHOOK_PATH = "resume-enhancer/retry"
 
 
 class Colors:
@@ -63,31 +79,17 @@ def load_fixtures() -> dict:
 def check_n8n_health(base_url: str, api_key: str) -> bool:
     """Check if n8n is accessible"""
     try:
-        response = requests.get(
-            f"{base_url}/api/v1/workflows",
-            headers={"X-N8N-API-KEY": api_key},
-            timeout=10
-        )
-        return response.status_code == 200
+        return shared_client(base_url, api_key).health()
     except Exception as e:
         print_status(f"n8n health check failed: {e}", "fail")
         return False
 
 
 def find_workflow(base_url: str, api_key: str, workflow_name: str) -> str | None:
-    """Find workflow ID by name"""
+    """Find workflow ID by name, paging through all workflows"""
     try:
-        response = requests.get(
-            f"{base_url}/api/v1/workflows",
-            headers={"X-N8N-API-KEY": api_key},
-            timeout=30
-        )
-        if response.status_code == 200:
-            workflows = response.json().get("data", [])
-            for wf in workflows:
-                if workflow_name.lower() in wf.get("name", "").lower():
-                    return wf.get("id")
-        return None
+        workflow = shared_client(base_url, api_key).find_workflow(workflow_name)
+        return workflow.get("id") if workflow else None
     except Exception as e:
         print_status(f"Failed to list workflows: {e}", "fail")
         return None
@@ -99,15 +101,7 @@ def import_workflow(base_url: str, api_key: str, workflow_path: str) -> str | No
         with open(workflow_path, "r", encoding="utf-8") as f:
             workflow_data = json.load(f)
 
-        response = requests.post(
-            f"{base_url}/api/v1/workflows",
-            headers={
-                "X-N8N-API-KEY": api_key,
-                "Content-Type": "application/json"
-            },
-            json=workflow_data,
-            timeout=30
-        )
+        response = shared_client(base_url, api_key).create_workflow(workflow_data)
 
         if response.status_code in [200, 201]:
             result = response.json()
@@ -123,29 +117,17 @@ def import_workflow(base_url: str, api_key: str, workflow_path: str) -> str | No
 def activate_workflow(base_url: str, api_key: str, workflow_id: str) -> bool:
     """Activate a workflow"""
     try:
-        response = requests.patch(
-            f"{base_url}/api/v1/workflows/{workflow_id}",
-            headers={
-                "X-N8N-API-KEY": api_key,
-                "Content-Type": "application/json"
-            },
-            json={"active": True},
-            timeout=30
-        )
+        response = shared_client(base_url, api_key).activate_workflow(workflow_id)
         return response.status_code == 200
     except Exception as e:
         print_status(f"Failed to activate workflow: {e}", "fail")
         return False
 
 
-def trigger_retry_endpoint(base_url: str, fixtures: dict, language: str = "en",
-                           tone: str = "professional", pages: int = 1) -> dict:
-    """Trigger the /retry endpoint with test data"""
-
-    # Generate unique request ID
-    request_id = f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
-
-    payload = {
+def build_payload(fixtures: dict, request_id: str, language: str = "en",
+                  tone: str = "professional", pages: int = 1) -> dict:
+    """Webhook payload for one submission"""
+    return {
         "request_id": request_id,
         "jd_text": fixtures["job_description"],
         "resume_text": fixtures["resume_text"],  # Simulating pre-extracted resume
@@ -154,10 +136,21 @@ def trigger_retry_endpoint(base_url: str, fixtures: dict, language: str = "en",
         "pages": pages
     }
 
+
+def trigger_retry_endpoint(base_url: str, fixtures: dict, language: str = "en",
+                           tone: str = "professional", pages: int = 1) -> dict:
+    """Trigger the /retry endpoint with test data"""
+
+    # Generate unique request ID
+    request_id = f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+    payload = build_payload(fixtures, request_id, language, tone, pages)
+
     try:
-        response = requests.post(
-            f"{base_url}/webhook/resume-enhancer/retry",
-            headers={"Content-Type": "application/json"},
+        client = shared_client(base_url)
+        response = client.request(
+            "POST",
+            client.webhook_url(DEFAULT_WEBHOOK_PATH),
             json=payload,
             timeout=300  # 5 minutes for full processing
         )
@@ -198,24 +191,17 @@ def check_output_files(output_dir: str, request_id: str) -> dict:
         "data.json"
     ]
 
-    # Find the output directory (may be nested under company/role)
-    output_path = Path(output_dir)
+    # Runs are looked up in the manifest index, not by walking the output tree
     found_files = []
-    missing_files = []
-
-    # Search for request_id in subdirectories
-    for path in output_path.rglob(request_id):
-        if path.is_dir():
-            for expected_file in expected_files:
-                file_path = path / expected_file
-                if file_path.exists():
-                    found_files.append(expected_file)
-                else:
-                    missing_files.append(expected_file)
-            break
-    else:
-        # If no directory found with request_id, all files are missing
-        missing_files = expected_files
+    missing_files = expected_files
+
+    with OutputIndex(output_dir) as index:
+        index.sync()
+        run = index.get(request_id)
+    if run:
+        run_path = Path(run["path"])
+        found_files = [name for name in expected_files if (run_path / name).exists()]
+        missing_files = [name for name in expected_files if name not in found_files]
 
     return {
         "found": found_files,
@@ -228,21 +214,181 @@ def get_execution_logs(base_url: str, api_key: str, workflow_id: str,
                        limit: int = 5) -> list:
     """Get recent execution logs for the workflow"""
     try:
-        response = requests.get(
-            f"{base_url}/api/v1/executions",
-            headers={"X-N8N-API-KEY": api_key},
-            params={"workflowId": workflow_id, "limit": limit},
-            timeout=30
-        )
-
-        if response.status_code == 200:
-            return response.json().get("data", [])
-        return []
+        return list(shared_client(base_url, api_key).iter_executions(workflow_id, max_items=limit))
     except Exception as e:
         print_status(f"Failed to get executions: {e}", "fail")
         return []
 
 
+# ----------------------------------------------------------------------
+# Load mode
+# ----------------------------------------------------------------------
+
+
+
+def load_corpus(corpus_dir: str | None = None) -> list:
+    """
+    Load the job descriptions used for load testing.
+
+    Every *.txt file in corpus_dir is one job description; every *.json file
+    is a payload whose fields override the defaults (jd_text, language, tone,
+    pages, ...). Without corpus_dir the sample fixtures are used.
+    """
+    if not corpus_dir:
+        return [{}]
+
+    corpus = []
+    for path in sorted(Path(corpus_dir).iterdir()):
+        if path.suffix == ".txt":
+            corpus.append({"job_description": path.read_text(encoding="utf-8")})
+        elif path.suffix == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                corpus.append({"overrides": json.load(f)})
+    if not corpus:
+        raise FileNotFoundError(f"No .txt or .json files in corpus: {corpus_dir}")
+    return corpus
+
+
+def corpus_payload(entry: dict, fixtures: dict, request_id: str) -> dict:
+    """Webhook payload for one corpus entry"""
+    payload = build_payload({
+        "job_description": entry.get("job_description", fixtures["job_description"]),
+        "resume_text": fixtures["resume_text"]
+    }, request_id)
+    payload.update(entry.get("overrides", {}))
+    payload["request_id"] = request_id
+    return payload
+
+
+def classify_response(response: requests.Response) -> str | None:
+    """Return an error class for a failed submission, or None on success"""
+    if response.status_code != 200:
+        return f"http_{response.status_code}"
+    try:
+        body = response.json()
+    except ValueError:
+        return "invalid_json"
+    if isinstance(body, list):
+        body = body[0] if body else {}
+    if isinstance(body, dict) and body.get("success") is False:
+        return "workflow_error"
+    return None
+
+
+def submit_once(client: N8nClient, url: str, payload: dict, timeout: float) -> dict:
+    """POST one submission and record its latency and outcome"""
+    start = time.perf_counter()
+    status_code = 0
+    try:
+        # No retries: a retried submission would hide the failure and skew latency
+        response = client.request("POST", url, retry=False, json=payload, timeout=timeout)
+        status_code = response.status_code
+        error = classify_response(response)
+    except requests.exceptions.Timeout:
+        error = "timeout"
+    except requests.exceptions.ConnectionError:
+        error = "connection_error"
+    except requests.exceptions.RequestException as e:
+        error = type(e).__name__
+    return {
+        "request_id": payload["request_id"],
+        "status_code": status_code,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "error": error
+    }
+
+
+def summarize_load(samples: list, duration_s: float, concurrency: int) -> dict:
+    """Aggregate per-request samples into the load report"""
+    total = len(samples)
+    errors = Counter(s["error"] for s in samples if s["error"])
+    latencies = [s["latency_ms"] for s in samples]
+    ok_latencies = [s["latency_ms"] for s in samples if not s["error"]]
+    succeeded = total - sum(errors.values())
+
+    return {
+        "submissions": total,
+        "concurrency": concurrency,
+        "duration_s": round(duration_s, 3),
+        "throughput_rps": round(total / duration_s, 3) if duration_s > 0 else 0.0,
+        "success_rps": round(succeeded / duration_s, 3) if duration_s > 0 else 0.0,
+        "succeeded": succeeded,
+        "failed": total - succeeded,
+        "timeout_rate": round(errors.get("timeout", 0) / total, 4) if total else 0.0,
+        "error_rate": round((total - succeeded) / total, 4) if total else 0.0,
+        "latency_ms": {
+            "min": min(latencies) if latencies else None,
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else None
+        },
+        "success_latency_ms": {
+            "p50": percentile(ok_latencies, 50),
+            "p95": percentile(ok_latencies, 95),
+            "p99": percentile(ok_latencies, 99)
+        },
+        "error_classes": dict(errors.most_common())
+    }
+
+
+def run_load_test(url: str, corpus: list, fixtures: dict, submissions: int,
+                  concurrency: int, timeout: float = 300) -> dict:
+    """
+    Submit `submissions` requests with at most `concurrency` in flight.
+
+    Corpus entries are used round-robin. Returns the summary from
+    summarize_load() plus the raw per-request samples.
+    """
+    run_id = f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+    payloads = [
+        corpus_payload(corpus[i % len(corpus)], fixtures, f"{run_id}_{i:04d}")
+        for i in range(submissions)
+    ]
+
+    # One pooled session sized to the concurrency, so every worker keeps its connection
+    with N8nClient(url, pool_size=concurrency) as client:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(lambda p: submit_once(client, url, p, timeout), payloads))
+        duration = time.perf_counter() - start
+
+    report = summarize_load(samples, duration, concurrency)
+    report["url"] = url
+    report["samples"] = samples
+    return report
+
+
+def run_load(args) -> dict:
+    """Load mode entry point"""
+    url = f"{args.n8n_url.rstrip('/')}/webhook/{args.webhook_path.strip('/')}"
+    fixtures = load_fixtures()
+    corpus = load_corpus(args.corpus)
+
+    print_status(
+        f"Load test: {args.load} submissions, concurrency {args.concurrency}, "
+        f"{len(corpus)} corpus entries -> {url}", "info"
+    )
+    report = run_load_test(url, corpus, fixtures, args.load, args.concurrency, args.timeout)
+
+    if args.fakes_url:
+        # Record what the fake dependencies saw so runs can be compared
+        try:
+            report["fakes"] = requests.get(f"{args.fakes_url.rstrip('/')}/__fakes/stats", timeout=10).json()
+        except requests.exceptions.RequestException as e:
+            print_status(f"Could not read fake service stats: {e}", "warn")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print_status(f"Report written to {args.json_out}", "info")
+
+    summary = {k: v for k, v in report.items() if k != "samples"}
+    print(json.dumps(summary, indent=2))
+    return report
+
+
 def run_tests(args):
     """Main test runner"""
 
@@ -257,6 +403,11 @@ def run_tests(args):
         "warnings": 0
     }
 
+    timings = CallTimings()
+    if args.timings:
+        shared_client(args.n8n_url, args.api_key).hooks.append(timings)
+        shared_client(args.n8n_url).hooks.append(timings)
+
     # Test 1: Load fixtures
     print_status("Test 1: Loading test fixtures...", "info")
     results["total"] += 1
@@ -395,6 +546,9 @@ def run_tests(args):
     print(f"{Colors.YELLOW}Warnings: {results['warnings']}{Colors.RESET}")
     print(f"{'='*60}\n")
 
+    if args.timings:
+        print(json.dumps({"api_timings": timings.summary()}, indent=2))
+
     return results
 
 
@@ -415,9 +569,58 @@ def main():
         default=os.getenv("OUTPUT_DIR", ""),
         help="Output directory to check for files (default: $OUTPUT_DIR)"
     )
+    parser.add_argument(
+        "--load",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Load mode: submit N requests instead of running the functional tests"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Load mode: requests in flight at once (default: 4)"
+    )
+    parser.add_argument(
+        "--corpus",
+        default=os.getenv("LOAD_CORPUS", ""),
+        help="Load mode: directory of JD .txt / payload .json files (default: fixtures)"
+    )
+    parser.add_argument(
+        "--webhook-path",
+        default=DEFAULT_WEBHOOK_PATH,
+        help=f"Load mode: webhook path to submit to (default: {DEFAULT_WEBHOOK_PATH})"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=300,
+        help="Load mode: per-request timeout in seconds (default: 300)"
+    )
+    parser.add_argument(
+        "--fakes-url",
+        default=os.getenv("FAKES_URL", ""),
+        help="Load mode: fake_services.py URL whose stats are added to the report"
+    )
+    parser.add_argument(
+        "--json-out",
+        default="",
+        help="Load mode: also write the full report with per-request samples to this file"
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print per-endpoint API call latency after the functional tests"
+    )
 
     args = parser.parse_args()
 
+    if args.load:
+        # Webhooks need no API key
+        report = run_load(args)
+        sys.exit(1 if report["succeeded"] == 0 else 0)
+
     if not args.api_key:
         print(f"{Colors.RED}Error: n8n API key is required{Colors.RESET}")
         print("Set N8N_API_KEY environment variable or use --api-key")
@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+"""
+Offline Workflow Engine
+
+Runs an exported n8n workflow (workflow/workflow.json) locally without n8n,
+OpenAI or Gotenberg. The `connections` graph is resolved in Python, Code
+nodes and `={{ ... }}` expressions are evaluated by n8n_code_runner.js under
+Node.js, and OpenAI / HTTP / file nodes are served by pluggable stubs.
+Wall time is recorded for every node execution.
+
+Usage:
+    python workflow_engine.py [--workflow PATH] [--jd FILE] [--resume-text FILE]
+                              [--llm-latency-ms MS] [--json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import base64
+import argparse
+import threading
+import subprocess
+from pathlib import Path, PurePosixPath
+from concurrent.futures import ThreadPoolExecutor
+
+
+TESTS_DIR = Path(__file__).parent
+DEFAULT_WORKFLOW = TESTS_DIR.parent / "workflow" / "workflow.json"
+CODE_RUNNER = TESTS_DIR / "n8n_code_runner.js"
+
+# Write nodes' paths under this root are mirrored into the engine's output_dir
+OUTPUT_ROOT = "/data/output"
+
+# Minimal valid PDF returned by the default Gotenberg stub
+FAKE_PDF = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+)
+
+
+class WorkflowError(Exception):
+    """Raised when a node cannot be executed offline"""
+
+
+class CodeRunner:
+    """Persistent Node.js process that evaluates Code nodes and expressions"""
+
+    def __init__(self, node_binary: str = "node"):
+        self._proc = subprocess.Popen(
+            [node_binary, str(CODE_RUNNER)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1
+        )
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # Warm up so Node.js startup isn't billed to the first node
+        self.call("expr", expr="ready")
+
+    def call(self, op: str, **payload) -> dict:
+        """Send one request to the runner and wait for its response"""
+        with self._lock:
+            self._next_id += 1
+            request = {"id": self._next_id, "op": op, **payload}
+            self._proc.stdin.write(json.dumps(request) + "\n")
+            self._proc.stdin.flush()
+            line = self._proc.stdout.readline()
+
+        if not line:
+            raise WorkflowError("Code runner exited unexpectedly")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise WorkflowError(response.get("error", "Unknown code runner error"))
+        return response["result"]
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=5)
+
+
+def extract_json_template(prompt: str) -> str:
+    """Return the JSON skeleton a prompt asks the model to reply with"""
+    markers = ["Return ONLY this JSON:", "Return JSON with these fields:"]
+    start = -1
+    for marker in markers:
+        idx = prompt.rfind(marker)
+        if idx != -1:
+            start = prompt.find("{", idx)
+            break
+    if start == -1:
+        return "{}"
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for pos in range(start, len(prompt)):
+        ch = prompt[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return prompt[start:pos + 1]
+    return "{}"
+
+
+class TemplateEchoLLM:
+    """LLM stub that answers with the JSON skeleton found in the prompt"""
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.calls = []
+
+    def __call__(self, node_name: str, model: str, messages: list) -> str:
+        self.calls.append({"node": node_name, "model": model})
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        return extract_json_template(prompt)
+
+
+def default_http_stub(node_name: str, request: dict):
+    """HTTP stub: fake Gotenberg PDF, everything else fails like a dead host"""
+    if "/forms/chromium/convert/html" in request["url"]:
+        return FAKE_PDF
+    raise WorkflowError(f"No HTTP stub for {request['method']} {request['url']}")
+
+
+def read_local_file(path: str) -> bytes:
+    return Path(path).read_bytes()
+
+
+def extract_pdf_text(data: bytes) -> str:
+    """Extract text from a PDF with pypdf when it is installed"""
+    try:
+        from io import BytesIO
+        from pypdf import PdfReader
+    except ImportError:
+        raise WorkflowError("pypdf is not installed; pass resume text explicitly")
+    reader = PdfReader(BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _compare(operator: dict, left, right) -> bool:
+    """Evaluate one IF v2 condition"""
+    kind = operator.get("type", "string")
+    op = operator.get("operation", "equals")
+
+    if op == "exists":
+        return left is not None
+    if op == "notExists":
+        return left is None
+    if op == "empty":
+        return left in (None, "", [], {})
+    if op == "notEmpty":
+        return left not in (None, "", [], {})
+    if op == "true":
+        return left is True
+    if op == "false":
+        return left is False
+
+    if kind == "number":
+        left, right = float(left or 0), float(right or 0)
+    elif kind == "string":
+        left, right = str(left if left is not None else ""), str(right if right is not None else "")
+
+    checks = {
+        "equals": lambda: left == right,
+        "notEquals": lambda: left != right,
+        "contains": lambda: right in left,
+        "notContains": lambda: right not in left,
+        "startsWith": lambda: left.startswith(right),
+        "endsWith": lambda: left.endswith(right),
+        "regex": lambda: re.search(right, left) is not None,
+        "gt": lambda: left > right,
+        "gte": lambda: left >= right,
+        "lt": lambda: left < right,
+        "lte": lambda: left <= right,
+    }
+    if op not in checks:
+        raise WorkflowError(f"Unsupported IF operation: {kind}.{op}")
+    return checks[op]()
+
+
+class WorkflowEngine:
+    """Executes an n8n workflow export locally and records per-node timings"""
+
+    def __init__(self, workflow: dict, llm=None, http=None, read_file=None,
+                 extract_pdf=None, output_dir: str | None = None, env: dict | None = None):
+        self.workflow = workflow
+        self.nodes = {n["name"]: n for n in workflow.get("nodes", [])}
+        self.connections = workflow.get("connections", {})
+        self.llm = llm or TemplateEchoLLM()
+        self.http = http or default_http_stub
+        self.read_file = read_file or read_local_file
+        self.extract_pdf = extract_pdf or extract_pdf_text
+        self.output_dir = output_dir
+        self.env = env or {}
+        self.static_data = {}
+        self.runner = CodeRunner()
+
+        # Parameters of nodes that Code nodes read via $('Name').params
+        referenced = set()
+        for n in self.nodes.values():
+            referenced.update(re.findall(r"\$\('([^']+)'\)\.params", n["parameters"].get("jsCode", "")))
+        self.node_params = {name: self.nodes[name]["parameters"] for name in referenced if name in self.nodes}
+
+        self.handlers = {
+            "n8n-nodes-base.webhook": self._run_trigger,
+            "n8n-nodes-base.manualTrigger": self._run_trigger,
+            "n8n-nodes-base.set": self._run_set,
+            "n8n-nodes-base.if": self._run_if,
+            "n8n-nodes-base.code": self._run_code,
+            "n8n-nodes-base.httpRequest": self._run_http,
+            "n8n-nodes-base.readBinaryFiles": self._run_read_file,
+            "n8n-nodes-base.extractFromFile": self._run_extract,
+            "n8n-nodes-base.writeBinaryFile": self._run_write_file,
+            "n8n-nodes-base.respondToWebhook": self._run_respond,
+            "n8n-nodes-base.noOp": self._run_passthrough,
+            # Offline runs don't sleep between retries
+            "n8n-nodes-base.wait": self._run_passthrough,
+            "n8n-nodes-base.merge": self._run_merge,
+            "@n8n/n8n-nodes-langchain.openAi": self._run_openai,
+        }
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "WorkflowEngine":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def close(self):
+        self.runner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Graph
+    # ------------------------------------------------------------------
+
+    def find_trigger(self) -> str:
+        """Return the name of the first trigger node"""
+        for name, node in self.nodes.items():
+            if node["type"] in ("n8n-nodes-base.webhook", "n8n-nodes-base.manualTrigger"):
+                return name
+        raise WorkflowError("Workflow has no webhook or manual trigger")
+
+    def children(self, name: str, output_index: int) -> list:
+        """Return [(child_name, input_index)] wired to one output of a node"""
+        outputs = self.connections.get(name, {}).get("main", [])
+        if output_index >= len(outputs) or not outputs[output_index]:
+            return []
+        return [(c["node"], c.get("index", 0)) for c in outputs[output_index]]
+
+    def input_count(self, name: str) -> int:
+        """Number of distinct input indices wired into a node"""
+        indices = set()
+        for source in self.connections.values():
+            for output in source.get("main", []):
+                for c in output or []:
+                    if c["node"] == name:
+                        indices.add(c.get("index", 0))
+        return len(indices)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def run(self, trigger_data: dict | None = None, start_node: str | None = None) -> dict:
+        """
+        Execute the workflow once and return outputs plus timings.
+
+        `run_data` mirrors n8n's execution runData ({node: [{startTime,
+        executionTime, source, data: {main}}]}) so tools written against the
+        executions API also work on offline runs.
+        """
+        start_node = start_node or self.find_trigger()
+        execution_id = f"offline_{uuid.uuid4().hex[:12]}"
+        self._ctx_nodes = {}
+        self._execution = {"id": execution_id, "mode": "offline"}
+        self._response = None
+        timings = []
+        run_data = {}
+        sources = {}   # node -> nodes that fed it
+        pending = {}   # node -> {input_index: items} for multi-input nodes
+        stack = [(start_node, 0, [{"json": trigger_data or {}}])]
+        last_node = None
+        started_at = time.time()
+        run_start = time.perf_counter()
+
+        while stack or pending:
+            if not stack:
+                # Inputs that never arrived: run waiting nodes with what they have
+                name, inputs = pending.popitem()
+                stack.append((name, None, inputs))
+
+            name, input_index, items = stack.pop(0)
+            node = self.nodes.get(name)
+            if node is None:
+                raise WorkflowError(f"Connection to unknown node: {name}")
+
+            if input_index is not None and self.input_count(name) > 1:
+                waiting = pending.setdefault(name, {})
+                waiting[input_index] = items
+                if len(waiting) < self.input_count(name):
+                    continue
+                items = pending.pop(name)
+
+            node_start = time.perf_counter()
+            outputs = self.execute_node(node, items)
+            duration = (time.perf_counter() - node_start) * 1000
+
+            produced = [item for output in outputs for item in output]
+            self._ctx_nodes[name] = produced
+            last_node = name
+            timings.append({
+                "node": name,
+                "type": node["type"],
+                "start_ms": round((node_start - run_start) * 1000, 3),
+                "duration_ms": round(duration, 3),
+                "items_in": sum(len(v) for v in items.values()) if isinstance(items, dict) else len(items),
+                "items_out": len(produced)
+            })
+            run_data.setdefault(name, []).append({
+                "startTime": int((started_at + node_start - run_start) * 1000),
+                "executionTime": round(duration, 3),
+                "executionStatus": "success",
+                "source": [{"previousNode": parent} for parent in sources.get(name, [])],
+                "data": {"main": outputs}
+            })
+
+            next_runs = []
+            for output_index, output_items in enumerate(outputs):
+                if not output_items:
+                    continue
+                for child, child_input in self.children(name, output_index):
+                    next_runs.append((child, child_input, output_items))
+                    sources.setdefault(child, []).append(name)
+            stack[0:0] = next_runs
+
+        return {
+            "execution_id": execution_id,
+            "outputs": self._ctx_nodes,
+            "timings": timings,
+            "run_data": run_data,
+            "started_at": started_at,
+            "total_ms": round((time.perf_counter() - run_start) * 1000, 3),
+            "last_node": last_node,
+            "response": self._response,
+            "result": self._ctx_nodes[last_node][0]["json"] if last_node and self._ctx_nodes[last_node] else None
+        }
+
+    def execute_node(self, node: dict, items) -> list:
+        """Run one node; returns a list of item lists, one per output"""
+        if node.get("disabled"):
+            return [items if isinstance(items, list) else []]
+
+        handler = self.handlers.get(node["type"])
+        if handler is None:
+            raise WorkflowError(f"Unsupported node type for '{node['name']}': {node['type']}")
+
+        try:
+            return handler(node, items)
+        except Exception as e:
+            if node.get("onError") in ("continueRegularOutput", "continueErrorOutput"):
+                return [[{"json": {"error": str(e)}}]]
+            if isinstance(e, WorkflowError):
+                raise WorkflowError(f"{node['name']}: {e}") from e
+            raise
+
+    def _ctx(self, items: list) -> dict:
+        return {
+            "input": items,
+            "nodes": self._ctx_nodes,
+            "params": self.node_params,
+            "execution": self._execution,
+            "staticData": self.static_data,
+            "env": self.env
+        }
+
+    def render(self, value, items: list):
+        """Resolve an n8n parameter value (plain or `=` expression)"""
+        if isinstance(value, str) and value.startswith("="):
+            return self.runner.call("expr", expr=value, ctx=self._ctx(items))["value"]
+        return value
+
+    # ------------------------------------------------------------------
+    # Node handlers
+    # ------------------------------------------------------------------
+
+    def _run_trigger(self, node: dict, items: list) -> list:
+        if node["type"] == "n8n-nodes-base.webhook":
+            body = items[0]["json"] if items else {}
+            return [[{"json": {"headers": {}, "params": {}, "query": {}, "body": body}}]]
+        return [items]
+
+    def _run_passthrough(self, node: dict, items: list) -> list:
+        return [items]
+
+    def _run_respond(self, node: dict, items: list) -> list:
+        """Record the webhook response; items pass through like in n8n"""
+        params = node["parameters"]
+        body = None
+        if params.get("respondWith") == "json":
+            body = self.render(params.get("responseBody", "{}"), items[:1])
+            body = json.loads(body) if isinstance(body, str) else body
+        elif params.get("respondWith") == "firstIncomingItem":
+            body = items[0]["json"] if items else {}
+        if self._response is None:
+            self._response = {
+                "status": params.get("options", {}).get("responseCode", 200),
+                "body": body
+            }
+        return [items]
+
+    def _run_set(self, node: dict, items: list) -> list:
+        params = node["parameters"]
+        results = []
+        for item in items:
+            if params.get("mode") == "raw":
+                rendered = self.render(params.get("jsonOutput", "{}"), [item])
+                data = json.loads(rendered) if isinstance(rendered, str) else rendered
+            else:
+                data = dict(item["json"]) if params.get("includeOtherFields") else {}
+                for a in params.get("assignments", {}).get("assignments", []):
+                    data[a["name"]] = self.render(a.get("value"), [item])
+            results.append({"json": data})
+        return [results]
+
+    def _run_if(self, node: dict, items: list) -> list:
+        spec = node["parameters"].get("conditions", {})
+        combinator = spec.get("combinator", "and")
+        true_items, false_items = [], []
+        for item in items:
+            checks = [
+                _compare(c.get("operator", {}),
+                         self.render(c.get("leftValue"), [item]),
+                         self.render(c.get("rightValue"), [item]))
+                for c in spec.get("conditions", [])
+            ]
+            passed = all(checks) if combinator == "and" else any(checks)
+            (true_items if passed else false_items).append(item)
+        return [true_items, false_items]
+
+    def _run_code(self, node: dict, items: list) -> list:
+        params = node["parameters"]
+        code = params.get("jsCode", "")
+        if params.get("mode") == "runOnceForEachItem":
+            results = []
+            for item in items:
+                out = self.runner.call("code", code=code, ctx=self._ctx([item]))
+                self.static_data = out["staticData"]
+                results.extend(out["items"])
+            return [results]
+        out = self.runner.call("code", code=code, ctx=self._ctx(items))
+        self.static_data = out["staticData"]
+        return [out["items"]]
+
+    def _run_http(self, node: dict, items: list) -> list:
+        # n8n sends the requests for all items of one node concurrently
+        if len(items) <= 1:
+            return [[self._http_item(node, item) for item in items]]
+        with ThreadPoolExecutor(max_workers=len(items)) as pool:
+            return [list(pool.map(lambda item: self._http_item(node, item), items))]
+
+    def _http_item(self, node: dict, item: dict) -> dict:
+        params = node["parameters"]
+        request = {
+            "method": params.get("method", "GET"),
+            "url": self.render(params.get("url", ""), [item]),
+            "body": None,
+            "binary": {}
+        }
+        if params.get("sendBody"):
+            if params.get("specifyBody") == "json":
+                body = self.render(params.get("jsonBody", "{}"), [item])
+                request["body"] = json.loads(body) if isinstance(body, str) else body
+            for p in params.get("bodyParameters", {}).get("parameters", []):
+                if p.get("parameterType") == "formBinaryData":
+                    binary = item.get("binary", {}).get(p["inputDataFieldName"], {})
+                    request["binary"][p["name"]] = base64.b64decode(binary.get("data", ""))
+                else:
+                    request["body"] = request["body"] or {}
+                    request["body"][p["name"]] = self.render(p.get("value"), [item])
+
+        try:
+            if request["url"].endswith("/chat/completions"):
+                # Fan-out items name the generator they stand for
+                label = item["json"].get("generator") or node["name"]
+                response = self._chat_completion(label, request["body"])
+            else:
+                response = self.http(node["name"], request)
+        except Exception as e:
+            # onError=continue in n8n turns a failed request into an error item
+            if node.get("onError") in ("continueRegularOutput", "continueErrorOutput"):
+                return {"json": {"error": {"message": str(e)}}}
+            raise
+
+        response_opts = params.get("options", {}).get("response", {}).get("response", {})
+        if response_opts.get("responseFormat") == "file":
+            prop = response_opts.get("outputPropertyName", "data")
+            return {
+                "json": dict(item["json"]),
+                "binary": {prop: {
+                    "data": base64.b64encode(response).decode("ascii"),
+                    "mimeType": "application/pdf",
+                    "fileName": "result.pdf"
+                }}
+            }
+        if isinstance(response, bytes):
+            response = response.decode("utf-8")
+        if response_opts.get("fullResponse"):
+            # The stubs only model successful calls; failures raise and take the onError path
+            return {"json": {"statusCode": 200, "statusMessage": "OK", "headers": {}, "body": response}}
+        if isinstance(response, str):
+            return {"json": {"data": response}}
+        return {"json": response}
+
+    def _chat_completion(self, node_name: str, body: dict) -> dict:
+        """Serve an OpenAI chat completions call made by an HTTP node from the LLM stub"""
+        body = body or {}
+        messages = body.get("messages", [])
+        content = self.llm(node_name, body.get("model", ""), messages)
+        # Rough 4-chars-per-token usage so token accounting has numbers to work with
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "object": "chat.completion",
+            "model": body.get("model", ""),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def _run_read_file(self, node: dict, items: list) -> list:
+        path = self.render(node["parameters"].get("fileSelector", ""), items)
+        data = self.read_file(path)
+        return [[{
+            "json": {},
+            "binary": {"data": {
+                "data": base64.b64encode(data).decode("ascii"),
+                "mimeType": "application/pdf",
+                "fileName": os.path.basename(path),
+                "fileSize": len(data)
+            }}
+        }]]
+
+    def _run_extract(self, node: dict, items: list) -> list:
+        results = []
+        for item in items:
+            binary = item.get("binary", {}).get("data", {})
+            text = self.extract_pdf(base64.b64decode(binary.get("data", "")))
+            results.append({"json": {"text": text}})
+        return [results]
+
+    def _run_write_file(self, node: dict, items: list) -> list:
+        params = node["parameters"]
+        results = []
+        for item in items:
+            file_name = self.render(params.get("fileName", ""), [item])
+            prop = params.get("dataPropertyName", "data")
+            binary = item.get("binary", {}).get(prop)
+            if binary is None:
+                raise WorkflowError(f"No binary property '{prop}' to write")
+            if self.output_dir:
+                target = self._output_target(file_name)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with open(target, "ab" if params.get("options", {}).get("append") else "wb") as f:
+                    f.write(base64.b64decode(binary["data"]))
+            results.append({"json": {**item["json"], "fileName": file_name}, "binary": item.get("binary")})
+        return [results]
+
+    def _output_target(self, file_name: str) -> Path:
+        """Map a path under /data/output into output_dir; other paths keep only their name"""
+        path = PurePosixPath(file_name)
+        try:
+            relative = path.relative_to(OUTPUT_ROOT)
+        except ValueError:
+            relative = PurePosixPath(path.name)
+        return Path(self.output_dir, *relative.parts)
+
+    def _run_merge(self, node: dict, items) -> list:
+        inputs = items if isinstance(items, dict) else {0: items}
+        mode = node["parameters"].get("mode", "append")
+        if mode == "chooseBranch":
+            first = inputs[min(inputs)]
+            return [first]
+        merged = []
+        for index in sorted(inputs):
+            merged.extend(inputs[index])
+        return [merged]
+
+    def _run_openai(self, node: dict, items: list) -> list:
+        params = node["parameters"]
+        model = params.get("modelId", {}).get("value", "")
+        results = []
+        for item in items:
+            messages = [
+                {"role": m.get("role", "user"), "content": self.render(m.get("content", ""), [item])}
+                for m in params.get("messages", {}).get("values", [])
+            ]
+            content = self.llm(node["name"], model, messages)
+            if params.get("jsonOutput"):
+                content = json.loads(content)
+            results.append({"json": {
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "logprobs": None,
+                "finish_reason": "stop"
+            }})
+        return [results]
+
+
+def format_timings(run: dict) -> str:
+    """Render per-node timings as a text table"""
+    lines = [f"{'Node':<36} {'Start ms':>10} {'Duration ms':>12} {'In':>4} {'Out':>4}"]
+    lines.append("-" * len(lines[0]))
+    for t in run["timings"]:
+        lines.append(
+            f"{t['node'][:36]:<36} {t['start_ms']:>10.1f} {t['duration_ms']:>12.1f} "
+            f"{t['items_in']:>4} {t['items_out']:>4}"
+        )
+    lines.append("-" * len(lines[0]))
+    lines.append(f"{'Total':<36} {'':>10} {run['total_ms']:>12.1f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the n8n workflow offline with stubs")
+    parser.add_argument("--workflow", default=str(DEFAULT_WORKFLOW), help="Workflow JSON export")
+    parser.add_argument("--jd", default=str(TESTS_DIR / "fixtures" / "sample_job_description.txt"),
+                        help="Job description text file")
+    parser.add_argument("--resume-text", default=str(TESTS_DIR / "fixtures" / "sample_resume.txt"),
+                        help="Resume text returned by the PDF extraction stub")
+    parser.add_argument("--llm-latency-ms", type=float, default=0,
+                        help="Simulated latency per LLM call")
+    parser.add_argument("--fakes", default="",
+                        help="Send LLM and HTTP calls to fake_services.py at this URL instead of the stubs")
+    parser.add_argument("--json", action="store_true", help="Print the full run as JSON")
+    args = parser.parse_args()
+
+    resume_text = Path(args.resume_text).read_text(encoding="utf-8")
+    payload = {"jd_text": Path(args.jd).read_text(encoding="utf-8")}
+
+    llm, http = TemplateEchoLLM(latency_ms=args.llm_latency_ms), None
+    if args.fakes:
+        from fake_services import fakes_llm, fakes_http
+        llm, http = fakes_llm(args.fakes), fakes_http(args.fakes)
+
+    with WorkflowEngine.from_file(
+        args.workflow,
+        llm=llm,
+        http=http,
+        read_file=lambda path: resume_text.encode("utf-8"),
+        extract_pdf=lambda data: data.decode("utf-8")
+    ) as engine:
+        try:
+            run = engine.run(payload)
+        except WorkflowError as e:
+            print(f"Workflow failed: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.json:
+        print(json.dumps({k: run[k] for k in ("execution_id", "timings", "total_ms", "last_node", "result")},
+                         indent=2))
+    else:
+        print(format_timings(run))
+
+
+if __name__ == "__main__":
+    main()